@@ -1,42 +1,42 @@
 import streamlit as st
-import ollama
-from resume_utils import parse_resume
-from jd_matcher import get_similarity
-from chatbot import HRChatbot
+from candidate_store import get_candidate_store
+from chatbot import get_hr_chatbot
+from degraded_mode import get_ollama_health
+from hr_jobs import get_hr_queue, submit_processing, submit_question, submit_shortlist
+from metrics import start_metrics_server
+from prefetch import PREFETCH_QUESTIONS, get_prefetcher
+from profiler import profile_script
 
-# Check Ollama status
-@st.cache_data
-def check_ollama_status():
-    """Check if Ollama is running and has models"""
-    try:
-        models = ollama.list()
-        if models['models']:
-            return True, [model['name'] for model in models['models']]
-        else:
-            return False, []
-    except Exception as e:
-        return False, str(e)
+SUGGESTED_QUESTIONS = [
+    "What are the candidate's key strengths?",
+    "How does their experience align with the job requirements?",
+    "What skills are missing from their profile?",
+    "Would you recommend this candidate for interview?",
+    "What interview questions should I ask this candidate?"
+]
 
 st.set_page_config(page_title="HR Recruiting Chatbot", layout="wide")
+profile_script(__file__)
+start_metrics_server()
 st.title("🤖 HR Recruiting Chatbot (Ollama Edition)")
 
-# Check Ollama status
-ollama_running, model_info = check_ollama_status()
+# Check Ollama status (shared across sessions and re-checked every few seconds)
+ollama_status = get_ollama_health().status()
 
-if not ollama_running:
-    st.error("❌ Ollama is not running or no models are installed!")
-    st.markdown("""
-    **To fix this:**
-    1. Install Ollama: https://ollama.ai/
-    2. Run in terminal: `ollama serve`
-    3. Install a model: `ollama pull llama3.2`
-    4. Refresh this page
-    """)
-    st.stop()
+if not ollama_status.running:
+    # Matching still works; the bot answers from the match score and skill overlap until Ollama is back
+    st.warning("⚡ Ollama is not running or no models are installed. The HR Bot gives quick rule-based answers meanwhile.")
+    with st.expander("🔧 Enable full AI answers"):
+        st.markdown("""
+        1. Install Ollama: https://ollama.ai/
+        2. Run in terminal: `ollama serve`
+        3. Install a model: `ollama pull llama3.2`
+        4. Refresh this page
+        """)
 else:
-    st.success(f"✅ Ollama is running with {len(model_info)} model(s)")
+    st.success(f"✅ Ollama is running with {len(ollama_status.models)} model(s)")
     with st.expander("📋 Available Models"):
-        for model in model_info:
+        for model in ollama_status.models:
             st.write(f"- {model}")
 
 # Initialize session state
@@ -52,40 +52,192 @@ with st.sidebar:
     jd_text = st.text_area("📝 Paste or Type Job Description", height=200)
     
     if st.button("🚀 Process", type="primary") and resume_file and jd_text:
+        # Runs in a background worker; the job ID survives reruns and browser refreshes
+        job_id = submit_processing(resume_file.getvalue(), jd_text)
+        st.session_state.process_job = job_id
+        st.query_params["job"] = job_id
+    
+    st.divider()
+    st.header("🏆 Compare Finalists")
+    finalist_files = st.file_uploader("📄 Upload Finalist Resumes (PDF)", type=["pdf"], accept_multiple_files=True)
+    shortlist_size = st.number_input("Candidates to shortlist", min_value=1, max_value=10, value=3)
+    
+    if st.button("📋 Rank Finalists") and finalist_files and jd_text:
+        # All finalists are ranked against the JD above in a few batched LLM calls
+        job_id = submit_shortlist([(f.name, f.getvalue()) for f in finalist_files], jd_text, int(shortlist_size))
+        st.session_state.shortlist_job = job_id
+        st.query_params["shortlist"] = job_id
+    
+    st.divider()
+    st.header("🗂️ Candidate Archive")
+    archive_skills = st.text_input("🔎 Skills", placeholder="kubernetes AND (python OR go) AND NOT php")
+    archive_experience = st.slider("Years of experience", 0.0, 40.0, (0.0, 40.0), step=0.5)
+    
+    if st.button("🔎 Search Archive"):
+        # Every resume processed so far is searchable; ranked by match when a JD is entered above
+        st.session_state.archive_search = {
+            "skills": archive_skills.strip() or None,
+            "min_experience": archive_experience[0] or None,
+            "max_experience": archive_experience[1] if archive_experience[1] < 40 else None,
+            "job_description": jd_text.strip() or None,
+        }
+
+@st.experimental_fragment(run_every=1)
+def show_processing_progress(job_id):
+    """Poll the processing job; rerun the whole page once it has finished"""
+    job = get_hr_queue().get(job_id)
+    if job is None or job["status"] in ("done", "failed"):
+        st.rerun()
+    st.progress(job["progress"], text=job["message"] or "⏳ Waiting for a worker...")
+    if "candidate" in job["partial"]:
+        st.write(f"📄 Parsed resume for **{job['partial']['candidate'].get('name') or 'candidate'}**")
+
+@st.experimental_fragment(run_every=1)
+def show_answer_progress(job_id):
+    """Poll a question job, showing the answer as it is written; rerun the page once it has finished"""
+    job = get_hr_queue().get(job_id)
+    if job is None or job["status"] in ("done", "failed", "cancelled"):
+        st.rerun()
+    st.progress(job["progress"], text=job["message"] or "⏳ Waiting for a worker...")
+    if st.button("⏹️ Stop", key=f"stop_{job_id}"):
+        # The worker stops generating and keeps the text written so far
+        get_hr_queue().cancel(job_id)
+    if "answer" in job["partial"]:
+        st.markdown(job["partial"]["answer"])
+
+# Pick up the processing job for this session (or for this URL after a refresh)
+process_job = st.session_state.get("process_job") or st.query_params.get("job")
+if process_job and st.session_state.get("processed_job") != process_job:
+    job = get_hr_queue().get(process_job)
+    if job is None:
+        st.session_state.process_job = None
+        st.query_params.clear()
+    elif job["status"] == "failed":
+        st.error(f"❌ Error processing: {job['error']}")
+        st.session_state.process_job = None
+        st.query_params.clear()
+    elif job["status"] == "done":
+        result = job["result"]
+        st.session_state.score = result["score"]
+        st.session_state.processed_job = process_job
+        
+        # Initialize HR Bot with error handling
         try:
-            with st.spinner("🔍 Parsing resume..."):
-                candidate = parse_resume(resume_file)
-            st.session_state.candidate = candidate
-            
-            with st.spinner("📊 Calculating similarity..."):
-                score = get_similarity(candidate["full_text"], jd_text)
-            st.session_state.score = score
-            st.session_state.jd_text = jd_text
-            
-            # Initialize HR Bot with error handling
-            try:
-                st.session_state.hr_bot = HRChatbot(candidate, jd_text, score)
-                st.session_state.chat_history = []
-                st.session_state.processed = True
-                st.success("✅ Processing completed!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"❌ Error initializing HR Bot: {str(e)}")
-                st.markdown("""
-                **Common solutions:**
-                - Run: `ollama pull llama3.2`
-                - Or try: `ollama pull llama2`
-                - Make sure Ollama is running: `ollama serve`
-                """)
+            previous_bot = st.session_state.get("hr_bot")
+            st.session_state.hr_bot = get_hr_chatbot(result["candidate"], result["job_description"], result["score"])
+            # Answer the first suggested questions in the background while the results are read
+            if previous_bot is not None and previous_bot is not st.session_state.hr_bot:
+                get_prefetcher().cancel(previous_bot)
+            get_prefetcher().schedule(st.session_state.hr_bot, SUGGESTED_QUESTIONS[:PREFETCH_QUESTIONS])
+            # The bot, its candidate record and the JD text are shared across sessions; keep references only
+            st.session_state.candidate = st.session_state.hr_bot.candidate
+            st.session_state.jd_text = st.session_state.hr_bot.job_description
+            st.session_state.chat_history = []
+            st.session_state.analysis_job = None
+            st.session_state.chat_job = None
+            st.session_state.processed = True
+            st.success("✅ Processing completed!")
+            if result.get("duplicate_of"):
+                st.info(f"♻️ Near-copy of a resume processed earlier ({result['duplicate_of']['similarity']:.0%} similar); "
+                        "its embedding and cached answers were reused.")
         except Exception as e:
-            st.error(f"❌ Error processing: {str(e)}")
+            st.error(f"❌ Error initializing HR Bot: {str(e)}")
+            st.markdown("""
+            **Common solutions:**
+            - Run: `ollama pull llama3.2`
+            - Or try: `ollama pull llama2`
+            - Make sure Ollama is running: `ollama serve`
+            """)
+    else:
+        show_processing_progress(process_job)
+
+@st.experimental_fragment(run_every=1)
+def show_shortlist_progress(job_id):
+    """Poll the shortlist job; rerun the whole page once it has finished"""
+    job = get_hr_queue().get(job_id)
+    if job is None or job["status"] in ("done", "failed"):
+        st.rerun()
+    st.progress(job["progress"], text=job["message"] or "⏳ Waiting for a worker...")
+
+# Finalist shortlist for this session (or for this URL after a refresh)
+shortlist_job = st.session_state.get("shortlist_job") or st.query_params.get("shortlist")
+if shortlist_job:
+    job = get_hr_queue().get(shortlist_job)
+    if job is None or job["status"] == "failed":
+        if job is not None:
+            st.error(f"❌ Error ranking finalists: {job['error']}")
+        st.session_state.shortlist_job = None
+        st.query_params.pop("shortlist", None)
+    elif job["status"] == "done":
+        result = job["result"]
+        st.subheader("🏆 Finalist Shortlist")
+        st.caption(f"Ranked {len(result['ranking'])} candidates in {result['llm_calls']} LLM call(s) with {result['model']}")
+        st.dataframe(
+            [
+                {
+                    "Rank": row["rank"],
+                    "Candidate": row["name"],
+                    "File": row["label"],
+                    "Match": f"{row['score'] * 100:.1f}%",
+                    "Decision": "✅ Shortlist" if row["decision"] == "shortlist" else "❌ Reject",
+                    "Reason": row["reason"],
+                }
+                for row in result["ranking"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        if result.get("unparsed"):
+            st.warning(f"⚠️ {result['unparsed']} resume(s) could not be parsed and were left out.")
+        if st.button("🗑️ Clear Shortlist"):
+            st.session_state.shortlist_job = None
+            st.query_params.pop("shortlist", None)
+            st.rerun()
+        st.divider()
+    else:
+        st.subheader("🏆 Finalist Shortlist")
+        show_shortlist_progress(shortlist_job)
+
+# Candidate archive search results
+archive_search = st.session_state.get("archive_search")
+if archive_search:
+    st.subheader("🗂️ Archive Matches")
+    filters = {key: value for key, value in archive_search.items() if key != "job_description"}
+    try:
+        with st.spinner("🔎 Searching the archive..."):
+            if archive_search["job_description"]:
+                hits = get_candidate_store().rank(archive_search["job_description"], **filters)
+            else:
+                hits = get_candidate_store().search(**filters)
+    except ValueError as e:
+        st.error(f"❌ Invalid skill query: {str(e)}")
+        hits = None
+    if hits == []:
+        st.info("No stored candidates match this search.")
+    elif hits:
+        st.dataframe(
+            [
+                {
+                    "Candidate": hit.name or f"#{hit.candidate_id}",
+                    "Experience": f"{hit.total_experience:g} years",
+                    "Pages": hit.no_of_pages,
+                    **({"Match": f"{hit.score * 100:.1f}%"} if hit.score is not None else {}),
+                }
+                for hit in hits
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+    if st.button("🗑️ Clear Search"):
+        st.session_state.archive_search = None
+        st.rerun()
+    st.divider()
 
 # Main content
 if st.session_state.get("processed"):
     candidate = st.session_state.candidate
     score = st.session_state.score
     jd_text = st.session_state.jd_text
-    hr_bot = st.session_state.hr_bot
     
     # Create two columns for better layout
     col1, col2 = st.columns([1, 1])
@@ -95,10 +247,10 @@ if st.session_state.get("processed"):
         
         # Display candidate info in a cleaner format
         candidate_info = {
-            "Name": candidate.get("name", "Not extracted"),
-            "Experience": f"{candidate.get('total_experience', 0)} years",
-            "Pages": candidate.get("no_of_pages", 0),
-            "Key Skills": (", ".join(candidate.get("skills", []))[:100] + "...") if len(", ".join(candidate.get("skills", []))) > 100 else ", ".join(candidate.get("skills", []))
+            "Name": candidate.name or "Not extracted",
+            "Experience": f"{candidate.total_experience:g} years",
+            "Pages": candidate.no_of_pages,
+            "Key Skills": (", ".join(candidate.skills)[:100] + "...") if len(", ".join(candidate.skills)) > 100 else ", ".join(candidate.skills)
 
         }
         
@@ -107,7 +259,7 @@ if st.session_state.get("processed"):
         
         # Add expandable section for full text if needed
         with st.expander("📝 View Full Resume Text"):
-            st.text_area("Full extracted text:", candidate.get("full_text", ""), height=200, disabled=True)
+            st.text_area("Full extracted text:", candidate.full_text, height=200, disabled=True)
     
     with col2:
         st.subheader("📊 Matching Analysis")
@@ -137,13 +289,26 @@ if st.session_state.get("processed"):
     )
     
     if st.button("🔍 Get Analysis"):
-        with st.spinner("🤔 Analyzing..."):
-            try:
-                reason = hr_bot.ask(reason_question)
-                st.markdown(f"**Analysis:**")
-                st.write(reason)
-            except Exception as e:
-                st.error(f"❌ Error getting analysis: {str(e)}")
+        st.session_state.analysis_job = submit_question(candidate, jd_text, score, reason_question,
+                                                       task="analysis")
+    
+    analysis_job = st.session_state.get("analysis_job")
+    if analysis_job:
+        job = get_hr_queue().get(analysis_job)
+        if job is None:
+            st.session_state.analysis_job = None
+        elif job["status"] == "done":
+            st.markdown(f"**Analysis:**")
+            st.write(job["result"]["answer"])
+        elif job["status"] == "failed":
+            st.error(f"❌ Error getting analysis: {job['error']}")
+        elif job["status"] == "cancelled":
+            answer = (job["result"] or job["partial"]).get("answer")
+            if answer:
+                st.write(answer)
+            st.info("⏹️ Analysis stopped. Click 'Get Analysis' to start again.")
+        else:
+            show_answer_progress(analysis_job)
     
     # Chat Interface
     st.header("💬 Chat with HR Bot")
@@ -159,6 +324,25 @@ if st.session_state.get("processed"):
                 st.markdown(f"**🤖 HR Bot:** {message}")
         st.divider()
     
+    # Question being answered in the background
+    chat_job = st.session_state.get("chat_job")
+    if chat_job:
+        job = get_hr_queue().get(chat_job)
+        if job is None or job["status"] in ("done", "failed", "cancelled"):
+            st.session_state.chat_job = None
+            if job is not None and job["status"] == "failed":
+                st.error(f"❌ Error: {job['error']}")
+            elif job is not None:
+                answer = (job["result"] or job["partial"]).get("answer", "")
+                if job["status"] == "cancelled":
+                    answer += "\n\n_⏹️ Stopped._"
+                st.session_state.chat_history.append(("You", st.session_state.chat_question))
+                st.session_state.chat_history.append(("Bot", answer))
+                st.rerun()
+        else:
+            st.markdown(f"**🙋 You:** {st.session_state.chat_question}")
+            show_answer_progress(chat_job)
+    
     # Chat input
     user_question = st.text_input(
         "Ask a question:",
@@ -171,18 +355,10 @@ if st.session_state.get("processed"):
     with col_ask:
         if st.button("💬 Ask", type="primary"):
             if user_question.strip():
-                try:
-                    with st.spinner("🤖 Thinking..."):
-                        bot_response = hr_bot.ask(user_question)
-                    
-                    # Add to chat history
-                    st.session_state.chat_history.append(("You", user_question))
-                    st.session_state.chat_history.append(("Bot", bot_response))
-                    
-                    # Clear input and rerun
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+                # Answered by a background worker; it joins the chat history once done
+                st.session_state.chat_question = user_question
+                st.session_state.chat_job = submit_question(candidate, jd_text, score, user_question)
+                st.rerun()
             else:
                 st.warning("⚠️ Please enter a question!")
     
@@ -193,27 +369,13 @@ if st.session_state.get("processed"):
     
     # Suggested questions
     st.subheader("💡 Suggested Questions")
-    suggested_questions = [
-        "What are the candidate's key strengths?",
-        "How does their experience align with the job requirements?",
-        "What skills are missing from their profile?",
-        "Would you recommend this candidate for interview?",
-        "What interview questions should I ask this candidate?"
-    ]
-    
-    cols = st.columns(len(suggested_questions))
-    for i, question in enumerate(suggested_questions):
+    cols = st.columns(len(SUGGESTED_QUESTIONS))
+    for i, question in enumerate(SUGGESTED_QUESTIONS):
         with cols[i]:
             if st.button(f"❓ {question}", key=f"suggested_{i}"):
-                try:
-                    with st.spinner("🤖 Thinking..."):
-                        bot_response = hr_bot.ask(question)
-                    
-                    st.session_state.chat_history.append(("You", question))
-                    st.session_state.chat_history.append(("Bot", bot_response))
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+                st.session_state.chat_question = question
+                st.session_state.chat_job = submit_question(candidate, jd_text, score, question)
+                st.rerun()
 
 else:
     # Welcome screen
@@ -235,4 +397,5 @@ else:
     - **Interactive Chat**: Ask any HR-related questions about the candidate
     - **Match Scoring**: Automated scoring based on resume-JD similarity
     - **Suggested Questions**: Pre-built questions to help with candidate evaluation
+    - **Finalist Shortlist**: Rank several finalists against one job description in a single pass
     """)
\ No newline at end of file
@@ -0,0 +1,200 @@
+# bounded_chat.py
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import ollama
+
+from llm_gate import LLMGate, default_gate
+from metrics import record_ollama_usage
+
+logger = logging.getLogger(__name__)
+
+# Seconds without a first token before a hedge request goes to a faster model
+DEFAULT_HEDGE_AFTER = float(os.environ.get("OLLAMA_HEDGE_AFTER", "6"))
+
+TRUNCATION_MARKER = "\n\n_[Answer cut short: {reason}.]_"
+
+_POLL_INTERVAL = 0.25
+
+
+def is_truncated(text: str) -> bool:
+    """Whether an answer ends in the truncation marker"""
+    return TRUNCATION_MARKER.split("{")[0] in text[-200:]
+
+
+class _Attempt:
+    def __init__(self, model: str):
+        self.model = model
+        self.stop = threading.Event()
+        self.failed = False
+
+
+class BoundedChat:
+    def __init__(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any],
+                 deadline: float, hedge_model: Optional[str] = None,
+                 hedge_after: float = DEFAULT_HEDGE_AFTER, cancel: Optional[threading.Event] = None,
+                 gate: LLMGate = default_gate, background: bool = False):
+        """
+        Streamed Ollama chat with a hard deadline, an optional hedge and cancellation
+
+        Iterate it for the response chunks. If the deadline passes or `cancel`
+        is set, iteration ends with the text so far plus a truncation marker.
+        If no token has arrived after `hedge_after` seconds and a gate slot
+        is free, the same request also goes to `hedge_model`. Whichever model
+        produces the first token wins and the other request is dropped.
+
+        Args:
+            model: Primary Ollama model
+            messages: Chat messages
+            options: Ollama generation options
+            deadline: Seconds from the start of iteration to the last chunk
+            hedge_model: Faster model to race against a slow start, or None
+            hedge_after: Seconds without a first token before hedging
+            cancel: Set from another thread to stop early
+            gate: Concurrency gate shared with other Ollama callers
+            background: Speculative call; see LLMGate.slot
+        """
+        self.messages = messages
+        self.options = options
+        self.deadline = deadline
+        self.hedge_model = hedge_model if hedge_model != model else None
+        self.hedge_after = hedge_after
+        self.cancel = cancel or threading.Event()
+        self.gate = gate
+        self.background = background
+
+        self._primary = model
+        self._queue: "queue.Queue" = queue.Queue()
+        self._attempts: List[_Attempt] = []
+        self._ends = 0.0
+
+        # Filled in during iteration
+        self.model = model
+        self.hedged = False
+        self.truncated = False
+        self.stop_reason: Optional[str] = None
+
+    def _start(self, model: str, wait: Optional[float]) -> bool:
+        """Start one streaming request on its own thread; False if no gate slot freed up within `wait`"""
+        attempt = _Attempt(model)
+        ready = threading.Event()
+        acquired = []
+
+        def read(finished: threading.Event):
+            try:
+                # Bounded by the deadline, so a read stuck in prefill cannot outlive the request
+                client = ollama.Client(timeout=max(self._ends - time.monotonic(), _POLL_INTERVAL))
+                stream = client.chat(model=model, messages=self.messages, options=self.options, stream=True)
+                try:
+                    for part in stream:
+                        if attempt.stop.is_set():
+                            break
+                        self._queue.put((attempt, "chunk", part))
+                finally:
+                    # Closing the stream drops the HTTP connection, which stops the generation
+                    close = getattr(stream, "close", None)
+                    if close:
+                        close()
+            except Exception as e:
+                self._queue.put((attempt, "error", e))
+            finally:
+                finished.set()
+
+        def run():
+            try:
+                with self.gate.slot(timeout=wait, background=self.background):
+                    acquired.append(True)
+                    ready.set()
+                    if attempt.stop.is_set():
+                        return
+                    # The read blocks without a part to check `stop` against until the
+                    # first token, so the slot is held here instead and freed on stop
+                    finished = threading.Event()
+                    threading.Thread(target=read, args=(finished,), name=f"ollama-read-{model}", daemon=True).start()
+                    while not finished.wait(_POLL_INTERVAL) and not attempt.stop.is_set():
+                        pass
+            except TimeoutError as e:
+                if not acquired:
+                    ready.set()
+                    if wait == 0:
+                        return
+                self._queue.put((attempt, "error", e))
+            except Exception as e:
+                ready.set()
+                self._queue.put((attempt, "error", e))
+
+        self._attempts.append(attempt)
+        threading.Thread(target=run, name=f"ollama-{model}", daemon=True).start()
+        if wait == 0:
+            # Hedges only go ahead if a slot is free right now
+            ready.wait()
+            if not acquired:
+                self._attempts.remove(attempt)
+                return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        started = time.monotonic()
+        self._ends = started + self.deadline
+        self._start(self._primary, wait=self.deadline)
+        winner: Optional[_Attempt] = None
+        errors = []
+        try:
+            while True:
+                if self.cancel.is_set():
+                    self.stop_reason = "cancelled"
+                    break
+                elapsed = time.monotonic() - started
+                if elapsed >= self.deadline:
+                    self.stop_reason = f"no complete answer within {self.deadline:.0f}s"
+                    break
+
+                if (winner is None and not self.hedged and self.hedge_model
+                        and elapsed >= self.hedge_after):
+                    self.hedged = self._start(self.hedge_model, wait=0)
+                    if self.hedged:
+                        logger.info("Hedging %s with %s after %.1fs", self._primary, self.hedge_model, elapsed)
+                    else:
+                        self.hedge_model = None
+
+                try:
+                    attempt, kind, value = self._queue.get(timeout=min(_POLL_INTERVAL, self.deadline - elapsed))
+                except queue.Empty:
+                    continue
+                if winner is not None and attempt is not winner:
+                    continue
+
+                if kind == "error":
+                    attempt.failed = True
+                    errors.append(value)
+                    if winner is None and any(not a.failed for a in self._attempts):
+                        continue
+                    if winner is None and not self.hedged and self.hedge_model:
+                        # The primary failed before answering: fail over to the hedge model
+                        logger.warning("%s failed (%s); retrying on %s", self._primary, value, self.hedge_model)
+                        self.hedged = self._start(self.hedge_model, wait=self.deadline - elapsed)
+                        continue
+                    raise errors[0]
+
+                if winner is None:
+                    winner = attempt
+                    self.model = attempt.model
+                    for other in self._attempts:
+                        if other is not winner:
+                            other.stop.set()
+                text = value['message']['content']
+                if text:
+                    yield text
+                if value.get('done'):
+                    record_ollama_usage(attempt.model, value)
+                    return
+
+            self.truncated = True
+            yield TRUNCATION_MARKER.format(reason=self.stop_reason)
+        finally:
+            for attempt in self._attempts:
+                attempt.stop.set()
@@ -0,0 +1,46 @@
+# candidate_record.py
+import sys
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CandidateRecord(NamedTuple):
+    """
+    The parsed resume fields the apps use, without the rest of pyresparser's dict
+
+    A NamedTuple has no per-instance __dict__, and skill names are interned,
+    so the same skill across candidates and sessions is stored once.
+    """
+    name: str = ""
+    total_experience: float = 0.0
+    no_of_pages: int = 0
+    skills: Tuple[str, ...] = ()
+    full_text: str = ""
+
+    @classmethod
+    def from_parsed(cls, data: Dict[str, Any]) -> "CandidateRecord":
+        """Build from a parse_resume() dict (or a job result holding one)"""
+        skills = data.get("skills") or []
+        return cls(
+            name=data.get("name") or "",
+            total_experience=_number(data.get("total_experience")),
+            no_of_pages=int(_number(data.get("no_of_pages"))),
+            skills=tuple(sys.intern(str(skill)) for skill in skills),
+            full_text=data.get("full_text") or "",
+        )
+
+    @classmethod
+    def coerce(cls, candidate: Union["CandidateRecord", Dict[str, Any]]) -> "CandidateRecord":
+        return candidate if isinstance(candidate, cls) else cls.from_parsed(candidate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, e.g. for job payloads"""
+        data = self._asdict()
+        data["skills"] = list(self.skills)
+        return data
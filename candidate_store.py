@@ -0,0 +1,466 @@
+# candidate_store.py
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from candidate_record import CandidateRecord
+from job_profile import JobProfile, get_job_profile
+from skill_taxonomy import skill_key
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "candidates.db")
+# Bumped when skill keys change; older stores are re-indexed from their records on open
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    resume_sha256 TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    total_experience REAL NOT NULL,
+    no_of_pages INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidate_details (
+    candidate_id INTEGER PRIMARY KEY,
+    record TEXT NOT NULL,
+    vector BLOB
+);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    skill TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, candidate_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS skill_counts (
+    skill TEXT PRIMARY KEY,
+    candidates INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidates_experience ON candidates(total_experience);
+CREATE INDEX IF NOT EXISTS idx_candidates_pages ON candidates(no_of_pages);
+"""
+
+# Ids bound per "IN (...)" query, well under SQLite's host-parameter limit (999 in older builds)
+_IDS_PER_QUERY = 500
+
+_TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+_OPERATORS = ("AND", "OR", "NOT")
+
+
+def normalize_skill(skill: str) -> str:
+    """Key a skill is indexed and queried under: its taxonomy ID (so "ML" finds "Machine Learning"), else lowercased"""
+    return skill_key(skill)
+
+
+def parse_skill_query(query: str) -> Optional[tuple]:
+    """
+    Parse a boolean skill query into a tree
+
+    Skills are combined with AND, OR, NOT and parentheses; AND binds tighter
+    than OR. Adjacent words form one skill, and quotes keep an operator word
+    inside a skill name, e.g. `kubernetes AND (python OR go) AND NOT "r and d"`.
+
+    Args:
+        query: Query text; operators must be upper case
+
+    Returns:
+        ("skill", name), ("and", [nodes]), ("or", [nodes]) or ("not", node);
+        None for a blank query
+
+    Raises:
+        ValueError: If the query is malformed
+    """
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        return None
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take() -> str:
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def expression() -> tuple:
+        nodes = [term()]
+        while peek() == "OR":
+            take()
+            nodes.append(term())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def term() -> tuple:
+        nodes = [factor()]
+        while peek() == "AND":
+            take()
+            nodes.append(factor())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def factor() -> tuple:
+        token = peek()
+        if token is None:
+            raise ValueError("Skill query ends where a skill was expected")
+        if token == "NOT":
+            take()
+            return ("not", factor())
+        if token == "(":
+            take()
+            node = expression()
+            if peek() != ")":
+                raise ValueError("Unbalanced parentheses in skill query")
+            take()
+            return node
+        if token == ")" or token in _OPERATORS:
+            raise ValueError(f"Unexpected {token!r} in skill query")
+        words = []
+        while peek() is not None and peek() not in _OPERATORS and peek() not in ("(", ")"):
+            words.append(take().strip('"'))
+        skill = normalize_skill(" ".join(words))
+        if not skill:
+            raise ValueError("Empty skill in query")
+        return ("skill", skill)
+
+    tree = expression()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected {tokens[pos]!r} in skill query")
+    return tree
+
+
+def _select_in(conn: sqlite3.Connection, sql: str, ids: Sequence[int]) -> Iterator[sqlite3.Row]:
+    """Rows of `sql`, which ends in "IN", for every id, querying in chunks of _IDS_PER_QUERY"""
+    for start in range(0, len(ids), _IDS_PER_QUERY):
+        chunk = ids[start:start + _IDS_PER_QUERY]
+        yield from conn.execute(f"{sql} ({','.join('?' * len(chunk))})", chunk)
+
+
+def _condition(node: tuple) -> Tuple[str, List[Any]]:
+    """SQL condition on candidates row `c` for a parsed skill query; each skill is one posting lookup"""
+    kind = node[0]
+    if kind == "skill":
+        return "EXISTS (SELECT 1 FROM candidate_skills WHERE skill = ? AND candidate_id = c.id)", [node[1]]
+    if kind == "not":
+        sql, params = _condition(node[1])
+        return f"NOT {sql}", params
+    parts = [_condition(child) for child in node[1]]
+    joiner = " AND " if kind == "and" else " OR "
+    return "(" + joiner.join(sql for sql, _ in parts) + ")", [p for _, ps in parts for p in ps]
+
+
+def _skills(node: tuple) -> Iterator[tuple]:
+    if node[0] == "skill":
+        yield node
+    elif node[0] == "not":
+        yield from _skills(node[1])
+    else:
+        for child in node[1]:
+            yield from _skills(child)
+
+
+def _selectivity(node: tuple, counts: Dict[str, int], total: int) -> float:
+    """Estimated fraction of candidates matching, assuming skills occur independently"""
+    kind = node[0]
+    if kind == "skill":
+        return counts.get(node[1], 0) / total
+    if kind == "not":
+        return 1.0 - _selectivity(node[1], counts, total)
+    fractions = [_selectivity(child, counts, total) for child in node[1]]
+    if kind == "and":
+        return float(np.prod(fractions))
+    return 1.0 - float(np.prod([1.0 - f for f in fractions]))
+
+
+def _driver(node: tuple, counts: Dict[str, int]) -> Optional[List[str]]:
+    """Smallest set of skills every match holds at least one of, or None if the query has none (e.g. NOT x)"""
+    kind = node[0]
+    if kind == "skill":
+        return [node[1]]
+    if kind == "not":
+        return None
+    drivers = [_driver(child, counts) for child in node[1]]
+    if kind == "or":
+        return None if None in drivers else [skill for driver in drivers for skill in driver]
+    drivers = [driver for driver in drivers if driver is not None]
+    return min(drivers, key=lambda d: sum(counts.get(skill, 0) for skill in d)) if drivers else None
+
+
+class CandidateHit(NamedTuple):
+    candidate_id: int
+    name: str
+    total_experience: float
+    no_of_pages: int
+    score: Optional[float] = None
+
+
+class CandidateStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        Persistent, queryable archive of parsed candidates
+
+        Every candidate is filed under its normalized skills in an inverted
+        index (skill -> candidate ids, one B-tree in a WITHOUT ROWID table),
+        and experience and page count have their own indexes. A boolean skill
+        query becomes a condition of correlated EXISTS probes, one posting
+        lookup per skill named; when the skill counts say matches are rare,
+        the postings of the query's rarest required skill(s) pick the
+        candidates to probe instead of a walk of the experience index (see
+        _plan). Stored embeddings let matches be scored against a JD without
+        re-encoding.
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._reindex(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _reindex(conn: sqlite3.Connection):
+        """Rebuild the skill postings and counts from the stored records"""
+        conn.execute("DELETE FROM candidate_skills")
+        conn.execute("DELETE FROM skill_counts")
+        for row in conn.execute("SELECT candidate_id, record FROM candidate_details").fetchall():
+            skills = {normalize_skill(skill) for skill in json.loads(row["record"]).get("skills", [])} - {""}
+            conn.executemany("INSERT INTO candidate_skills (skill, candidate_id) VALUES (?, ?)",
+                             [(skill, row["candidate_id"]) for skill in skills])
+        conn.execute("INSERT INTO skill_counts (skill, candidates) "
+                     "SELECT skill, COUNT(*) FROM candidate_skills GROUP BY skill")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, resume_sha256: str, candidate: Union[Dict[str, Any], CandidateRecord],
+            vector: Optional[np.ndarray] = None) -> int:
+        """
+        Store (or refresh) the candidate parsed from one resume
+
+        Args:
+            resume_sha256: Hash of the resume file, so re-uploads update one row
+            candidate: Parsed resume dict or CandidateRecord
+            vector: The resume's normalized embedding, if already computed
+
+        Returns:
+            The candidate id
+        """
+        record = CandidateRecord.coerce(candidate)
+        blob = np.asarray(vector, dtype=np.float32).tobytes() if vector is not None else None
+        skills = {normalize_skill(skill) for skill in record.skills} - {""}
+        with self._connect() as conn:
+            previous = conn.execute(
+                "SELECT c.id, d.record FROM candidates c JOIN candidate_details d ON d.candidate_id = c.id "
+                "WHERE c.resume_sha256 = ?", (resume_sha256,)
+            ).fetchone()
+            if previous is not None:
+                # Postings are keyed (skill, id), so drop the old ones by skill rather than scanning for the id
+                old_skills = {normalize_skill(skill) for skill in json.loads(previous["record"]).get("skills", [])} - {""}
+                conn.executemany("DELETE FROM candidate_skills WHERE skill = ? AND candidate_id = ?",
+                                 [(skill, previous["id"]) for skill in old_skills])
+                conn.executemany("UPDATE skill_counts SET candidates = candidates - 1 WHERE skill = ?",
+                                 [(skill,) for skill in old_skills])
+            conn.execute(
+                "INSERT INTO candidates (resume_sha256, name, total_experience, no_of_pages, created_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(resume_sha256) DO UPDATE SET name = excluded.name, "
+                "total_experience = excluded.total_experience, no_of_pages = excluded.no_of_pages",
+                (resume_sha256, record.name, record.total_experience, record.no_of_pages, time.time()),
+            )
+            candidate_id = conn.execute(
+                "SELECT id FROM candidates WHERE resume_sha256 = ?", (resume_sha256,)
+            ).fetchone()["id"]
+            conn.execute(
+                "INSERT INTO candidate_details (candidate_id, record, vector) VALUES (?, ?, ?) "
+                "ON CONFLICT(candidate_id) DO UPDATE SET record = excluded.record, "
+                "vector = COALESCE(excluded.vector, candidate_details.vector)",
+                (candidate_id, json.dumps(record.to_dict()), blob),
+            )
+            conn.executemany("INSERT INTO candidate_skills (skill, candidate_id) VALUES (?, ?)",
+                             [(skill, candidate_id) for skill in skills])
+            conn.executemany(
+                "INSERT INTO skill_counts (skill, candidates) VALUES (?, 1) "
+                "ON CONFLICT(skill) DO UPDATE SET candidates = candidates + 1",
+                [(skill,) for skill in skills],
+            )
+            return candidate_id
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def get(self, candidate_id: int) -> Optional[CandidateRecord]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT record FROM candidate_details WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        return CandidateRecord.from_parsed(json.loads(row["record"])) if row else None
+
+    def _plan(self, conn: sqlite3.Connection, columns: str, skills: Optional[str],
+              min_experience: Optional[float], max_experience: Optional[float],
+              min_pages: Optional[int], max_pages: Optional[int], limit: Optional[int],
+              with_vectors: bool = False) -> Tuple[str, List[Any]]:
+        """
+        SQL for candidates matching the filters, most experienced first
+
+        Two plans, chosen from per-skill posting counts: walk the experience
+        index and probe each candidate's postings, which stops early when
+        matches are common and a limit is set; or start from the postings of
+        the query's rarest required skill(s), which touches only those
+        candidates when matches are rare.
+        """
+        tree = parse_skill_query(skills) if skills else None
+        clauses, params = [], []
+        driver = None
+        if tree is not None:
+            names = sorted({node[1] for node in _skills(tree)})
+            counts = dict(conn.execute(
+                f"SELECT skill, candidates FROM skill_counts WHERE skill IN ({','.join('?' * len(names))})", names
+            ).fetchall())
+            total = max(1, conn.execute("SELECT COALESCE(MAX(id), 0) FROM candidates").fetchone()[0])
+            driver = _driver(tree, counts)
+            scanned = total if not limit else min(total, limit / max(_selectivity(tree, counts, total), 1 / total))
+            if driver is not None and sum(counts.get(skill, 0) for skill in driver) > scanned:
+                driver = None
+            if driver is not None:
+                clauses.append(f"c.id IN (SELECT candidate_id FROM candidate_skills WHERE skill IN "
+                               f"({','.join('?' * len(driver))}))")
+                params.extend(driver)
+            condition, condition_params = _condition(tree)
+            clauses.append(condition)
+            params.extend(condition_params)
+
+        # With a driver, a unary + keeps SQLite from walking the range index instead
+        prefix = "+" if driver is not None else ""
+        for column, op, value in (("total_experience", ">=", min_experience), ("total_experience", "<=", max_experience),
+                                  ("no_of_pages", ">=", min_pages), ("no_of_pages", "<=", max_pages)):
+            if value is not None:
+                clauses.append(f"{prefix}c.{column} {op} ?")
+                params.append(value)
+
+        sql = f"SELECT {columns} FROM candidates c"
+        if with_vectors:
+            # Records and vectors live in their own table, so filtering only reads the narrow candidate rows
+            sql += " LEFT JOIN candidate_details d ON d.candidate_id = c.id"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit:
+            sql += " ORDER BY c.total_experience DESC LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def search(self, skills: Optional[str] = None, min_experience: Optional[float] = None,
+               max_experience: Optional[float] = None, min_pages: Optional[int] = None,
+               max_pages: Optional[int] = None, limit: Optional[int] = 100) -> List[CandidateHit]:
+        """
+        Candidates matching a boolean skill query and numeric ranges, most experienced first
+
+        Args:
+            skills: Query for parse_skill_query, e.g. "kubernetes AND (python OR go)"; None for any
+            min_experience: Fewest years of total experience
+            max_experience: Most years of total experience
+            min_pages: Fewest resume pages
+            max_pages: Most resume pages
+            limit: Maximum number of hits; None for all
+
+        Raises:
+            ValueError: If the skill query is malformed
+        """
+        with self._connect() as conn:
+            sql, params = self._plan(conn, "c.id, c.name, c.total_experience, c.no_of_pages", skills,
+                                     min_experience, max_experience, min_pages, max_pages, limit)
+            if not limit:
+                sql += " ORDER BY c.total_experience DESC"
+            return [CandidateHit(*row) for row in conn.execute(sql, params)]
+
+    def rank(self, job_description: Union[str, JobProfile], skills: Optional[str] = None,
+             min_experience: Optional[float] = None, max_experience: Optional[float] = None,
+             min_pages: Optional[int] = None, max_pages: Optional[int] = None,
+             limit: int = 20) -> List[CandidateHit]:
+        """
+        Score every candidate matching the filters against a JD and return the best
+
+        Stored embeddings are scored in one matrix product; candidates stored
+        without one are encoded in a single batch and their vectors saved.
+
+        Args:
+            job_description: Job description text, or its shared JobProfile
+            skills, min_experience, max_experience, min_pages, max_pages: As for search()
+            limit: Number of hits to return
+
+        Returns:
+            Hits with `score` set, best match first
+        """
+        profile = get_job_profile(job_description)
+        with self._connect() as conn:
+            sql, params = self._plan(conn, "c.id, d.vector", skills,
+                                     min_experience, max_experience, min_pages, max_pages, None, with_vectors=True)
+            rows = conn.execute(sql, params).fetchall()
+        if not rows:
+            return []
+
+        ids = np.fromiter((row["id"] for row in rows), dtype=np.int64, count=len(rows))
+        vectors = np.zeros((len(rows), len(profile.vector)), dtype=np.float32)
+        missing = []
+        for i, row in enumerate(rows):
+            if row["vector"]:
+                vectors[i] = np.frombuffer(row["vector"], dtype=np.float32)
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = self._encode_missing(ids[missing])
+
+        scores = vectors @ profile.vector
+        top = np.argsort(-scores)[:limit] if limit >= len(scores) else np.argpartition(-scores, limit)[:limit]
+        top = top[np.argsort(-scores[top])]
+        with self._connect() as conn:
+            details = {
+                row["id"]: row for row in _select_in(
+                    conn, "SELECT id, name, total_experience, no_of_pages FROM candidates WHERE id IN",
+                    [int(ids[i]) for i in top]
+                )
+            }
+        return [
+            CandidateHit(int(ids[i]), details[int(ids[i])]["name"], details[int(ids[i])]["total_experience"],
+                         details[int(ids[i])]["no_of_pages"], float(scores[i]))
+            for i in top
+        ]
+
+    def _encode_missing(self, candidate_ids: Sequence[int]) -> np.ndarray:
+        # Imported here so filtering and searching never load MiniLM
+        from jd_matcher import encode
+        ids = [int(i) for i in candidate_ids]
+        with self._connect() as conn:
+            texts = {
+                row["candidate_id"]: json.loads(row["record"]).get("full_text", "")
+                for row in _select_in(conn, "SELECT candidate_id, record FROM candidate_details WHERE candidate_id IN", ids)
+            }
+        vectors = encode([texts[i] for i in ids]).astype(np.float32)
+        with self._connect() as conn:
+            conn.executemany("UPDATE candidate_details SET vector = ? WHERE candidate_id = ?",
+                             [(vector.tobytes(), i) for vector, i in zip(vectors, ids)])
+        return vectors
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_candidate_store() -> CandidateStore:
+    """Process-wide candidate store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CandidateStore()
+        return _store
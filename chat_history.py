@@ -0,0 +1,55 @@
+# chat_history.py
+import sys
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple
+
+
+class ChatMessage(NamedTuple):
+    role: str
+    kind: str
+    ref: Hashable
+
+
+class ChatHistory:
+    def __init__(self, renderers: Dict[str, Callable[[Any], str]], max_messages: int = 100):
+        """
+        Capped chat history that stores references instead of rendered text
+
+        Each message is a (role, kind, ref) record. "text" messages hold their
+        own string; any other kind is resolved through `renderers` at display
+        time, so shared content such as static blocks or memoized plans is
+        held once per process rather than once per message per session.
+
+        Args:
+            renderers: Maps a message kind to a function turning its ref into markdown
+            max_messages: Oldest messages are dropped beyond this many
+        """
+        self.renderers = renderers
+        self._messages = deque(maxlen=max_messages)
+
+    def add(self, role: str, kind: str, ref: Hashable):
+        if kind != "text" and kind not in self.renderers:
+            raise ValueError(f"Unknown message kind: {kind}")
+        if isinstance(ref, str) and kind != "text":
+            ref = sys.intern(ref)
+        self._messages.append(ChatMessage(sys.intern(role), sys.intern(kind), ref))
+
+    def add_text(self, role: str, text: str):
+        self.add(role, "text", text)
+
+    def render(self, message: ChatMessage) -> str:
+        if message.kind == "text":
+            return message.ref
+        return self.renderers[message.kind](message.ref)
+
+    def window(self, size: int) -> List[ChatMessage]:
+        """The most recent `size` messages, oldest first"""
+        if size >= len(self._messages):
+            return list(self._messages)
+        return list(self._messages)[-size:]
+
+    def clear(self):
+        self._messages.clear()
+
+    def __len__(self) -> int:
+        return len(self._messages)
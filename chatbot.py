@@ -1,69 +1,140 @@
 # chatbot.py
 import ollama
+import hashlib
 import json
-from typing import Dict, Any, List
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Union
+from semantic_cache import DEFAULT_THRESHOLD, SemanticCache, get_semantic_cache
+from retrieval import PassageIndex, estimate_tokens
+from model_router import TASK_PROFILES, get_model_router
+from bounded_chat import BoundedChat
+from degraded_mode import DegradedAnswers, get_ollama_health
+from job_profile import JobProfile, get_job_profile
+from metrics import ASK_SECONDS, DEGRADED_ANSWERS, LLM_ERRORS, PROMPT_TOKENS, error_category
+from profiler import profiled
+from candidate_record import CandidateRecord
+
+# Preferred model order
+PREFERRED_MODELS = ['llama3.2', 'llama3.1', 'llama2', 'mistral', 'codellama']
+
+def get_available_model() -> Optional[str]:
+    """Get the first installed Ollama model, favouring PREFERRED_MODELS"""
+    try:
+        models = ollama.list()
+        if models['models']:
+            available_models = [model['name'] for model in models['models']]
+            
+            # Try to find preferred model
+            for preferred in PREFERRED_MODELS:
+                for available in available_models:
+                    if preferred in available:
+                        return available
+            
+            # If no preferred model found, return first available
+            return available_models[0]
+        else:
+            return None
+    except Exception as e:
+        print(f"Error getting models: {e}")
+        return None
 
 class HRChatbot:
-    def __init__(self, candidate_data: Dict[str, Any], job_description: str, match_score: float):
+    def __init__(self, candidate_data: Union[Dict[str, Any], CandidateRecord], job_description: Union[str, JobProfile], match_score: float,
+                 cache_threshold: float = DEFAULT_THRESHOLD, context_token_budget: int = 600,
+                 model: Optional[str] = None, deadline: Optional[float] = None):
         """
         Initialize HR Chatbot with candidate data and job description
         
         Args:
-            candidate_data: Dictionary containing candidate information
-            job_description: Job description text
+            candidate_data: Parsed resume dict, or its CandidateRecord
+            job_description: Job description text, or its shared JobProfile
             match_score: Similarity score between resume and JD
+            cache_threshold: Question similarity above which a past answer is reused
+            context_token_budget: Resume and JD passages retrieved into each prompt
+            model: Force one Ollama model for every call (also via OLLAMA_MODEL)
+            deadline: Seconds a generation may run before its partial text is returned;
+                the task's latency budget if None
         """
-        self.candidate_data = candidate_data
-        self.job_description = job_description
+        self.candidate = CandidateRecord.coerce(candidate_data)
+        # JD embeddings, passages and skills are built once per JD and shared by every candidate
+        self.job_profile = get_job_profile(job_description)
+        self.job_description = self.job_profile.job_description
         self.match_score = match_score
-        self.model = self._get_available_model()
+        self.cache_threshold = cache_threshold
+        self.context_token_budget = context_token_budget
+        self.deadline = deadline
+        # One bot serves every session asking about this candidate and JD, so per-call state stays off it
+        self._passages = None
+        self._passages_lock = threading.Lock()
+        self.model_override = model or os.environ.get("OLLAMA_MODEL")
+        self.model_router = get_model_router()
+        # Answers come from the rules while Ollama is down or saturated
+        self.fallback = DegradedAnswers(self.candidate, self.job_profile, match_score)
+        running = get_ollama_health().status().running
+        self.model = self._select_model("interactive") if running or self.model_override else None
         
-        if not self.model:
+        if not self.model and running:
             raise Exception("No Ollama models found. Please install a model first: 'ollama pull llama3.2'")
         
         # Create context for the HR bot
         self.context = self._create_context()
     
+    def _answer_cache(self, model: Optional[str], task: str) -> SemanticCache:
+        """Answers to near-identical questions, shared per (candidate, JD, answering model, task)"""
+        return get_semantic_cache(
+            self.candidate.full_text, self.job_description, model or "", task,
+            threshold=self.cache_threshold
+        )
+    
+    @property
+    def answer_cache(self) -> SemanticCache:
+        """Cache of quick answers from the bot's interactive model"""
+        return self._answer_cache(self.model, "interactive")
+    
     def _get_available_model(self) -> str:
         """Get the first available model from Ollama"""
+        return get_available_model()
+    
+    def _select_model(self, task: str, latency_budget: Optional[float] = None) -> Optional[str]:
+        """Model for a kind of call: the override, else the router's pick, else the first preferred model"""
+        if self.model_override:
+            return self.model_override
         try:
-            models = ollama.list()
-            if models['models']:
-                # Preferred model order
-                preferred_models = ['llama3.2', 'llama3.1', 'llama2', 'mistral', 'codellama']
-                
-                available_models = [model['name'] for model in models['models']]
-                
-                # Try to find preferred model
-                for preferred in preferred_models:
-                    for available in available_models:
-                        if preferred in available:
-                            return available
-                
-                # If no preferred model found, return first available
-                return available_models[0]
-            else:
-                return None
+            selected = self.model_router.select(task, latency_budget)
         except Exception as e:
-            print(f"Error getting models: {e}")
-            return None
+            print(f"Error selecting model: {e}")
+            selected = None
+        return selected or self._get_available_model()
+    
+    def _route(self, task: str, latency_budget: Optional[float] = None) -> Optional[str]:
+        """Model that will answer the call, chosen before the cache lookup so the lookup uses its scope"""
+        if not self.model_override and not get_ollama_health().status().running:
+            # The router cannot list models while Ollama is down; look up under the last known model
+            return self.model
+        return self._select_model(task, latency_budget)
     
     def _create_context(self) -> str:
         """Create context for the HR chatbot based on candidate and job data"""
+        skills = self.candidate.skills
+        matched = ", ".join(sorted(self.job_profile.matched_skills(skills))) or "None"
+        missing = ", ".join(sorted(self.job_profile.missing_skills(skills))) or "None"
         context = f"""
         You are an expert HR assistant helping with candidate evaluation. You have access to the following information:
 
         CANDIDATE INFORMATION:
-        - Name: {self.candidate_data.get('name', 'Not provided')}
-        - Total Experience: {self.candidate_data.get('total_experience', 0)} years
-        - Resume Pages: {self.candidate_data.get('no_of_pages', 0)}
-        - Skills and Experience: {self.candidate_data.get('full_text', '')[:1000]}...
-
-        JOB DESCRIPTION:
-        {self.job_description}
+        - Name: {self.candidate.name or 'Not provided'}
+        - Total Experience: {self.candidate.total_experience:g} years
+        - Resume Pages: {self.candidate.no_of_pages}
 
         MATCH SCORE: {self.match_score * 100:.2f}%
 
+        {self.job_profile.prompt_section}
+        - Required skills the candidate lists: {matched}
+        - Required skills not on the resume: {missing}
+
         INSTRUCTIONS:
         - Provide professional, helpful responses about this candidate
         - Base your analysis on the resume content and job requirements
@@ -74,56 +145,185 @@ class HRChatbot:
         """
         return context
     
-    def ask(self, question: str) -> str:
+    @profiled("hr_ask")
+    def ask(self, question: str, task: str = "interactive", latency_budget: Optional[float] = None,
+            cancel: Optional[threading.Event] = None, background: bool = False) -> str:
         """
         Ask a question to the HR chatbot
         
         Args:
             question: The question to ask
+            task: "interactive" for quick questions, "analysis" for in-depth reports
+            latency_budget: Seconds the call may take; the task default if None
+            cancel: Set from another thread to stop generating and return the text so far
+            background: Speculative call that yields Ollama slots to interactive ones
             
         Returns:
-            The bot's response
+            The bot's response, ending in a truncation marker if it was cut short,
+            or a labelled rule-based answer while Ollama is down or saturated
         """
+        model = self.model
         try:
-            # Create the full prompt
-            prompt = f"""
-            {self.context}
-            
-            QUESTION: {question}
+            with ASK_SECONDS.labels(task).time():
+                # One question embedding serves both the answer cache and retrieval
+                vector = self.answer_cache.embed([question])[0]
+                model = self._route(task, latency_budget)
+                answer = self._answer_cache(model, task).lookup(question, vector)
+                if answer is None:
+                    reason = get_ollama_health().degraded_reason()
+                    if reason:
+                        return self._degraded(question, reason, "unhealthy")
+                    chat = self._bounded_chat(question, vector, model, self._deadline(task, latency_budget),
+                                              cancel, background)
+                    answer = "".join(chat)
+                    # Cut-short answers are returned but never reused; a hedge's answer is filed under its model
+                    if not chat.truncated:
+                        self._answer_cache(chat.model, task).store(question, answer, vector)
+            return answer
             
-            Please provide a professional HR response based on the candidate information and job requirements provided above.
-            """
+        except Exception as e:
+            LLM_ERRORS.labels(error_category(e)).inc()
+            return self._degraded(question, self._error_reason(e, model), "error")
+    
+    def ask_stream(self, question: str, raise_errors: bool = False, task: str = "interactive",
+                   cancel: Optional[threading.Event] = None,
+                   answered: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Ask a question and yield the response as it is generated
+        
+        Cached answers are yielded whole; a fresh answer is cached once it completes.
+        
+        Args:
+            question: The question to ask
+            raise_errors: Re-raise Ollama failures instead of yielding a rule-based answer
+            task: "interactive" or "analysis", as for ask
+            cancel: Set from another thread to stop early, as for ask
+            answered: Filled in with "model", the model whose answer was yielded
+                (after routing, hedging or a cache hit), or None for a rule-based answer
             
-            # Call Ollama with timeout
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                options={
-                    'temperature': 0.7,
-                    'top_p': 0.9,
-                    'num_predict': 500  # Limit response length
-                }
-            )
+        Returns:
+            An iterator of response text chunks
+        """
+        model = self.model
+        answered = answered if answered is not None else {}
+        answered["model"] = None
+        started = time.perf_counter()
+        try:
+            vector = self.answer_cache.embed([question])[0]
+            model = self._route(task)
+            answer = self._answer_cache(model, task).lookup(question, vector)
+            if answer is not None:
+                answered["model"] = model
+                yield answer
+                return
+            reason = get_ollama_health().degraded_reason()
+            if reason:
+                yield self._degraded(question, reason, "unhealthy")
+                return
             
-            return response['message']['content']
+            chunks = []
+            chat = self._bounded_chat(question, vector, model, self._deadline(task), cancel)
+            for chunk in chat:
+                # Settled by the first chunk: the hedge or the primary, whichever answered first
+                answered["model"] = chat.model
+                chunks.append(chunk)
+                yield chunk
+            if not chat.truncated:
+                self._answer_cache(chat.model, task).store(question, "".join(chunks), vector)
             
         except Exception as e:
-            error_msg = str(e)
-            if "not found" in error_msg:
-                return f"Model '{self.model}' not found. Please install it with: ollama pull {self.model}"
-            elif "connection" in error_msg.lower():
-                return "Cannot connect to Ollama. Please make sure Ollama is running (run 'ollama serve' in terminal)."
-            else:
-                return f"Error: {error_msg}. Please check your Ollama installation."
+            LLM_ERRORS.labels(error_category(e)).inc()
+            if raise_errors:
+                raise
+            answered["model"] = None
+            yield self._degraded(question, self._error_reason(e, model), "error")
+        finally:
+            ASK_SECONDS.labels(task).observe(time.perf_counter() - started)
+    
+    def _error_reason(self, e: Exception, model: Optional[str]) -> str:
+        """Turn an Ollama failure into the reason shown on the fallback answer"""
+        category = error_category(e)
+        if category == "not_found":
+            return f"model '{model}' is not installed (run: ollama pull {model})"
+        elif category == "connection":
+            return "Ollama cannot be reached (run 'ollama serve' in a terminal)"
+        elif isinstance(e, TimeoutError):
+            return "the AI model is busy"
+        else:
+            return f"the AI model failed ({e})"
+    
+    def _degraded(self, question: str, reason: str, cause: str) -> str:
+        """Labelled rule-based answer; never cached, so the model answers once it is back"""
+        DEGRADED_ANSWERS.labels(cause).inc()
+        return self.fallback.answer(question, reason)
+    
+    def _retrieve(self, question: str, vector=None) -> str:
+        """Resume and JD passages most relevant to the question, within the token budget"""
+        with self._passages_lock:
+            if self._passages is None:
+                # Resume chunks are embedded once per candidate, on the first question; JD chunks come from the profile
+                self._passages = PassageIndex.merge([
+                    PassageIndex([("resume", self.candidate.full_text)]),
+                    self.job_profile.passages,
+                ])
+        passages = self._passages.search(question, self.context_token_budget, vector=vector)
+        resume = "\n".join(f"- {p.text}" for p in passages if p.source == "resume") or "- (no relevant resume passages)"
+        job = "\n".join(f"- {p.text}" for p in passages if p.source == "job") or "- (no relevant job description passages)"
+        return f"RELEVANT RESUME EXCERPTS:\n{resume}\n\nRELEVANT JOB DESCRIPTION EXCERPTS:\n{job}"
+    
+    def _build_prompt(self, question: str, vector=None) -> str:
+        """Create the full prompt"""
+        prompt = f"""
+        {self.context}
+        
+        {self._retrieve(question, vector)}
+        
+        QUESTION: {question}
+        
+        Please provide a professional HR response based on the candidate information and job requirements provided above.
+        """
+        PROMPT_TOKENS.observe(estimate_tokens(prompt))
+        return prompt
+    
+    def _options(self) -> Dict[str, Any]:
+        return {
+            'temperature': 0.7,
+            'top_p': 0.9,
+            'num_predict': 500  # Limit response length
+        }
+    
+    def _deadline(self, task: str, latency_budget: Optional[float] = None) -> float:
+        """Hard time limit for one generation"""
+        return latency_budget or self.deadline or TASK_PROFILES[task]["latency_budget"]
+    
+    def _bounded_chat(self, question: str, vector, model: str, deadline: float,
+                      cancel: Optional[threading.Event] = None, background: bool = False) -> BoundedChat:
+        """A deadline-bound generation for the question, hedged to a faster model if one is measured"""
+        hedge_model = None
+        if not self.model_override and not background:
+            try:
+                hedge_model = self.model_router.faster_than(model)
+            except Exception as e:
+                print(f"Error selecting hedge model: {e}")
+        
+        # Runs under the process-wide concurrency limit
+        return BoundedChat(
+            model,
+            [{'role': 'user', 'content': self._build_prompt(question, vector)}],
+            self._options(),
+            deadline,
+            hedge_model=hedge_model,
+            cancel=cancel,
+            background=background,
+        )
     
     def get_model_info(self) -> str:
         """Get information about the current model"""
-        return f"Using model: {self.model}"
+        if self.model_override:
+            return f"Using model: {self.model_override} (override)"
+        interactive = self.model_router.describe(self._select_model("interactive"))
+        analysis = self.model_router.describe(self._select_model("analysis"))
+        return f"Using model: {interactive} for quick questions, {analysis} for in-depth analysis"
     
     def get_recommendation(self) -> str:
         """Get a detailed recommendation for the candidate"""
@@ -135,7 +335,7 @@ class HRChatbot:
         3. Overall recommendation (Shortlist/Reject)
         4. Suggested interview focus areas
         """
-        return self.ask(question)
+        return self.ask(question, task="analysis")
     
     def get_interview_questions(self) -> str:
         """Generate relevant interview questions for this candidate"""
@@ -160,15 +360,48 @@ class HRChatbot:
         4. Additional value they bring
         5. Risk factors to consider
         """
-        return self.ask(question)
+        return self.ask(question, task="analysis")
     
     def get_salary_guidance(self) -> str:
         """Get salary range guidance based on experience and role"""
         question = f"""
-        Based on the candidate's experience level ({self.candidate_data.get('total_experience', 0)} years) 
+        Based on the candidate's experience level ({self.candidate.total_experience:g} years) 
         and the job requirements, provide guidance on:
         1. Appropriate salary range expectations
         2. Negotiation points
         3. Factors that might justify higher/lower offers
         """
-        return self.ask(question)
\ No newline at end of file
+        return self.ask(question)
+
+
+_bots: "OrderedDict[str, HRChatbot]" = OrderedDict()
+_bots_lock = threading.Lock()
+
+
+def get_hr_chatbot(candidate_data: Union[Dict[str, Any], CandidateRecord], job_description: Union[str, JobProfile],
+                   match_score: float, max_bots: int = 64) -> HRChatbot:
+    """
+    Process-wide HRChatbot per (candidate, JD, score)
+
+    Sessions looking at the same candidate share one bot, with its context,
+    retrieval passages and answer cache, instead of each building a copy.
+    """
+    candidate = CandidateRecord.coerce(candidate_data)
+    profile = get_job_profile(job_description)
+    key = hashlib.sha256(
+        "\x00".join([candidate.full_text, candidate.name, profile.digest, f"{match_score:.6f}"]).encode("utf-8")
+    ).hexdigest()
+    with _bots_lock:
+        bot = _bots.get(key)
+        if bot is not None:
+            _bots.move_to_end(key)
+            return bot
+
+    # Built outside the lock: the first build may benchmark models
+    bot = HRChatbot(candidate, profile, match_score)
+    with _bots_lock:
+        bot = _bots.setdefault(key, bot)
+        _bots.move_to_end(key)
+        if len(_bots) > max_bots:
+            _bots.popitem(last=False)
+        return bot
@@ -0,0 +1,209 @@
+# degraded_mode.py
+import os
+import re
+import threading
+import time
+from typing import NamedTuple, Optional, Sequence
+
+import ollama
+
+from candidate_record import CandidateRecord
+from job_profile import JobProfile
+from llm_gate import LLMGate, default_gate
+
+# Expected seconds in the Ollama queue beyond which answers come from the rules instead
+DEGRADED_QUEUE_WAIT = float(os.environ.get("DEGRADED_QUEUE_WAIT", "15"))
+# Seconds an Ollama health check may take before the server counts as down
+HEALTH_TIMEOUT = float(os.environ.get("OLLAMA_HEALTH_TIMEOUT", "2"))
+HEALTH_TTL = float(os.environ.get("OLLAMA_HEALTH_TTL", "15"))
+
+# Same cut-off as the HR app's shortlist decision
+SHORTLIST_SCORE = 0.75
+
+DEGRADED_LABEL = "⚡ _Quick answer: {reason}, so this is worked out from the match score, skill overlap and experience, not written by the AI model._\n\n"
+
+_YEARS = re.compile(r"(\d{1,2})\s*\+?\s*(?:-|to)?\s*(?:\d{1,2}\s*)?\+?\s*years?", re.IGNORECASE)
+
+
+def is_degraded(text: str) -> bool:
+    """Whether an answer is a labelled rule-based answer rather than the model's"""
+    return text.startswith(DEGRADED_LABEL.split("{")[0])
+
+
+class OllamaStatus(NamedTuple):
+    running: bool
+    models: Sequence[str]
+    error: str = ""
+    checked_at: float = 0.0
+
+
+class OllamaHealth:
+    def __init__(self, gate: LLMGate = default_gate, ttl: float = HEALTH_TTL, timeout: float = HEALTH_TIMEOUT,
+                 max_queue_wait: float = DEGRADED_QUEUE_WAIT):
+        """
+        Whether Ollama can answer right now, checked at most once per `ttl`
+
+        Args:
+            gate: Concurrency gate whose queue is watched for saturation
+            ttl: Seconds a health check result is reused
+            timeout: Seconds the model list may take before Ollama counts as down
+            max_queue_wait: Expected queue wait beyond which callers should degrade
+        """
+        self.gate = gate
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_queue_wait = max_queue_wait
+        self._status: Optional[OllamaStatus] = None
+        self._lock = threading.Lock()
+        self._checking = threading.Lock()
+
+    def _check(self) -> OllamaStatus:
+        try:
+            models = ollama.Client(timeout=self.timeout).list()["models"]
+            names = [model["name"] for model in models]
+            error = "" if names else "no models are installed"
+            return OllamaStatus(bool(names), names, error, time.monotonic())
+        except Exception as e:
+            return OllamaStatus(False, [], str(e) or type(e).__name__, time.monotonic())
+
+    def status(self, refresh: bool = False) -> OllamaStatus:
+        """
+        Latest health check, re-run when older than the TTL
+
+        Only one caller re-checks at a time; the rest keep the previous result
+        instead of queueing behind a slow server.
+        """
+        with self._lock:
+            status = self._status
+        fresh = status is not None and time.monotonic() - status.checked_at < self.ttl
+        if fresh and not refresh:
+            return status
+        if not self._checking.acquire(blocking=status is None):
+            return status
+        try:
+            status = self._check()
+            with self._lock:
+                self._status = status
+            return status
+        finally:
+            self._checking.release()
+
+    def degraded_reason(self) -> Optional[str]:
+        """Why answers should come from the rules right now, or None while Ollama can take them"""
+        if not self.status().running:
+            return "the AI model is unavailable right now"
+        wait = self.gate.expected_wait()
+        if wait > self.max_queue_wait:
+            return f"the AI model is busy (about {wait:.0f}s queue)"
+        return None
+
+
+class DegradedAnswers:
+    def __init__(self, candidate: CandidateRecord, job_profile: JobProfile, match_score: float):
+        """
+        Instant rule-based answers for the canned analyses, from data already computed
+
+        Used when Ollama is down or its queue is too long. Strengths, gaps
+        and the recommendation follow from the match score, the overlap of
+        resume skills with the JD's required skills and years of experience.
+
+        Args:
+            candidate: Parsed resume
+            job_profile: Shared profile of the JD
+            match_score: Similarity score between resume and JD
+        """
+        self.candidate = candidate
+        self.job_profile = job_profile
+        self.match_score = match_score
+        self.matched = sorted(job_profile.matched_skills(candidate.skills))
+        self.missing = sorted(job_profile.missing_skills(candidate.skills))
+        required = [int(years) for years in _YEARS.findall(job_profile.job_description)]
+        self.required_years = min(required) if required else None
+
+    def answer(self, question: str, reason: str) -> str:
+        """A labelled answer to the question, picked by its topic"""
+        text = question.lower()
+        you = "as a candidate" in text
+        if re.search(r"missing|gap|lack|improve|weak|develop|concern", text):
+            body = self.gaps(you)
+        elif re.search(r"strength|stand out|highlight", text):
+            body = self.strengths(you)
+        elif re.search(r"recommend|shortlist|reject|hire|apply|decision|chances|action plan", text):
+            body = self.recommendation(you)
+        elif "interview" in text or "prepare" in text:
+            body = self.interview_focus(you)
+        else:
+            body = self.summary(you)
+        return DEGRADED_LABEL.format(reason=reason) + body
+
+    def _subject(self, you: bool) -> str:
+        return "You" if you else "The candidate"
+
+    def _experience_line(self) -> str:
+        years = self.candidate.total_experience
+        if self.required_years is None:
+            return f"- **Experience:** {years:g} years (the job description states no minimum)"
+        verdict = "meets" if years >= self.required_years else "is below"
+        return f"- **Experience:** {years:g} years, which {verdict} the {self.required_years}+ years asked for"
+
+    def summary(self, you: bool = False) -> str:
+        required = len(self.job_profile.required_skills)
+        skills = f"{len(self.matched)} of {required} required skills" if required else "no recognised required skills"
+        return "\n".join([
+            f"- **Match score:** {self.match_score * 100:.1f}%",
+            f"- **Skills:** {skills} on the resume",
+            self._experience_line(),
+        ])
+
+    def strengths(self, you: bool = False) -> str:
+        lines = [f"**{self._subject(you)} already cover{'' if you else 's'}:**"]
+        if self.matched:
+            lines += [f"- {skill}" for skill in self.matched]
+        else:
+            lines.append("- None of the required skills recognised in the job description")
+        if self.required_years is not None and self.candidate.total_experience >= self.required_years:
+            lines.append(f"- {self.candidate.total_experience:g} years of experience against {self.required_years}+ asked for")
+        return "\n".join(lines + ["", self.summary(you)])
+
+    def gaps(self, you: bool = False) -> str:
+        lines = ["**Required skills missing from the resume:**"]
+        if self.missing:
+            lines += [f"- {skill}" for skill in self.missing]
+        elif self.job_profile.required_skills:
+            lines.append("- None: every recognised required skill is listed")
+        else:
+            lines.append("- None recognised in the job description")
+        if self.required_years is not None and self.candidate.total_experience < self.required_years:
+            short = self.required_years - self.candidate.total_experience
+            lines.append(f"- About {short:g} more years of experience than the resume shows")
+        if self.missing and you:
+            lines += ["", "Projects, certifications or coursework in these skills are the quickest way to close the gap."]
+        return "\n".join(lines)
+
+    def interview_focus(self, you: bool = False) -> str:
+        lines = ["**Likely interview focus:**"]
+        lines += [f"- Depth of hands-on work with {skill}" for skill in self.matched[:3]]
+        lines += [f"- How {'you' if you else 'they'} would get up to speed on {skill}" for skill in self.missing[:3]]
+        lines.append(f"- Examples from {self.candidate.total_experience:g} years of experience relevant to this role")
+        return "\n".join(lines)
+
+    def recommendation(self, you: bool = False) -> str:
+        if you:
+            verdict = ("✅ Apply: you are a strong match" if self.match_score >= SHORTLIST_SCORE
+                       else "🟡 Apply after addressing the gaps below, or apply now and address them in your cover letter")
+        else:
+            verdict = "✅ Shortlist" if self.match_score >= SHORTLIST_SCORE else "❌ Reject"
+        return "\n".join([f"**Recommendation:** {verdict}", "", self.summary(you), "", self.gaps(you)])
+
+
+_health = None
+_health_lock = threading.Lock()
+
+
+def get_ollama_health() -> OllamaHealth:
+    """Process-wide health monitor, so every session shares one cached check"""
+    global _health
+    with _health_lock:
+        if _health is None:
+            _health = OllamaHealth()
+        return _health
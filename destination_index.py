@@ -0,0 +1,198 @@
+# destination_index.py
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Common chat words never treated as a destination mention on their own
+_STOPWORDS = {
+    "about", "after", "also", "best", "cheap", "could", "does", "each", "from",
+    "give", "have", "help", "like", "make", "many", "much", "need", "plan",
+    "should", "tell", "that", "there", "they", "this", "time", "trip", "visa",
+    "visit", "want", "what", "when", "where", "which", "with", "would", "your",
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once it exceeds `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class DestinationIndex:
+    def __init__(self, destinations: Iterable[Tuple[str, Dict[str, Any]]],
+                 min_score: float = 0.75, max_candidates: int = 50):
+        """
+        Build the lookup tables for free-text destination resolution
+
+        Args:
+            destinations: (key, record) pairs; records need a "name" such as
+                "Paris, France" and may carry an "aliases" list
+            min_score: Minimum similarity for a fuzzy match to resolve
+            max_candidates: Trigram candidates re-ranked by edit distance
+        """
+        self.min_score = min_score
+        self.max_candidates = max_candidates
+
+        self._exact: Dict[str, str] = {}
+        self._tokens: Dict[str, set] = defaultdict(set)
+        self._names: List[Tuple[str, str, int]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for key, record in destinations:
+            name = record.get("name", key)
+            city, _, country = name.partition(",")
+            names = {normalize(key), normalize(name), normalize(city)}
+            names.update(normalize(alias) for alias in record.get("aliases", []))
+            names.discard("")
+
+            for alias in names:
+                self._exact.setdefault(alias, key)
+                self._add_name(alias, key)
+
+            # Country tokens can match several cities, so they never resolve
+            # on their own unless the country has a single entry
+            country = normalize(country)
+            if country:
+                self._tokens[country].add(key)
+
+    def _add_name(self, alias: str, key: str):
+        name_id = len(self._names)
+        grams = set(_trigrams(alias))
+        self._names.append((alias, key, len(grams)))
+        for gram in grams:
+            self._postings[gram].append(name_id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Return the destination key for `query`, or None if unknown or ambiguous"""
+        matches = self.suggest(query, limit=2)
+        if not matches:
+            return None
+        key, score = matches[0]
+        if score < self.min_score:
+            return None
+        if len(matches) > 1 and matches[1][1] == score:
+            return None
+        return key
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Exact name or alias lookup, without fuzzy matching"""
+        return self._exact.get(normalize(name))
+
+    def find_in_text(self, text: str, fuzzy_words: int = 3) -> Optional[str]:
+        """
+        Find a destination mentioned anywhere in a sentence
+
+        Args:
+            text: Free text such as "what's the weather like in tokio in May?"
+            fuzzy_words: How many of the longest words get a typo-tolerant lookup
+
+        Returns:
+            The destination key, or None
+        """
+        words = normalize(text).split()
+
+        # Exact names and aliases first, longest phrase wins
+        for size in (3, 2, 1):
+            for start in range(len(words) - size + 1):
+                phrase = " ".join(words[start:start + size])
+                if phrase in self._exact and phrase not in _STOPWORDS:
+                    return self._exact[phrase]
+
+        candidates = sorted((w for w in words if len(w) >= 4 and w not in _STOPWORDS),
+                            key=len, reverse=True)
+        for word in candidates[:fuzzy_words]:
+            key = self.resolve(word)
+            if key:
+                return key
+        return None
+
+    def suggest(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Rank destinations for a free-text query
+
+        Args:
+            query: User input such as "NYC", "Paris, France" or "tokio"
+            limit: Maximum number of suggestions
+
+        Returns:
+            (key, score) pairs, best first, with scores in [0, 1]
+        """
+        text = normalize(query)
+        if not text:
+            return []
+
+        # Exact name or alias, then each comma-separated part
+        if text in self._exact:
+            return [(self._exact[text], 1.0)]
+        parts = [normalize(part) for part in query.split(",")]
+        for part in parts:
+            if part in self._exact:
+                return [(self._exact[part], 1.0)]
+
+        scores: Dict[str, float] = {}
+        for part in parts:
+            for key in self._tokens.get(part, ()):
+                scores[key] = max(scores.get(key, 0.0), 0.9)
+
+        for key, score in self._fuzzy(text):
+            if score > scores.get(key, 0.0):
+                scores[key] = score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def _fuzzy(self, text: str) -> List[Tuple[str, float]]:
+        grams = set(_trigrams(text))
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        if not counts:
+            return []
+
+        # One edit changes at most three trigrams, so a candidate sharing
+        # fewer than len(grams) - 3 * limit cannot be within the limit
+        results: Dict[str, float] = {}
+        limit = max(1, len(text) // 3)
+        min_shared = len(grams) - 3 * limit
+        for name_id, shared in counts.most_common(self.max_candidates):
+            alias, key, alias_grams = self._names[name_id]
+            dice = 2.0 * shared / (len(grams) + alias_grams)
+            if shared < min_shared:
+                if dice > results.get(key, 0.0):
+                    results[key] = round(dice, 3)
+                continue
+            distance = _edit_distance(text, alias, limit)
+            edit = 1.0 - distance / max(len(text), len(alias)) if distance <= limit else 0.0
+            score = round(max(dice, edit), 3)
+            if score > results.get(key, 0.0):
+                results[key] = score
+        return list(results.items())
@@ -0,0 +1,263 @@
+# destination_store.py
+import json
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_SEED_PATH = os.path.join(DATA_DIR, "destinations.jsonl")
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, "destinations.db")
+
+# Upper bound of the daily cost for each budget band, in USD
+BUDGET_BANDS = [("budget", 100), ("mid", 200), ("luxury", float("inf"))]
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+ALL_MONTHS = (1 << 12) - 1
+
+# Bumped whenever the compiled columns change, so older files are rebuilt
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE destinations (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    aliases TEXT NOT NULL,
+    region TEXT,
+    budget_band TEXT,
+    daily_min REAL NOT NULL,
+    daily_max REAL NOT NULL,
+    tag_mask INTEGER NOT NULL,
+    month_mask INTEGER NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE TABLE tag_bits (
+    tag TEXT PRIMARY KEY,
+    bit INTEGER NOT NULL
+);
+CREATE TABLE destination_tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX idx_destinations_region ON destinations(region);
+CREATE INDEX idx_destinations_budget_band ON destinations(budget_band);
+"""
+
+
+def parse_daily_cost(budget_range: str) -> Tuple[float, float]:
+    """Parse "$100-200 per day" into (100.0, 200.0); (0, 0) if unparseable"""
+    numbers = [float(n.replace(",", "")) for n in re.findall(r"\d[\d,]*(?:\.\d+)?", budget_range or "")]
+    if not numbers:
+        return 0.0, 0.0
+    return min(numbers), max(numbers)
+
+
+def band_for_daily_cost(amount: float) -> str:
+    """Classify a daily cost in USD as budget, mid or luxury"""
+    for band, limit in BUDGET_BANDS:
+        if amount <= limit:
+            return band
+    return BUDGET_BANDS[-1][0]
+
+
+def budget_band(budget_range: str) -> str:
+    """Classify a daily budget range by its upper bound"""
+    _, high = parse_daily_cost(budget_range)
+    return band_for_daily_cost(high)
+
+
+def month_index(word: Optional[str]) -> Optional[int]:
+    """0-based month index for a name or 3-letter abbreviation such as "May" or "sep", or None"""
+    word = (word or "").strip().lower()
+    for i, name in enumerate(MONTHS):
+        if len(word) >= 3 and name.startswith(word):
+            return i
+    return None
+
+
+def parse_best_months(best_time: str) -> int:
+    """
+    Bitmask (bit 0 = January) of the months in text like "April-June, September-October (mild weather)"
+
+    Ranges may wrap the year ("November-February"); "year-round" or text
+    without month names gives every month.
+    """
+    text = re.sub(r"\(.*?\)", "", best_time or "").lower()
+    if "year" in text and "round" in text:
+        return ALL_MONTHS
+    mask = 0
+    for start, end in re.findall(r"([a-z]+)(?:\s*(?:-|–|to)\s*([a-z]+))?", text):
+        first = month_index(start)
+        if first is None:
+            continue
+        last = month_index(end) if end else first
+        last = first if last is None else last
+        month = first
+        while True:
+            mask |= 1 << month
+            if month == last:
+                break
+            month = (month + 1) % 12
+    return mask or ALL_MONTHS
+
+
+def build_store(seed_path: str = DEFAULT_SEED_PATH, db_path: str = DEFAULT_DB_PATH) -> str:
+    """
+    Compile the JSON Lines destination seed into an indexed SQLite file
+
+    Args:
+        seed_path: One destination record per line, each with a "key"
+        db_path: Output database; replaced atomically
+
+    Returns:
+        The database path
+    """
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        tag_bits: Dict[str, int] = {}
+        with open(seed_path, encoding="utf-8") as seed:
+            for line in seed:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = record.pop("key")
+                daily_min, daily_max = parse_daily_cost(record.get("budget_range", ""))
+                tag_mask = 0
+                for tag in record.get("tags", []):
+                    if tag not in tag_bits:
+                        if len(tag_bits) >= 63:
+                            raise ValueError("At most 63 distinct destination tags fit in a tag mask")
+                        tag_bits[tag] = len(tag_bits)
+                    tag_mask |= 1 << tag_bits[tag]
+                conn.execute(
+                    "INSERT INTO destinations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, record["name"], json.dumps(record.get("aliases", [])),
+                     record.get("region"), budget_band(record.get("budget_range", "")),
+                     daily_min, daily_max, tag_mask, parse_best_months(record.get("best_time", "")),
+                     json.dumps(record, ensure_ascii=False)),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO destination_tags VALUES (?, ?)",
+                    [(tag, key) for tag in record.get("tags", [])],
+                )
+        conn.executemany("INSERT INTO tag_bits VALUES (?, ?)", tag_bits.items())
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def _schema_version(db_path: str) -> int:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class DestinationStore:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, seed_path: str = DEFAULT_SEED_PATH,
+                 cache_size: int = 256):
+        """
+        Read-only, lazily loaded view over the destination catalogue
+
+        The database is (re)built from the seed file when missing or stale.
+        Opening it reads nothing but the schema; records are fetched and
+        decoded on lookup and kept in a bounded LRU.
+
+        Args:
+            db_path: SQLite catalogue
+            seed_path: JSON Lines source the catalogue is compiled from
+            cache_size: Number of decoded records kept in memory
+        """
+        if os.path.exists(seed_path) and (
+            not os.path.exists(db_path) or os.path.getmtime(db_path) < os.path.getmtime(seed_path)
+            or _schema_version(db_path) < SCHEMA_VERSION
+        ):
+            build_store(seed_path, db_path)
+
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.get = lru_cache(maxsize=cache_size)(self._load)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT record FROM destinations WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def __contains__(self, key) -> bool:
+        return key is not None and self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM destinations")[0][0]
+
+    def iter_names(self, batch_size: int = 5000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (key, {"name", "aliases"}) for every destination without loading full records"""
+        last_key = ""
+        while True:
+            rows = self._query(
+                "SELECT key, name, aliases FROM destinations WHERE key > ? ORDER BY key LIMIT ?",
+                (last_key, batch_size),
+            )
+            if not rows:
+                return
+            for key, name, aliases in rows:
+                yield key, {"name": name, "aliases": json.loads(aliases)}
+            last_key = rows[-1][0]
+
+    def filter_columns(self) -> List[Tuple[str, float, float, int, int]]:
+        """(key, daily_min, daily_max, tag_mask, month_mask) for every destination, in key order"""
+        return self._query(
+            "SELECT key, daily_min, daily_max, tag_mask, month_mask FROM destinations ORDER BY key"
+        )
+
+    def tag_bits(self) -> Dict[str, int]:
+        """Bit of each interest tag within tag_mask"""
+        return dict(self._query("SELECT tag, bit FROM tag_bits"))
+
+    def find(self, region: Optional[str] = None, tags: Optional[List[str]] = None,
+             budget_band: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Look up destination keys through the secondary indexes
+
+        Args:
+            region: Exact region, e.g. "Europe"
+            tags: Interest tags; a destination must carry all of them
+            budget_band: "budget", "mid" or "luxury"
+            limit: Maximum number of keys
+
+        Returns:
+            Matching keys in key order
+        """
+        sql = "SELECT key FROM destinations WHERE 1 = 1"
+        params: list = []
+        if region:
+            sql += " AND region = ?"
+            params.append(region)
+        if budget_band:
+            sql += " AND budget_band = ?"
+            params.append(budget_band)
+        for tag in tags or []:
+            sql += " AND key IN (SELECT key FROM destination_tags WHERE tag = ?)"
+            params.append(tag)
+        sql += " ORDER BY key"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self._query(sql, tuple(params))]
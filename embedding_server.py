@@ -0,0 +1,262 @@
+# embedding_server.py
+"""
+One sentence-transformer per machine, shared by every app and worker process
+
+Run with: python embedding_server.py
+
+The server loads the model once and listens on a Unix socket (EMBED_SOCKET,
+default data/embed.sock). Concurrent encode requests from all processes are
+coalesced into micro-batches: the first request opens a window of up to
+EMBED_MAX_WAIT_MS, and whatever arrives meanwhile (up to EMBED_MAX_BATCH
+texts) is encoded in one model call. Vectors go back through a shared-memory
+block the client allocates, so only the texts and a small header cross the
+socket.
+
+Clients (jd_matcher.encode) fall back to an in-process model when no server
+answers, so running the server is optional.
+"""
+import json
+import logging
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from metrics import EMBED_BATCH_TEXTS, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.environ.get("EMBED_MODEL", "all-MiniLM-L6-v2")
+DEFAULT_SOCKET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "embed.sock")
+# Empty disables the server and every process loads its own model
+EMBED_SOCKET = os.environ.get("EMBED_SOCKET", DEFAULT_SOCKET_PATH)
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", "64"))
+EMBED_MAX_WAIT_MS = float(os.environ.get("EMBED_MAX_WAIT_MS", "5"))
+EMBED_METRICS_PORT = int(os.environ.get("EMBED_METRICS_PORT", "9109"))
+
+_HEADER = struct.Struct("!I")
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding socket closed mid-message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open a client's block without letting this process's resource tracker unlink it on exit"""
+    block = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+class _Request:
+    def __init__(self, texts: List[str], out: np.ndarray):
+        self.texts = texts
+        self.out = out
+        self.done = threading.Event()
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer:
+    def __init__(self, path: str = EMBED_SOCKET, model_name: str = MODEL_NAME,
+                 max_batch: int = EMBED_MAX_BATCH, max_wait_ms: float = EMBED_MAX_WAIT_MS):
+        """
+        Socket server that micro-batches encode requests onto one model
+
+        Args:
+            path: Unix socket path to listen on
+            model_name: sentence-transformers model to load
+            max_batch: Texts per model call before a batch closes early
+            max_wait_ms: How long the first request of a batch waits for company
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.path = path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self._requests: "queue.Queue[_Request]" = queue.Queue()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
+    def _batches(self):
+        """Micro-batching loop: one model call per window of concurrent requests"""
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0].texts)
+            closes = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = closes - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+
+            EMBED_BATCH_TEXTS.observe(size)
+            try:
+                vectors = self._encode([text for request in batch for text in request.texts])
+                start = 0
+                for request in batch:
+                    request.out[:] = vectors[start:start + len(request.texts)]
+                    start += len(request.texts)
+            except Exception as e:
+                logger.exception("Embedding batch of %d texts failed", size)
+                for request in batch:
+                    request.error = str(e)
+            for request in batch:
+                request.done.set()
+
+    def _handle(self, conn: socket.socket):
+        with conn:
+            try:
+                message = _recv(conn)
+                if message.get("op") == "info":
+                    _send(conn, {"dim": self.dim})
+                    return
+                texts = message["texts"]
+                block = _attach(message["shm"])
+                request = _Request(texts, np.ndarray((len(texts), self.dim), dtype=np.float32, buffer=block.buf))
+                try:
+                    self._requests.put(request)
+                    request.done.wait()
+                finally:
+                    # The view must go before the block can close
+                    request.out = None
+                    block.close()
+                _send(conn, {"error": request.error} if request.error else {"rows": len(texts)})
+            except Exception as e:
+                logger.warning("Embedding request failed: %s", e)
+                try:
+                    _send(conn, {"error": str(e)})
+                except OSError:
+                    pass
+
+    def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(128)
+        threading.Thread(target=self._batches, name="embed-batcher", daemon=True).start()
+        logger.info("Serving %s embeddings on %s", MODEL_NAME, self.path)
+        try:
+            while True:
+                conn, _ = listener.accept()
+                threading.Thread(target=self._handle, args=(conn,), name="embed-conn", daemon=True).start()
+        finally:
+            listener.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+class EmbeddingClient:
+    def __init__(self, path: str = EMBED_SOCKET, timeout: float = 30.0, retry_after: float = 30.0):
+        """
+        Encode through the shared embedding server
+
+        Args:
+            path: Server socket path
+            timeout: Seconds to wait for one request before giving up on the server
+            retry_after: Seconds to stay on the local fallback after the server fails
+        """
+        self.path = path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.dim: Optional[int] = None
+        self._down_until = 0.0
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def available(self) -> bool:
+        """Whether the server is worth trying: the socket exists and it has not failed recently"""
+        return bool(self.path) and time.monotonic() >= self._down_until and os.path.exists(self.path)
+
+    def encode(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        Embed texts on the server
+
+        Returns:
+            L2-normalized float32 rows, or None if the server is unavailable
+        """
+        texts = list(texts)
+        if not self.available():
+            return None
+        try:
+            if self.dim is None:
+                with self._connect() as sock:
+                    _send(sock, {"op": "info"})
+                    self.dim = int(_recv(sock)["dim"])
+            if not texts:
+                return np.zeros((0, self.dim), dtype=np.float32)
+
+            block = shared_memory.SharedMemory(create=True, size=len(texts) * self.dim * 4)
+            try:
+                with self._connect() as sock:
+                    _send(sock, {"texts": texts, "shm": block.name})
+                    reply = _recv(sock)
+                if "error" in reply:
+                    raise RuntimeError(reply["error"])
+                return np.ndarray((len(texts), self.dim), dtype=np.float32, buffer=block.buf).copy()
+            finally:
+                block.close()
+                block.unlink()
+        except (OSError, ValueError, RuntimeError, KeyError) as e:
+            logger.warning("Embedding server unavailable (%s); encoding in-process for %.0fs", e, self.retry_after)
+            self._down_until = time.monotonic() + self.retry_after
+            return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_embedding_client() -> EmbeddingClient:
+    """Process-wide client for the shared embedding server"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EmbeddingClient()
+        return _client
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    start_metrics_server(EMBED_METRICS_PORT)
+    EmbeddingServer().serve_forever()
@@ -0,0 +1,195 @@
+# hr_jobs.py
+import hashlib
+import io
+import threading
+import time
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from bounded_chat import is_truncated
+from candidate_record import CandidateRecord
+from candidate_store import get_candidate_store
+from chatbot import get_hr_chatbot
+from degraded_mode import is_degraded
+from jd_matcher import encode
+from job_profile import get_job_profile
+from job_queue import JobProgress, JobQueue
+from metrics import JOB_QUEUE_DEPTH, SIMILARITY_SECONDS
+from resume_index import ResumeFingerprint, ResumeMatch, get_resume_index
+from shortlist import ShortlistEvaluator
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _parse_or_reuse(data: bytes) -> Tuple[Dict[str, Any], Optional[np.ndarray], Optional[ResumeMatch], ResumeFingerprint]:
+    """
+    Parsed fields and embedding for a resume PDF, reusing an earlier copy's where that is safe
+
+    An exact re-upload reuses everything. A near-copy is parsed again, since
+    it may carry a new name or skill, and keeps the earlier embedding only if
+    the parsed text is unchanged. The match is returned only when something
+    was reused; otherwise the vector is None and the caller encodes it.
+    """
+    index = get_resume_index()
+    fingerprint = index.fingerprint(data)
+    match = index.find(fingerprint)
+    if match is not None and match.exact:
+        return match.candidate, match.vector, match, fingerprint
+    # pyresparser loads spaCy, which question jobs never need
+    from resume_utils import parse_resume
+    candidate = parse_resume(io.BytesIO(data))
+    vector = match.reusable_vector(candidate) if match is not None and not candidate.get("error") else None
+    if vector is None:
+        return candidate, None, None, fingerprint
+    # Filed under its own fields, so an exact re-upload of this copy gets them back
+    _remember(fingerprint, candidate, vector)
+    return candidate, vector, match, fingerprint
+
+
+def _remember(fingerprint: ResumeFingerprint, candidate: Dict[str, Any], vector: np.ndarray):
+    """File a newly parsed resume so later copies reuse its fields and embedding, and make it searchable"""
+    if not candidate.get("error"):
+        record = CandidateRecord.from_parsed(candidate)
+        get_resume_index().add(fingerprint, record.to_dict(), vector)
+        get_candidate_store().add(fingerprint.sha256, record, vector)
+
+
+def _process(payload: Dict[str, Any], data: Optional[bytes], progress: JobProgress) -> Dict[str, Any]:
+    """Parse the resume (or reuse an earlier copy's results) and score it against the JD"""
+    progress.update(0.05, "🔎 Checking for earlier copies...")
+    candidate, vector, match, fingerprint = _parse_or_reuse(data)
+    if match is None:
+        progress.update(0.6, "📊 Calculating similarity...", candidate=candidate)
+    else:
+        progress.update(0.6, "♻️ Reusing an earlier copy of this resume...", candidate=candidate)
+
+    profile = get_job_profile(payload["job_description"])
+    with SIMILARITY_SECONDS.time():
+        if vector is None:
+            vector = encode([candidate["full_text"]])[0]
+            _remember(fingerprint, candidate, vector)
+        score = float(vector @ profile.vector)
+
+    duplicate_of = {"resume_id": match.resume_id, "similarity": match.similarity} if match else None
+    # Only the fields the apps use travel on in the job result
+    return {"candidate": CandidateRecord.from_parsed(candidate).to_dict(), "score": score,
+            "job_description": payload["job_description"],
+            "duplicate_of": duplicate_of}
+
+
+def _ask(payload: Dict[str, Any], data: Optional[bytes], progress: JobProgress) -> Dict[str, Any]:
+    """Answer one HR question, publishing the streamed text as it arrives"""
+    progress.update(0.1, "🤖 Waiting for the AI model...")
+    hr_bot = get_hr_chatbot(payload["candidate"], payload["job_description"], payload["match_score"])
+
+    chunks, last_update = [], 0.0
+    with progress.watch_cancel() as cancel:
+        for chunk in hr_bot.ask_stream(payload["question"], task=payload.get("task", "interactive"),
+                                      cancel=cancel):
+            chunks.append(chunk)
+            if time.monotonic() - last_update > 0.5:
+                progress.update(min(0.9, 0.2 + len(chunks) / 500), "🤖 Writing...", answer="".join(chunks))
+                last_update = time.monotonic()
+
+    answer = "".join(chunks)
+    if is_truncated(answer) or is_degraded(answer):
+        # Asking again should get a full answer from the model, not this partial or rule-based one
+        progress.skip_reuse()
+    return {"answer": answer}
+
+
+def _shortlist(payload: Dict[str, Any], data: Optional[bytes], progress: JobProgress) -> Dict[str, Any]:
+    """Parse and score every finalist, then rank them together in batched LLM calls"""
+    profile = get_job_profile(payload["job_description"])
+    labels = payload["labels"]
+    parsed = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for i, label in enumerate(labels):
+            progress.update(0.25 * i / len(labels), f"🔍 Parsing {label}...")
+            candidate, vector, _, fingerprint = _parse_or_reuse(archive.read(str(i)))
+            if not candidate.get("error"):
+                parsed.append((label, candidate, vector, fingerprint))
+
+    progress.update(0.25, "📊 Calculating similarity...")
+    # Finalists seen before keep their stored embeddings; the rest are encoded in one batch
+    fresh = [i for i, (_, _, vector, _) in enumerate(parsed) if vector is None]
+    if fresh:
+        for i, vector in zip(fresh, encode([parsed[i][1]["full_text"] for i in fresh])):
+            label, candidate, _, fingerprint = parsed[i]
+            parsed[i] = (label, candidate, vector, fingerprint)
+            _remember(fingerprint, candidate, vector)
+    candidates = [
+        {"candidate": candidate, "label": label, "score": float(vector @ profile.vector)}
+        for label, candidate, vector, _ in parsed
+    ]
+
+    progress.update(0.3, f"🏆 Ranking {len(candidates)} candidates...")
+    evaluator = ShortlistEvaluator(profile, shortlist_size=payload.get("shortlist_size", 3))
+    result = evaluator.rank(candidates, progress=progress.update)
+    result["unparsed"] = len(labels) - len(candidates)
+    return result
+
+
+def get_hr_queue() -> JobQueue:
+    """Process-wide job queue with the HR handlers registered and workers running"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+            _queue.register("process", _process)
+            _queue.register("ask", _ask)
+            _queue.register("shortlist", _shortlist)
+            _queue.start()
+            JOB_QUEUE_DEPTH.set_function(_queue.depth)
+        return _queue
+
+
+def submit_processing(resume_bytes: bytes, job_description: str) -> str:
+    """Queue parse + score for a resume; identical uploads reuse the earlier job"""
+    return get_hr_queue().submit(
+        "process", {"job_description": job_description}, data=resume_bytes,
+        dedupe_key=_digest("process", resume_bytes, job_description),
+    )
+
+
+def submit_question(candidate: Union[Dict[str, Any], CandidateRecord], job_description: str,
+                    match_score: float, question: str, task: str = "interactive") -> str:
+    """
+    Queue an HR question; the same question and task about the same candidate and JD reuses the earlier job
+
+    Args:
+        task: "interactive" for quick questions, "analysis" for in-depth reports (slower model, longer deadline)
+    """
+    candidate = CandidateRecord.coerce(candidate)
+    return get_hr_queue().submit(
+        "ask",
+        {"candidate": candidate.to_dict(), "job_description": job_description,
+         "match_score": match_score, "question": question, "task": task},
+        dedupe_key=_digest("ask", task, candidate.full_text, job_description, question),
+    )
+
+
+def submit_shortlist(resumes: List[Tuple[str, bytes]], job_description: str, shortlist_size: int = 3) -> str:
+    """Queue a ranked shortlist for (file name, PDF bytes) finalists; the same pool and JD reuse the earlier job"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i, (_, data) in enumerate(resumes):
+            archive.writestr(str(i), data)
+    return get_hr_queue().submit(
+        "shortlist",
+        {"job_description": job_description, "shortlist_size": shortlist_size,
+         "labels": [name for name, _ in resumes]},
+        data=buffer.getvalue(),
+        dedupe_key=_digest("shortlist", *(data for _, data in resumes), job_description, shortlist_size),
+    )
@@ -0,0 +1,137 @@
+# intent_router.py
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from destination_index import normalize
+
+INTENT_EXAMPLES = {
+    "budget": [
+        "how can I travel on a budget",
+        "tips to save money on my trip",
+        "cheap flights and hotels",
+        "how much money do I need per day",
+        "budget travel tips",
+        "is it expensive to travel there",
+        "ways to spend less while traveling",
+        "where can I eat cheap",
+        "affordable hotels and food",
+    ],
+    "checklist": [
+        "what should I pack",
+        "give me a travel checklist",
+        "packing list for an international trip",
+        "what documents do I need to bring",
+        "what do I need to prepare before I travel",
+        "things to do before leaving for my trip",
+        "packing tips",
+    ],
+    "destination": [
+        "tell me about paris",
+        "what is tokyo like",
+        "best time to visit london",
+        "what currency do they use in dubai",
+        "what language do they speak in rome",
+        "recommend a destination",
+        "where should I go on vacation",
+        "top attractions in sydney",
+        "what is the weather like in may",
+        "best things to see in bangkok",
+    ],
+    "itinerary": [
+        "plan a trip to rome",
+        "make me a 5 day itinerary for bangkok",
+        "what should I do each day in new york",
+        "create a day by day schedule",
+        "plan my week in paris",
+        "itinerary for three days",
+    ],
+    "visa": [
+        "do I need a visa",
+        "visa requirements for japan",
+        "how do I apply for a tourist visa",
+        "passport and entry requirements",
+        "can I enter without a visa",
+        "how long can I stay on a visa",
+    ],
+}
+
+
+# Function words carry no intent and would otherwise dominate short prompts
+_FILLER_WORDS = {
+    "a", "an", "and", "are", "at", "be", "can", "do", "for", "i", "in", "is",
+    "it", "me", "my", "of", "on", "the", "there", "to", "what", "whats", "s",
+}
+
+
+def hashed_embedding(texts: Sequence[str], dim: int = 1024) -> np.ndarray:
+    """
+    Embed texts as L2-normalized hashed bags of words and character trigrams
+
+    Deterministic across processes and cheap enough for per-message routing.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in normalize(text).split():
+            if word in _FILLER_WORDS:
+                continue
+            features = [f"w:{word}"]
+            padded = f" {word} "
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-9)
+
+
+class RoutedIntent(NamedTuple):
+    intent: str
+    confidence: float
+    scores: Dict[str, float]
+    destination: Optional[str]
+
+
+class IntentRouter:
+    def __init__(self, destination_index=None,
+                 examples: Dict[str, List[str]] = INTENT_EXAMPLES,
+                 embed: Callable[[Sequence[str]], np.ndarray] = hashed_embedding,
+                 min_similarity: float = 0.3, temperature: float = 0.1):
+        """
+        Route chat prompts by nearest intent example
+
+        All example embeddings are precomputed into one matrix, so routing a
+        prompt is one embedding plus one matrix-vector product.
+
+        Args:
+            destination_index: DestinationIndex used to pick out a destination mention
+            examples: Example prompts per intent
+            embed: Maps texts to L2-normalized row vectors
+            min_similarity: Below this best-example cosine the intent is "general"
+            temperature: Softmax temperature for the confidence score
+        """
+        self.destination_index = destination_index
+        self.embed = embed
+        self.min_similarity = min_similarity
+        self.temperature = temperature
+
+        self.intents = list(examples)
+        texts = [text for intent in self.intents for text in examples[intent]]
+        self._matrix = embed(texts)
+        sizes = [len(examples[intent]) for intent in self.intents]
+        self._offsets = np.cumsum([0] + sizes[:-1])
+
+    def route(self, prompt: str) -> RoutedIntent:
+        """Classify `prompt` and extract any destination it mentions"""
+        similarities = self._matrix @ self.embed([prompt])[0]
+        best = np.maximum.reduceat(similarities, self._offsets)
+
+        weights = np.exp((best - best.max()) / self.temperature)
+        probabilities = weights / weights.sum()
+        top = int(best.argmax())
+
+        scores = {intent: round(float(score), 3) for intent, score in zip(self.intents, best)}
+        intent = self.intents[top] if best[top] >= self.min_similarity else "general"
+        destination = self.destination_index.find_in_text(prompt) if self.destination_index else None
+        return RoutedIntent(intent, round(float(probabilities[top]), 3), scores, destination)
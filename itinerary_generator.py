@@ -0,0 +1,150 @@
+# itinerary_generator.py
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+import ollama
+
+from chatbot import get_available_model
+from destination_index import normalize
+from destination_store import DATA_DIR
+from llm_gate import LLMGate, default_gate
+from metrics import record_ollama_usage
+
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "itineraries.db")
+
+ITINERARY_PROMPT = """
+You are an expert international travel planner.
+Create a detailed {duration}-day itinerary for {destination} for a traveller interested in: {interests}.
+
+Format the answer in markdown:
+- Start with the heading "### 📅 Detailed {duration}-Day Itinerary for {destination}"
+- One "**Day N: <theme>**" section per day, each with **Morning:**, **Afternoon:** and **Evening:** bullet lists
+- Name real attractions, neighbourhoods and local dishes
+- Finish with a short "### 💡 Local Tips" list
+"""
+
+
+class ItineraryCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        """
+        Persistent store of generated itineraries, shared by every process
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS itineraries (
+                    key TEXT PRIMARY KEY,
+                    destination TEXT NOT NULL,
+                    duration INTEGER NOT NULL,
+                    interests TEXT NOT NULL,
+                    model TEXT,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Read-only lookup, cheap enough for every Streamlit rerun"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT content FROM itineraries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def record_hit(self, key: str):
+        """Count one generation the cache saved"""
+        with self._connect() as conn:
+            conn.execute("UPDATE itineraries SET hits = hits + 1 WHERE key = ?", (key,))
+
+    def put(self, key: str, destination: str, duration: int, interests: str, model: str, content: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO itineraries VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, destination, duration, interests, model, content, time.time()),
+            )
+
+
+class ItineraryGenerator:
+    def __init__(self, cache: Optional[ItineraryCache] = None, gate: LLMGate = default_gate,
+                 model: Optional[str] = None, max_tokens: int = 1500):
+        """
+        Generate itineraries for destinations outside the catalogue with Ollama
+
+        Args:
+            cache: Persistent itinerary cache
+            gate: Concurrency limit shared with the other Ollama callers
+            model: Ollama model; the first preferred installed model by default
+            max_tokens: Generation cap passed as num_predict
+        """
+        self.cache = cache or ItineraryCache()
+        self.gate = gate
+        self.model = model
+        self.max_tokens = max_tokens
+
+    @staticmethod
+    def normalize_request(destination: str, duration: int, interests: Sequence[str]):
+        """Canonical (destination, duration, interests) so equivalent requests share a cache entry"""
+        return normalize(destination), int(duration), ",".join(sorted({normalize(i) for i in interests}))
+
+    def cache_key(self, destination: str, duration: int, interests: Sequence[str]) -> str:
+        parts = self.normalize_request(destination, duration, interests)
+        return hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def cached(self, destination: str, duration: int, interests: Sequence[str]) -> Optional[str]:
+        return self.cache.get(self.cache_key(destination, duration, interests))
+
+    def stream(self, destination: str, duration: int, interests: Sequence[str]) -> Iterator[str]:
+        """
+        Yield the itinerary as markdown chunks
+
+        Cached itineraries are yielded whole. Fresh ones are streamed from
+        Ollama and stored only once the generation has completed.
+        """
+        key = self.cache_key(destination, duration, interests)
+        cached = self.cache.get(key)
+        if cached:
+            self.cache.record_hit(key)
+            yield cached
+            return
+
+        model = self.model or get_available_model()
+        if not model:
+            raise RuntimeError("No Ollama models found. Please install a model first: 'ollama pull llama3.2'")
+
+        prompt = ITINERARY_PROMPT.format(
+            destination=destination.strip(),
+            duration=int(duration),
+            interests=", ".join(interests) or "general sightseeing",
+        )
+        chunks = []
+        with self.gate.slot():
+            for part in ollama.chat(
+                model=model,
+                messages=[{'role': 'user', 'content': prompt}],
+                stream=True,
+                options={'temperature': 0.7, 'num_predict': self.max_tokens},
+            ):
+                text = part['message']['content']
+                chunks.append(text)
+                if part.get('done'):
+                    record_ollama_usage(model, part)
+                yield text
+
+        _, norm_duration, norm_interests = self.normalize_request(destination, duration, interests)
+        self.cache.put(key, destination.strip(), norm_duration, norm_interests, model, "".join(chunks))
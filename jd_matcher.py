@@ -1,7 +1,39 @@
 
-from sentence_transformers import SentenceTransformer, util
-model = SentenceTransformer('all-MiniLM-L6-v2')
+import threading
+from embedding_server import MODEL_NAME, get_embedding_client
+from metrics import EMBED_REQUESTS, SIMILARITY_SECONDS
+from profiler import profiled
+from job_profile import JobProfile
+_model = None
+_model_lock = threading.Lock()
+def _get_model():
+    """In-process model, loaded only when the shared embedding server is not answering"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(MODEL_NAME)
+        return _model
+@SIMILARITY_SECONDS.time()
+@profiled("get_similarity")
 def get_similarity(resume_text, jd_text):
-    v1 = model.encode(resume_text, convert_to_tensor=True)
-    v2 = model.encode(jd_text, convert_to_tensor=True)
-    return util.cos_sim(v1, v2).item()
+    if isinstance(jd_text, JobProfile):
+        # The JD side was embedded once when the profile was built
+        return float(encode([resume_text])[0] @ jd_text.vector)
+    # Rows are L2-normalized, so the dot product is the cosine similarity
+    v1, v2 = encode([resume_text, jd_text])
+    return float(v1 @ v2)
+def encode(texts):
+    """Embed a list of texts as L2-normalized numpy rows, in one batch (on the shared server when running)"""
+    vectors = get_embedding_client().encode(texts)
+    if vectors is not None:
+        EMBED_REQUESTS.labels("server").inc()
+        return vectors
+    EMBED_REQUESTS.labels("local").inc()
+    return _get_model().encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+def get_similarities(resume_texts, jd_text):
+    """Score many resumes against one JD (text or JobProfile) with a single batched encode"""
+    if isinstance(jd_text, JobProfile):
+        return (encode(resume_texts) @ jd_text.vector).tolist()
+    vectors = encode([jd_text] + list(resume_texts))
+    return (vectors[1:] @ vectors[0]).tolist()
@@ -0,0 +1,135 @@
+# job_profile.py
+import csv
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Optional, Sequence, Union
+
+import numpy as np
+
+from retrieval import PassageIndex
+from semantic_cache import default_embed
+from skill_taxonomy import skill_key
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+@lru_cache(maxsize=1)
+def load_skill_vocabulary() -> FrozenSet[str]:
+    """Lowercased skill names from the skills.csv pyresparser matches resumes against"""
+    spec = importlib.util.find_spec("pyresparser")
+    if spec is None or not spec.origin:
+        return frozenset()
+    path = os.path.join(os.path.dirname(spec.origin), "skills.csv")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return frozenset(skill.strip().lower() for skill in next(csv.reader(f), []) if skill.strip())
+    except OSError:
+        return frozenset()
+
+
+def extract_skills(text: str, vocabulary: Optional[FrozenSet[str]] = None, max_words: int = 3) -> FrozenSet[str]:
+    """
+    Skills from the vocabulary mentioned in free text, as 1- to `max_words`-word phrases
+
+    Names are capitalized the way pyresparser reports resume skills, so the
+    two sets can be compared directly.
+    """
+    vocabulary = load_skill_vocabulary() if vocabulary is None else vocabulary
+    words = [word.rstrip(".") for word in _WORD.findall((text or "").lower())]
+    found = set()
+    for n in range(1, max_words + 1):
+        for i in range(len(words) - n + 1):
+            phrase = " ".join(words[i:i + n])
+            if phrase in vocabulary:
+                found.add(phrase.capitalize())
+    return frozenset(found)
+
+
+def job_digest(job_description: str) -> str:
+    return hashlib.sha256(job_description.strip().encode("utf-8")).hexdigest()
+
+
+class JobProfile:
+    def __init__(self, job_description: str, max_words: int = 80,
+                 embed: Callable[[Sequence[str]], np.ndarray] = default_embed):
+        """
+        Everything derived from a job description, computed once and shared by all candidates
+
+        Args:
+            job_description: Job description text
+            max_words: Passage size for retrieval chunks
+            embed: Maps texts to L2-normalized row vectors
+        """
+        self.job_description = job_description
+        self.digest = job_digest(job_description)
+        self.vector = embed([job_description])[0]
+        self.passages = PassageIndex([("job", job_description)], max_words=max_words, embed=embed)
+        self.required_skills = extract_skills(job_description)
+        self.prompt_section = self._condense()
+
+    def _condense(self) -> str:
+        """Short job summary for the chatbot's system context"""
+        lines = [line.strip() for line in self.job_description.splitlines() if line.strip()]
+        title = lines[0] if lines and len(lines[0].split()) <= 12 else "Not stated"
+        skills = ", ".join(sorted(self.required_skills)) or "None recognised"
+        return f"JOB PROFILE:\n        - Role: {title}\n        - Required skills: {skills}"
+
+    def matched_skills(self, candidate_skills: Sequence[str]) -> FrozenSet[str]:
+        """Required skills the candidate lists, matched by taxonomy ID so spelling variants count"""
+        candidate = {skill_key(skill) for skill in candidate_skills}
+        return frozenset(skill for skill in self.required_skills if skill_key(skill) in candidate)
+
+    def missing_skills(self, candidate_skills: Sequence[str]) -> FrozenSet[str]:
+        """Required skills the candidate does not list"""
+        return self.required_skills - self.matched_skills(candidate_skills)
+
+
+_profiles: "OrderedDict[str, JobProfile]" = OrderedDict()
+# Builds in progress, so concurrent callers for one JD wait for a single build
+_building: Dict[str, Future] = {}
+_profiles_lock = threading.Lock()
+
+
+def get_job_profile(job_description: Union[str, JobProfile], max_profiles: int = 64) -> JobProfile:
+    """
+    Process-wide JobProfile for a JD, built on first use and keyed by its hash
+
+    Screening many candidates against one JD pays its embedding, chunking and
+    skill extraction once. Profiles are built outside the lock, so different
+    JDs build in parallel. A JobProfile passed in is returned as is.
+    """
+    if isinstance(job_description, JobProfile):
+        return job_description
+    digest = job_digest(job_description)
+    with _profiles_lock:
+        profile = _profiles.get(digest)
+        if profile is not None:
+            _profiles.move_to_end(digest)
+            return profile
+        future = _building.get(digest)
+        building = future is None
+        if building:
+            future = _building[digest] = Future()
+    if not building:
+        return future.result()
+
+    try:
+        profile = JobProfile(job_description)
+    except BaseException as e:
+        with _profiles_lock:
+            del _building[digest]
+        future.set_exception(e)
+        raise
+    with _profiles_lock:
+        _profiles[digest] = profile
+        if len(_profiles) > max_profiles:
+            _profiles.popitem(last=False)
+        del _building[digest]
+    future.set_result(profile)
+    return profile
@@ -0,0 +1,250 @@
+# job_queue.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jobs.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    dedupe_key TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    data BLOB,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key);
+"""
+
+
+class JobProgress:
+    def __init__(self, queue: "JobQueue", job_id: str):
+        """Handle passed to job handlers for progress and partial-result updates"""
+        self.queue = queue
+        self.job_id = job_id
+        self._partial: Dict[str, Any] = {}
+        self.cancelled = threading.Event()
+
+    def update(self, progress: float, message: str = "", **partial):
+        """Record progress in [0, 1], a status message and any partial results"""
+        self._partial.update(partial)
+        with self.queue._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ?, partial = ?, updated_at = ? WHERE id = ?",
+                (progress, message, json.dumps(self._partial), time.time(), self.job_id),
+            )
+
+    @contextmanager
+    def watch_cancel(self, interval: float = 0.5) -> Iterator[threading.Event]:
+        """Poll for a cancel request while the block runs; yields the event that gets set"""
+        done = threading.Event()
+
+        def poll():
+            while not done.wait(interval):
+                if self.queue.cancel_requested(self.job_id):
+                    self.cancelled.set()
+                    return
+
+        thread = threading.Thread(target=poll, name=f"cancel-watch-{self.job_id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield self.cancelled
+        finally:
+            done.set()
+
+    def skip_reuse(self):
+        """Keep later identical submissions from reusing this job, e.g. when its result is partial"""
+        with self.queue._connect() as conn:
+            conn.execute("UPDATE jobs SET dedupe_key = NULL WHERE id = ?", (self.job_id,))
+
+
+class JobQueue:
+    def __init__(self, path: str = DEFAULT_JOBS_PATH, workers: int = 2,
+                 poll_interval: float = 0.5, stale_after: float = 600.0):
+        """
+        SQLite-backed job queue with in-process background workers
+
+        Jobs and their results live in the database, so they survive browser
+        refreshes and Streamlit reruns, and any session can pick up a result.
+
+        Args:
+            path: SQLite file
+            workers: Worker threads started by `start`
+            poll_interval: Seconds an idle worker waits before checking again
+            stale_after: Running jobs not updated for this long are requeued
+                (their worker died with its process)
+        """
+        self.path = path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._handlers: Dict[str, Callable[[Dict[str, Any], Optional[bytes], JobProgress], Dict[str, Any]]] = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "cancel_requested" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any], Optional[bytes], JobProgress], Dict[str, Any]]):
+        """Handlers take (payload, data, progress) and return a JSON-serializable result"""
+        self._handlers[kind] = handler
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, kind: str, payload: Dict[str, Any], data: Optional[bytes] = None,
+               dedupe_key: Optional[str] = None) -> str:
+        """
+        Queue a job and return its ID
+
+        If a job with the same `dedupe_key` is queued, running or done, its ID
+        is returned instead, so identical work is done once across sessions.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if dedupe_key:
+                    row = conn.execute(
+                        "SELECT id FROM jobs WHERE dedupe_key = ? AND status NOT IN ('failed', 'cancelled') "
+                        "ORDER BY created_at DESC LIMIT 1",
+                        (dedupe_key,),
+                    ).fetchone()
+                    if row:
+                        conn.execute("COMMIT")
+                        return row["id"]
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, dedupe_key, status, payload, data, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (job_id, kind, dedupe_key, json.dumps(payload), data, now, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status, progress, message, partial and final results, or None if unknown"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, progress, message, partial, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["partial"] = json.loads(job["partial"]) if job["partial"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def cancel(self, job_id: str):
+        """Drop a queued job, or ask a running one to stop; its handler decides how quickly"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END, "
+                "cancel_requested = 1, updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def depth(self) -> int:
+        """Number of queued jobs"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND updated_at < ?",
+                    (now - self.stale_after,),
+                )
+                kinds = list(self._handlers)
+                row = conn.execute(
+                    f"SELECT * FROM jobs WHERE status = 'queued' AND kind IN ({','.join('?' * len(kinds))}) "
+                    "ORDER BY created_at LIMIT 1",
+                    kinds,
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (now, row["id"]))
+                conn.execute("COMMIT")
+                return row
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _work(self):
+        while True:
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                logger.warning("Job queue unavailable: %s", e)
+                row = None
+            if row is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            progress = JobProgress(self, row["id"])
+            try:
+                result = self._handlers[row["kind"]](json.loads(row["payload"]), row["data"], progress)
+                status, error = "done", None
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", row["id"], row["kind"])
+                result, status, error = None, "failed", str(e)
+
+            with self._connect() as conn:
+                # A job asked to stop keeps whatever result it returned, but is marked cancelled
+                conn.execute(
+                    "UPDATE jobs SET status = CASE WHEN cancel_requested = 1 THEN 'cancelled' ELSE ? END, "
+                    "progress = ?, result = ?, error = ?, data = NULL, updated_at = ? WHERE id = ?",
+                    (status, 1.0 if status == "done" else row["progress"],
+                     json.dumps(result) if result is not None else None, error, time.time(), row["id"]),
+                )
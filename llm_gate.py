@@ -0,0 +1,88 @@
+# llm_gate.py
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class LLMGate:
+    def __init__(self, max_concurrent: int = 2):
+        """
+        Process-wide cap on concurrent Ollama generations
+
+        Every app running in the same Streamlit server shares one gate, so a
+        burst of sessions queues here instead of piling onto the model server.
+
+        Args:
+            max_concurrent: Generations allowed to run at once
+        """
+        self.max_concurrent = max_concurrent
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.waiting_interactive = 0
+        # Smoothed seconds recent callers waited for a slot
+        self.recent_wait = 0.0
+        self._waiting_since: Dict[int, float] = {}
+        self._tokens = itertools.count()
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None, background: bool = False):
+        """
+        Hold one generation slot for the duration of the block
+
+        Args:
+            timeout: Seconds to wait for a slot; forever if None
+            background: Speculative work (e.g. prefetch), which yields to
+                callers counted in `waiting_interactive`
+
+        Raises:
+            TimeoutError: If no slot frees up within `timeout` seconds
+        """
+        token = next(self._tokens)
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+            self._waiting_since[token] = started
+            if not background:
+                self.waiting_interactive += 1
+        try:
+            acquired = self._semaphore.acquire(timeout=timeout) if timeout is not None else self._semaphore.acquire()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+                del self._waiting_since[token]
+                if not background:
+                    self.waiting_interactive -= 1
+                self.recent_wait = 0.8 * self.recent_wait + 0.2 * (time.monotonic() - started)
+        if not acquired:
+            raise TimeoutError("Timed out waiting for a free Ollama slot")
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._semaphore.release()
+
+    def expected_wait(self) -> float:
+        """Rough seconds a new caller would wait: 0 with a free slot, else the longer of the oldest and recent waits"""
+        with self._lock:
+            if self.in_flight < self.max_concurrent and not self._waiting_since:
+                return 0.0
+            oldest = time.monotonic() - min(self._waiting_since.values()) if self._waiting_since else 0.0
+            return max(oldest, self.recent_wait)
+
+    def has_headroom(self) -> bool:
+        """Whether background work may start: nobody interactive is waiting and a slot stays free for them"""
+        with self._lock:
+            reserve = 1 if self.max_concurrent > 1 else 0
+            return self.waiting_interactive == 0 and self.in_flight + reserve < self.max_concurrent
+
+
+default_gate = LLMGate(int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "2")))
@@ -0,0 +1,115 @@
+# metrics.py
+"""
+Prometheus metrics shared by the Streamlit apps and the HTTP service
+
+Streamlit reruns each script on every interaction, so the side HTTP server is
+started once per process by `start_metrics_server` and later calls are no-ops.
+Scrape it at http://<host>:METRICS_PORT/metrics (default 9108).
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from llm_gate import default_gate
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))
+
+_LLM_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 90, 120, 180, 300)
+
+PARSE_RESUME_SECONDS = Histogram(
+    "toknova_parse_resume_seconds", "Time to parse one resume PDF",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+SIMILARITY_SECONDS = Histogram(
+    "toknova_get_similarity_seconds", "Time to score one resume against a job description",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+ASK_SECONDS = Histogram(
+    "toknova_hr_ask_seconds", "HRChatbot answer latency, including cache hits", ["task"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_ERRORS = Counter(
+    "toknova_llm_errors_total", "Failed Ollama calls by category", ["category"],
+)
+SEMANTIC_CACHE_LOOKUPS = Counter(
+    "toknova_semantic_cache_lookups_total", "HR answer cache lookups by result", ["result"],
+)
+DEGRADED_ANSWERS = Counter(
+    "toknova_degraded_answers_total", "Rule-based answers given instead of Ollama, by reason", ["reason"],
+)
+PREFETCHED_ANSWERS = Counter(
+    "toknova_prefetched_answers_total", "Suggested-question prefetches by outcome", ["result"],
+)
+EMBED_REQUESTS = Counter(
+    "toknova_embed_requests_total", "Encode calls by where they ran", ["path"],
+)
+EMBED_BATCH_TEXTS = Histogram(
+    "toknova_embed_batch_texts", "Texts per model call in the shared embedding server",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+PROMPT_TOKENS = Histogram(
+    "toknova_prompt_tokens", "Estimated tokens in each HR question prompt",
+    buckets=(100, 200, 400, 600, 800, 1000, 1500, 2000, 3000),
+)
+OLLAMA_TOKENS = Counter(
+    "toknova_ollama_generated_tokens_total", "Tokens generated by Ollama", ["model"],
+)
+OLLAMA_TOKENS_PER_SECOND = Histogram(
+    "toknova_ollama_tokens_per_second", "Generation speed reported by Ollama", ["model"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 50, 75, 100, 150),
+)
+LLM_IN_FLIGHT = Gauge("toknova_llm_in_flight", "Ollama generations currently running")
+LLM_WAITING = Gauge("toknova_llm_waiting", "Callers waiting for an Ollama slot")
+JOB_QUEUE_DEPTH = Gauge("toknova_job_queue_depth", "Background jobs waiting for a worker")
+
+LLM_IN_FLIGHT.set_function(lambda: default_gate.in_flight)
+LLM_WAITING.set_function(lambda: default_gate.waiting)
+
+_server_started = False
+_server_attempted = False
+_server_lock = threading.Lock()
+
+
+def error_category(e: Exception) -> str:
+    """Bucket an Ollama failure the way HRChatbot reports it to users"""
+    error_msg = str(e)
+    if "not found" in error_msg:
+        return "not_found"
+    if "connection" in error_msg.lower():
+        return "connection"
+    return "other"
+
+
+def record_ollama_usage(model: str, response: Dict[str, Any]):
+    """Record token throughput from a final Ollama response (or the last streamed part)"""
+    tokens = response.get("eval_count") or 0
+    seconds = (response.get("eval_duration") or 0) / 1e9
+    if tokens:
+        OLLAMA_TOKENS.labels(model).inc(tokens)
+    if tokens and seconds:
+        OLLAMA_TOKENS_PER_SECOND.labels(model).observe(tokens / seconds)
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> bool:
+    """
+    Serve /metrics on a daemon thread, once per process
+
+    Returns:
+        True if the server is running in this process
+    """
+    global _server_started, _server_attempted
+    with _server_lock:
+        if not _server_attempted:
+            _server_attempted = True
+            try:
+                start_http_server(port)
+                _server_started = True
+            except OSError as e:
+                # Another app on this host already serves the port
+                logger.warning("Metrics server not started on port %s: %s", port, e)
+        return _server_started
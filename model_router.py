@@ -0,0 +1,154 @@
+# model_router.py
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import ollama
+
+DEFAULT_BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "model_benchmarks.json")
+
+BENCHMARK_PROMPT = "List three qualities of a strong job candidate, one short sentence each."
+
+# Expected answer length and per-call latency budget for each kind of call
+TASK_PROFILES = {
+    "interactive": {"expected_tokens": 300, "latency_budget": 20.0},
+    "analysis": {"expected_tokens": 500, "latency_budget": 90.0},
+}
+
+
+class ModelRouter:
+    def __init__(self, benchmark_path: str = DEFAULT_BENCHMARK_PATH, benchmark_tokens: int = 48,
+                 list_ttl: float = 60.0):
+        """
+        Pick Ollama models by measured speed instead of by name
+
+        Each installed model is benchmarked once (tokens per second on a short
+        generation); results are cached on disk keyed by model digest, so a
+        model is re-measured only when it is re-pulled.
+
+        Args:
+            benchmark_path: JSON file holding benchmark results
+            benchmark_tokens: Tokens generated per benchmark
+            list_ttl: Seconds the installed-model list is reused before asking Ollama again
+        """
+        self.benchmark_path = benchmark_path
+        self.benchmark_tokens = benchmark_tokens
+        self.list_ttl = list_ttl
+        self._installed = None
+        self._installed_at = 0.0
+        self._lock = threading.Lock()
+        self._results = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.benchmark_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.benchmark_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._results, f, indent=2)
+        os.replace(tmp_path, self.benchmark_path)
+
+    def installed(self) -> List[Dict[str, Any]]:
+        if self._installed is None or time.monotonic() - self._installed_at > self.list_ttl:
+            self._installed = [
+                {"name": m["name"], "size": m.get("size", 0), "digest": m.get("digest", m["name"])}
+                for m in ollama.list()["models"]
+            ]
+            self._installed_at = time.monotonic()
+        return [dict(model) for model in self._installed]
+
+    def benchmark(self, model: str) -> float:
+        """Measure generation speed in tokens per second"""
+        response = ollama.generate(
+            model=model,
+            prompt=BENCHMARK_PROMPT,
+            options={"num_predict": self.benchmark_tokens, "temperature": 0},
+        )
+        seconds = response.get("eval_duration", 0) / 1e9
+        return response.get("eval_count", 0) / seconds if seconds else 0.0
+
+    def speeds(self) -> List[Dict[str, Any]]:
+        """Installed models with their tokens per second, benchmarking any not yet measured"""
+        models = self.installed()
+        with self._lock:
+            changed = False
+            for model in models:
+                cached = self._results.get(model["name"])
+                if cached is None or cached.get("digest") != model["digest"]:
+                    try:
+                        tokens_per_second = self.benchmark(model["name"])
+                    except Exception as e:
+                        print(f"Error benchmarking {model['name']}: {e}")
+                        continue
+                    self._results[model["name"]] = {
+                        "digest": model["digest"],
+                        "tokens_per_second": round(tokens_per_second, 2),
+                        "measured_at": time.time(),
+                    }
+                    changed = True
+            if changed:
+                self._save()
+            for model in models:
+                model["tokens_per_second"] = self._results.get(model["name"], {}).get("tokens_per_second", 0.0)
+        return models
+
+    def select(self, task: str = "interactive", latency_budget: Optional[float] = None) -> Optional[str]:
+        """
+        Choose a model for a kind of call
+
+        Interactive calls get the fastest model. Analysis calls get the largest
+        model expected to finish within the latency budget. If nothing fits,
+        the fastest model is used.
+
+        Args:
+            task: "interactive" or "analysis"
+            latency_budget: Seconds allowed for the call; the task default if None
+
+        Returns:
+            Model name, or None if no model is installed or measurable
+        """
+        profile = TASK_PROFILES[task]
+        budget = latency_budget if latency_budget is not None else profile["latency_budget"]
+        models = [m for m in self.speeds() if m["tokens_per_second"] > 0]
+        if not models:
+            return None
+
+        fastest = max(models, key=lambda m: m["tokens_per_second"])
+        if task == "interactive":
+            return fastest["name"]
+        fitting = [m for m in models if profile["expected_tokens"] / m["tokens_per_second"] <= budget]
+        if not fitting:
+            return fastest["name"]
+        return max(fitting, key=lambda m: m["size"])["name"]
+
+    def faster_than(self, model: str) -> Optional[str]:
+        """The fastest measured model if it beats `model`, for hedging slow calls; else None"""
+        models = [m for m in self.speeds() if m["tokens_per_second"] > 0]
+        if not models:
+            return None
+        fastest = max(models, key=lambda m: m["tokens_per_second"])
+        current = self._results.get(model, {}).get("tokens_per_second", 0.0)
+        return fastest["name"] if fastest["name"] != model and fastest["tokens_per_second"] > current else None
+
+    def describe(self, model: str) -> str:
+        tokens_per_second = self._results.get(model, {}).get("tokens_per_second")
+        return f"{model} ({tokens_per_second:.1f} tok/s)" if tokens_per_second else model
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router, so benchmarks are loaded and run once per process"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
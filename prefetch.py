@@ -0,0 +1,145 @@
+# prefetch.py
+import logging
+import os
+import threading
+from collections import deque
+from typing import Deque, Optional, Sequence, Set, Tuple
+
+from chatbot import HRChatbot
+from llm_gate import LLMGate, default_gate
+from metrics import PREFETCHED_ANSWERS
+
+logger = logging.getLogger(__name__)
+
+# How many of each app's suggested questions are answered ahead of a click
+PREFETCH_QUESTIONS = int(os.environ.get("PREFETCH_QUESTIONS", "3"))
+
+
+class _YieldToInteractive(threading.Event):
+    """Cancel flag that also reads as set while an interactive caller waits on the gate"""
+
+    def __init__(self, gate: LLMGate):
+        super().__init__()
+        self.gate = gate
+
+    def is_set(self) -> bool:
+        return super().is_set() or self.gate.waiting_interactive > 0
+
+    def cancelled(self) -> bool:
+        """Whether the prefetch itself was cancelled, as opposed to yielding"""
+        return super().is_set()
+
+
+class Prefetcher:
+    def __init__(self, gate: LLMGate = default_gate, backoff: float = 2.0, max_attempts: int = 3):
+        """
+        Answer predictable questions in the background so a later click hits the answer cache
+
+        One low-priority worker generates at a time, only while the gate has
+        headroom, and stops mid-answer as soon as an interactive caller waits
+        for a slot. A cut-short answer is not cached, and the question is
+        retried later.
+
+        Args:
+            gate: Concurrency gate shared with interactive Ollama callers
+            backoff: Seconds to wait before re-checking a busy gate
+            max_attempts: Times a question is retried after yielding to interactive calls
+        """
+        self.gate = gate
+        self.backoff = backoff
+        self.max_attempts = max_attempts
+        self._pending: Deque[Tuple[HRChatbot, str, int]] = deque()
+        self._condition = threading.Condition()
+        self._cancelled: Set[int] = set()
+        self._current = None
+        self._thread = None
+
+    def schedule(self, bot: HRChatbot, questions: Sequence[str]):
+        """Queue questions for a bot; ones already queued for it are skipped"""
+        with self._condition:
+            self._cancelled.discard(id(bot))
+            queued = {(id(b), q) for b, q, _ in self._pending}
+            for question in questions:
+                if (id(bot), question) not in queued:
+                    self._pending.append((bot, question, 0))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="answer-prefetch", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self, bot: HRChatbot):
+        """Drop a bot's queued questions and stop the one being generated for it"""
+        with self._condition:
+            self._cancelled.add(id(bot))
+            self._pending = deque(item for item in self._pending if item[0] is not bot)
+            if self._current and self._current[0] is bot:
+                self._current[1].set()
+            self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def _next(self) -> Tuple[HRChatbot, str, int]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            return self._pending.popleft()
+
+    def _start(self, bot: HRChatbot) -> Optional[_YieldToInteractive]:
+        """Wait for gate headroom, then claim the worker for the bot; None if the bot was cancelled meanwhile"""
+        while True:
+            with self._condition:
+                if id(bot) in self._cancelled:
+                    return None
+                if self.gate.has_headroom():
+                    cancel = _YieldToInteractive(self.gate)
+                    self._current = (bot, cancel)
+                    return cancel
+                PREFETCHED_ANSWERS.labels("backed_off").inc()
+                self._condition.wait(self.backoff)
+
+    def _run(self):
+        while True:
+            bot, question, attempts = self._next()
+            try:
+                if bot.answer_cache.lookup(question, record=False) is not None:
+                    PREFETCHED_ANSWERS.labels("already_cached").inc()
+                    continue
+                cancel = self._start(bot)
+                if cancel is None:
+                    PREFETCHED_ANSWERS.labels("cancelled").inc()
+                    continue
+                try:
+                    bot.ask(question, cancel=cancel, background=True)
+                finally:
+                    with self._condition:
+                        self._current = None
+
+                if bot.answer_cache.lookup(question, record=False) is not None:
+                    PREFETCHED_ANSWERS.labels("stored").inc()
+                elif cancel.cancelled():
+                    PREFETCHED_ANSWERS.labels("cancelled").inc()
+                elif attempts + 1 < self.max_attempts:
+                    # Cut short for an interactive caller (or failed): try again later
+                    PREFETCHED_ANSWERS.labels("yielded").inc()
+                    with self._condition:
+                        self._pending.append((bot, question, attempts + 1))
+                else:
+                    PREFETCHED_ANSWERS.labels("gave_up").inc()
+            except Exception:
+                logger.exception("Prefetch failed for %r", question)
+                PREFETCHED_ANSWERS.labels("failed").inc()
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Process-wide prefetcher, so all sessions share one background worker"""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        return _prefetcher
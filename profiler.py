@@ -0,0 +1,251 @@
+# profiler.py
+"""
+Opt-in profiling for Streamlit reruns and single pipeline calls
+
+Reruns are profiled when TOKNOVA_PROFILE is set, or for one session with the
+hidden query parameter `?profile=cprofile` (or `?profile=sample`). Both also
+accept 1/true/on for cprofile; unknown modes are logged and ignored:
+
+    TOKNOVA_PROFILE=cprofile streamlit run app_complete.py
+
+Pipeline calls decorated with `profiled` (parse_resume, get_similarity,
+hr_ask) are profiled when named in TOKNOVA_PROFILE_CALLS, e.g.
+`TOKNOVA_PROFILE_CALLS=parse_resume,hr_ask`. This also covers calls made on
+job queue workers, which a rerun profile does not see.
+
+Each profile writes to TOKNOVA_PROFILE_DIR (default data/profiles):
+- `<name>-<time>.folded`: sampled stacks for flamegraph.pl or speedscope
+- `<name>-<time>.txt`: a text summary
+- `<name>-<time>.prof`: cProfile stats, in cprofile mode (snakeviz, pstats)
+
+When profiling is off, `profiled` returns the function unchanged and
+`profile_script` costs one query parameter read per rerun.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample")
+# Switch-style values accepted for TOKNOVA_PROFILE and ?profile=
+_MODE_ALIASES = {"1": "cprofile", "true": "cprofile", "on": "cprofile", "0": "", "false": "", "off": ""}
+
+
+def _profile_mode(value: str, source: str) -> str:
+    """A profile mode from PROFILE_MODES, or "" for off; unknown values are logged and ignored"""
+    mode = value.strip().lower()
+    mode = _MODE_ALIASES.get(mode, mode)
+    if mode and mode not in PROFILE_MODES:
+        logger.warning("Ignoring unknown profile mode %r from %s; use one of %s", value, source, ", ".join(PROFILE_MODES))
+        return ""
+    return mode
+
+
+PROFILE_MODE = _profile_mode(os.environ.get("TOKNOVA_PROFILE", ""), "TOKNOVA_PROFILE")
+PROFILE_CALLS = {name.strip() for name in os.environ.get("TOKNOVA_PROFILE_CALLS", "").split(",") if name.strip()}
+PROFILE_DIR = os.environ.get(
+    "TOKNOVA_PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "profiles"),
+)
+SAMPLE_INTERVAL = float(os.environ.get("TOKNOVA_PROFILE_INTERVAL", "0.005"))
+
+_local = threading.local()
+
+
+class StackSampler:
+    def __init__(self, thread_id: Optional[int] = None, interval: float = SAMPLE_INTERVAL):
+        """
+        Sample one thread's Python stack on a background thread
+
+        Args:
+            thread_id: Thread to sample; the calling thread if None
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Stacks in Brendan Gregg's folded format: `outer;inner count` per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, limit: int = 30) -> str:
+        """Frames ranked by samples spent inside them (inclusive) and at the top of the stack (self)"""
+        inclusive, own = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for frame in set(frames):
+                inclusive[frame] += count
+            own[frames[-1]] += count
+        total = sum(self.stacks.values()) or 1
+        lines = [f"{total} samples at {self.interval * 1000:.1f} ms", "", "inclusive:"]
+        lines += [f"  {count / total:6.1%}  {frame}" for frame, count in inclusive.most_common(limit)]
+        lines += ["", "self:"]
+        lines += [f"  {count / total:6.1%}  {frame}" for frame, count in own.most_common(limit)]
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile(name: str, mode: str = "cprofile") -> Iterator[None]:
+    """
+    Profile the block and write its reports to PROFILE_DIR
+
+    The stack sampler always runs, so every profile has a flame graph;
+    cprofile mode adds deterministic per-function timings on top.
+
+    Args:
+        name: Report file prefix, e.g. the script or call name
+        mode: "cprofile" or "sample"
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+
+    sampler = StackSampler()
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    started = time.perf_counter()
+    sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+        try:
+            _write_reports(name, elapsed, sampler, profiler)
+        except OSError as e:
+            logger.warning("Could not write profile for %s: %s", name, e)
+
+
+def _write_reports(name: str, elapsed: float, sampler: StackSampler, profiler: Optional[cProfile.Profile]):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}")
+
+    with open(f"{base}.folded", "w", encoding="utf-8") as f:
+        f.write(sampler.folded())
+
+    report = io.StringIO()
+    report.write(f"{name}: {elapsed:.3f} s wall\n\n")
+    report.write(sampler.summary())
+    if profiler:
+        profiler.dump_stats(f"{base}.prof")
+        report.write("\ncProfile, by cumulative time:\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(40)
+    with open(f"{base}.txt", "w", encoding="utf-8") as f:
+        f.write(report.getvalue())
+    logger.info("Profile for %s written to %s.*", name, base)
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """
+    Profile every call of the decorated function if `name` is in TOKNOVA_PROFILE_CALLS
+
+    Otherwise the function is returned as is, with no per-call overhead.
+    """
+    def decorator(func: Callable) -> Callable:
+        if name not in PROFILE_CALLS:
+            return func
+        mode = PROFILE_MODE or "cprofile"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Calls nested inside a profiled rerun or call are already covered
+            if getattr(_local, "active", False):
+                return func(*args, **kwargs)
+            _local.active = True
+            try:
+                with profile(name, mode):
+                    return func(*args, **kwargs)
+            finally:
+                _local.active = False
+        return wrapper
+    return decorator
+
+
+def _requested_mode() -> str:
+    """Rerun profile mode from the environment or this session's `profile` query parameter"""
+    if PROFILE_MODE:
+        return PROFILE_MODE
+    import streamlit as st
+    return _profile_mode(st.query_params.get("profile", ""), "the profile query parameter")
+
+
+_page_config_lock = threading.Lock()
+
+
+def _skip_page_config_in_profiled_reruns(st):
+    """Make st.set_page_config a no-op on threads re-running a script under the profiler"""
+    with _page_config_lock:
+        if getattr(st.set_page_config, "_skips_profiled_reruns", False):
+            return
+        set_page_config = st.set_page_config
+
+        @wraps(set_page_config)
+        def wrapper(*args, **kwargs):
+            # The outer run already configured the page, and a second call raises
+            if getattr(_local, "rerun", False):
+                return None
+            return set_page_config(*args, **kwargs)
+
+        wrapper._skips_profiled_reruns = True
+        st.set_page_config = wrapper
+
+
+def profile_script(script_path: str):
+    """
+    Call at the top of a Streamlit script, right after st.set_page_config
+
+    If profiling is requested, the script is run again under the profiler
+    from here and this outer run then stops, so the whole rerun, including
+    st.stop() and reruns raised inside it, is captured. The re-run's own
+    st.set_page_config call is skipped.
+    """
+    if getattr(_local, "active", False):
+        return
+    mode = _requested_mode()
+    if not mode:
+        return
+
+    import streamlit as st
+    _skip_page_config_in_profiled_reruns(st)
+    name = os.path.splitext(os.path.basename(script_path))[0]
+    _local.active = _local.rerun = True
+    try:
+        with profile(name, mode):
+            runpy.run_path(script_path, run_name="__main__")
+    finally:
+        _local.active = _local.rerun = False
+    st.stop()
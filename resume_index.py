@@ -0,0 +1,238 @@
+# resume_index.py
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "resumes.db")
+# Estimated Jaccard similarity of word 5-shingles above which an upload counts as a near-copy
+DEFAULT_DEDUP_THRESHOLD = float(os.environ.get("RESUME_DEDUP_THRESHOLD", "0.8"))
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL UNIQUE,
+    signature BLOB,
+    candidate TEXT,
+    vector BLOB,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    resume_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, resume_id)
+) WITHOUT ROWID;
+"""
+
+
+def extract_text(data: bytes) -> str:
+    """Plain text of a PDF, or "" if it has none (e.g. a scan)"""
+    import pdfplumber
+    try:
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            return "\n".join(page.extract_text() or "" for page in pdf.pages)
+    except Exception as e:
+        logger.warning("Could not extract resume text for de-duplication: %s", e)
+        return ""
+
+
+class ResumeFingerprint(NamedTuple):
+    sha256: str
+    signature: Optional[np.ndarray]
+
+
+class ResumeMatch(NamedTuple):
+    resume_id: int
+    similarity: float
+    candidate: Dict[str, Any]
+    vector: Optional[np.ndarray]
+    exact: bool = False
+
+    def reusable_vector(self, candidate: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        The stored embedding, if it embeds exactly the text parsed from this upload
+
+        A near-copy can differ in the name or a skill, so its fields are
+        always parsed afresh; only the embedding is reused, and only when the
+        freshly parsed text is identical to the one it was computed from.
+        """
+        if self.vector is None:
+            return None
+        if self.exact or (candidate.get("full_text") or "") == (self.candidate.get("full_text") or ""):
+            return self.vector
+        return None
+
+
+class ResumeIndex:
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, threshold: float = DEFAULT_DEDUP_THRESHOLD, seed: int = 1):
+        """
+        Persistent MinHash/LSH index of ingested resumes
+
+        Each resume's text is reduced to a MinHash signature over word
+        shingles and filed under one bucket per LSH band. A lookup reads only
+        the buckets it shares with earlier resumes, so its cost does not grow
+        with the size of the archive.
+
+        Args:
+            path: SQLite file
+            num_perm: MinHash permutations per signature
+            bands: LSH bands; num_perm / bands rows each. 16 x 8 makes
+                pairs above ~0.7 Jaccard likely to share a bucket
+            shingle_size: Words per shingle
+            threshold: Estimated Jaccard similarity at which a resume counts as a copy
+            seed: Fixes the permutations; changing it invalidates the index
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Older indexes filed copies by hash only, pointing at their original; every upload
+            # is now stored with its own fields, so those entries are dropped and re-learned
+            if "duplicate_of" in {row["name"] for row in conn.execute("PRAGMA table_info(resumes)")}:
+                conn.execute("DELETE FROM resumes WHERE duplicate_of IS NOT NULL")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text's word shingles, or None if it has too few words"""
+        words = _WORD.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return None
+        shingles = {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # a < 2^31 and hash < 2^32, so a * hash + b stays within uint64
+        permuted = (self._a * hashes[None, :] + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _buckets(self, signature: np.ndarray) -> Iterator[tuple]:
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            yield band, int.from_bytes(hashlib.blake2b(rows, digest_size=7).digest(), "big")
+
+    def fingerprint(self, data: bytes) -> ResumeFingerprint:
+        return ResumeFingerprint(hashlib.sha256(data).hexdigest(), self.signature(extract_text(data)))
+
+    def _match(self, conn: sqlite3.Connection, resume_id: int, similarity: float,
+               exact: bool = False) -> Optional[ResumeMatch]:
+        row = conn.execute("SELECT id, candidate, vector FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        if row is None or row["candidate"] is None:
+            return None
+        vector = np.frombuffer(row["vector"], dtype=np.float32) if row["vector"] else None
+        return ResumeMatch(row["id"], similarity, json.loads(row["candidate"]), vector, exact)
+
+    def find(self, fingerprint: ResumeFingerprint) -> Optional[ResumeMatch]:
+        """
+        The earlier resume this one is an exact or near copy of, if any
+
+        An exact copy has the same file hash. A near copy has an estimated
+        Jaccard similarity of its word shingles (the share of equal MinHash
+        values) of at least `threshold`.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM resumes WHERE sha256 = ?", (fingerprint.sha256,)).fetchone()
+            if row is not None:
+                return self._match(conn, row["id"], 1.0, exact=True)
+            if fingerprint.signature is None:
+                return None
+
+            candidates = set()
+            for band, bucket in self._buckets(fingerprint.signature):
+                candidates.update(
+                    r["resume_id"] for r in conn.execute(
+                        "SELECT resume_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+                    )
+                )
+            best_id, best = None, 0.0
+            for resume_id in candidates:
+                stored = conn.execute("SELECT signature FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+                similarity = float(np.mean(np.frombuffer(stored["signature"], dtype=np.uint32) == fingerprint.signature))
+                if similarity > best:
+                    best_id, best = resume_id, similarity
+            if best_id is None or best < self.threshold:
+                return None
+            return self._match(conn, best_id, best)
+
+    def add(self, fingerprint: ResumeFingerprint, candidate: Dict[str, Any],
+            vector: Optional[np.ndarray] = None) -> int:
+        """
+        Record an ingested resume with its parsed fields and embedding
+
+        Near-copies are recorded like any other upload, under their own
+        fields, so an exact re-upload of either file gets back what was
+        parsed from it.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM resumes WHERE sha256 = ?", (fingerprint.sha256,)).fetchone()
+            if row is not None:
+                return row["id"]
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO resumes (sha256, signature, candidate, vector, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        fingerprint.sha256,
+                        fingerprint.signature.tobytes() if fingerprint.signature is not None else None,
+                        json.dumps(candidate),
+                        np.asarray(vector, dtype=np.float32).tobytes() if vector is not None else None,
+                        time.time(),
+                    ),
+                )
+            except sqlite3.IntegrityError:
+                # Another worker recorded the same upload first
+                return conn.execute("SELECT id FROM resumes WHERE sha256 = ?", (fingerprint.sha256,)).fetchone()["id"]
+            resume_id = cursor.lastrowid
+            if fingerprint.signature is not None:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO bands (band, bucket, resume_id) VALUES (?, ?, ?)",
+                    [(band, bucket, resume_id) for band, bucket in self._buckets(fingerprint.signature)],
+                )
+            return resume_id
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_resume_index() -> ResumeIndex:
+    """Process-wide resume index"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ResumeIndex()
+        return _index
@@ -1,7 +1,12 @@
 import tempfile, os
 from pyresparser import ResumeParser
+from metrics import PARSE_RESUME_SECONDS
+from profiler import profiled
+from skill_taxonomy import get_skill_normalizer
 
-def parse_resume(file):
+@PARSE_RESUME_SECONDS.time()
+@profiled("parse_resume")
+def parse_resume(file, canonicalize=True):
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
         tmp.write(file.read())
         tmp_path = tmp.name
@@ -30,6 +35,21 @@ def parse_resume(file):
         }
 
     # Fallbacks and safety checks
+    name, skills, experience = _safe_fields(data)
+    data["skills"] = skills
+
+    # Debug print (optional)
+    print("DEBUG - Parsed Fields:")
+    print("Name:", name)
+    print("Skills:", skills)
+    print("Experience:", experience)
+
+    data["full_text"] = _full_text(name, skills, experience)
+    data["error"] = ""
+
+    return canonicalize_skills(data) if canonicalize else data
+
+def _safe_fields(data):
     name = data.get("name", "")
     skills = data.get("skills", [])
     experience = data.get("experience", "") or data.get("total_experience", "")
@@ -40,21 +60,31 @@ def parse_resume(file):
         skills = []
     if not isinstance(experience, str):
         experience = ""
+    return name, skills, experience
 
-    # Debug print (optional)
-    print("DEBUG - Parsed Fields:")
-    print("Name:", name)
-    print("Skills:", skills)
-    print("Experience:", experience)
-
+def _full_text(name, skills, experience):
     # Safe full_text
-    full_text = " ".join([
+    return " ".join([
         name,
         " ".join(skills),
         experience
     ])
 
-    data["full_text"] = full_text
-    data["error"] = ""
+def canonicalize_skills(data):
+    """
+    Collapse a parsed resume's skill variants (e.g. "ML", "Machine-Learning") into canonical taxonomy names
 
+    Sets skills, raw_skills and skill_ids, and rebuilds full_text from the
+    canonical names so the embedded text matches the skills shown and indexed.
+    Skills the alias table misses may need the embedding model, so parse
+    worker processes leave this to the parent (parse_resume(canonicalize=False)).
+    """
+    if data.get("error") or "skill_ids" in data:
+        return data
+    name, raw_skills, experience = _safe_fields(data)
+    skills, skill_ids = get_skill_normalizer().canonicalize(raw_skills)
+    data["skills"] = skills
+    data["raw_skills"] = raw_skills
+    data["skill_ids"] = skill_ids
+    data["full_text"] = _full_text(name, skills, experience)
     return data
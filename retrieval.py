@@ -0,0 +1,93 @@
+# retrieval.py
+import re
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from semantic_cache import default_embed
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+|\n+|\s+[•▪●]\s*")
+_BULLETS = {"•", "▪", "●", "-", "*"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about 4/3 tokens per word)"""
+    return (len(text.split()) * 4 + 2) // 3
+
+
+def chunk_text(text: str, max_words: int = 80) -> List[str]:
+    """Split text into passages of whole sentences, each at most `max_words` words"""
+    chunks, current = [], []
+    for sentence in _SENTENCE_BREAK.split(text or ""):
+        words = [word for word in sentence.split() if word not in _BULLETS]
+        while words:
+            room = max_words - len(current)
+            if len(words) > room and current:
+                chunks.append(" ".join(current))
+                current = []
+                continue
+            current.extend(words[:max_words])
+            words = words[max_words:]
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class Passage(NamedTuple):
+    source: str
+    text: str
+    score: float
+
+
+class PassageIndex:
+    def __init__(self, documents: Sequence[Tuple[str, str]], max_words: int = 80,
+                 embed: Callable[[Sequence[str]], np.ndarray] = default_embed):
+        """
+        Chunk and embed documents once for per-question retrieval
+
+        Args:
+            documents: (source, text) pairs, e.g. ("resume", ...), ("job", ...)
+            max_words: Passage size
+            embed: Maps texts to L2-normalized row vectors
+        """
+        self.embed = embed
+        self.passages: List[Tuple[str, str]] = [
+            (source, chunk) for source, text in documents for chunk in chunk_text(text, max_words)
+        ]
+        self.vectors = embed([text for _, text in self.passages]) if self.passages else None
+
+    @classmethod
+    def merge(cls, indexes: Sequence["PassageIndex"]) -> "PassageIndex":
+        """One index over already-embedded ones, e.g. a candidate's resume plus a shared JD"""
+        merged = cls([], embed=indexes[0].embed)
+        merged.passages = [passage for index in indexes for passage in index.passages]
+        vectors = [index.vectors for index in indexes if index.vectors is not None]
+        merged.vectors = np.vstack(vectors) if vectors else None
+        return merged
+
+    def search(self, question: str, token_budget: int = 600, min_score: float = 0.1,
+               vector: Optional[np.ndarray] = None) -> List[Passage]:
+        """
+        Best-scoring passages for a question that fit within `token_budget`
+
+        Passages scoring below `min_score` are left out even if they would fit.
+
+        Returns:
+            Passages in their original document order
+        """
+        if not self.passages:
+            return []
+        if vector is None:
+            vector = self.embed([question])[0]
+        scores = self.vectors @ vector
+
+        chosen, used = [], 0
+        for i in np.argsort(-scores):
+            if scores[i] < min_score:
+                break
+            cost = estimate_tokens(self.passages[i][1])
+            if used + cost > token_budget:
+                continue
+            chosen.append(int(i))
+            used += cost
+        return [Passage(*self.passages[i], float(scores[i])) for i in sorted(chosen)]
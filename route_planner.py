@@ -0,0 +1,200 @@
+# route_planner.py
+import math
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class Stop(NamedTuple):
+    name: str
+    lat: float
+    lon: float
+    hours: float = 0.0
+
+
+class Visit(NamedTuple):
+    stop: Stop
+    start: float
+    end: float
+    travel_minutes: int
+    travel_km: float
+
+
+class Route(NamedTuple):
+    stops: List[Stop]
+    km: float
+    legs: List[float]
+
+
+def distance_matrix(stops: Sequence[Stop]) -> np.ndarray:
+    """Great-circle distances in km between every pair of stops"""
+    lat = np.radians([s.lat for s in stops])
+    lon = np.radians([s.lon for s in stops])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def format_hour(hour: float) -> str:
+    """9.25 -> "09:15\""""
+    minutes = int(round(hour * 60))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class RoutePlanner:
+    def __init__(self, time_budget: float = 0.03, speed_kmh: float = 15.0, regional_kmh: float = 60.0,
+                 city_km: float = 10.0, transfer_minutes: float = 10.0, day_start: float = 9.0,
+                 day_hours: float = 9.0):
+        """
+        Order stops into a short route and pack it into days
+
+        Routes start from a nearest-neighbour tour and are then improved
+        with 2-opt moves (reversing a segment when that shortens the path)
+        until no move helps or `time_budget` runs out, so 50 stops still
+        return within tens of milliseconds.
+
+        Args:
+            time_budget: Seconds allowed for 2-opt improvement per route
+            speed_kmh: Average door-to-door speed between stops in a city
+            regional_kmh: Speed for the part of a trip beyond `city_km` (train or road)
+            city_km: Distance covered at city speed before regional speed applies
+            transfer_minutes: Fixed time added to every move between stops
+            day_start: Hour the first visit of each day starts
+            day_hours: Hours of sightseeing and travel per day
+        """
+        self.time_budget = time_budget
+        self.speed_kmh = speed_kmh
+        self.regional_kmh = regional_kmh
+        self.city_km = city_km
+        self.transfer_minutes = transfer_minutes
+        self.day_start = day_start
+        self.day_hours = day_hours
+
+    @staticmethod
+    def _nearest_neighbour(dist: np.ndarray, start: int) -> List[int]:
+        n = len(dist)
+        visited = np.zeros(n, dtype=bool)
+        order = [start]
+        visited[start] = True
+        for _ in range(n - 1):
+            row = np.where(visited, np.inf, dist[order[-1]])
+            nxt = int(np.argmin(row))
+            order.append(nxt)
+            visited[nxt] = True
+        return order
+
+    def _two_opt(self, dist: np.ndarray, order: List[int], closed: bool, deadline: float) -> List[int]:
+        """Reverse segments while that shortens the path; the first stop stays fixed"""
+        path = np.array(order + [order[0]] if closed else order)
+        n = len(path)
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i in range(1, n - 1):
+                # Reversing path[i..j] swaps edges (i-1, i) and (j, j+1); score every j at once
+                a, b = path[i - 1], path[i]
+                c, d = path[i + 1:n - 1], path[i + 2:n]
+                delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+                if not closed:
+                    # An open path can also have its whole tail reversed, which drops edge (j, j+1)
+                    delta = np.append(delta, dist[a, path[-1]] - dist[a, b])
+                if not len(delta):
+                    continue
+                k = int(np.argmin(delta))
+                if delta[k] < -1e-9:
+                    j = i + 1 + k
+                    path[i:j + 1] = path[i:j + 1][::-1].copy()
+                    improved = True
+                if time.perf_counter() >= deadline:
+                    break
+        return [int(i) for i in (path[:-1] if closed else path)]
+
+    def order(self, stops: Sequence[Stop], start: int = 0, closed: bool = False,
+              time_budget: Optional[float] = None) -> Route:
+        """
+        Short visiting order for the stops
+
+        Args:
+            stops: Places with coordinates
+            start: Index of the stop the route begins at
+            closed: Whether the route returns to the start (e.g. the hotel)
+            time_budget: Seconds for 2-opt; the planner's default if None
+
+        Returns:
+            Route with the reordered stops, total km and per-leg km
+        """
+        stops = list(stops)
+        if len(stops) < 2:
+            return Route(stops, 0.0, [])
+        deadline = time.perf_counter() + (self.time_budget if time_budget is None else time_budget)
+        dist = distance_matrix(stops)
+        order = self._nearest_neighbour(dist, start)
+        if len(stops) > 3:
+            order = self._two_opt(dist, order, closed, deadline)
+        path = order + [order[0]] if closed else order
+        legs = [float(dist[a, b]) for a, b in zip(path, path[1:])]
+        return Route([stops[i] for i in order], sum(legs), legs)
+
+    def travel_minutes(self, km: float) -> int:
+        """Estimated door-to-door minutes for a trip of `km`"""
+        if km <= 0:
+            return 0
+        hours = min(km, self.city_km) / self.speed_kmh + max(km - self.city_km, 0.0) / self.regional_kmh
+        return int(math.ceil(hours * 60 + self.transfer_minutes))
+
+    def schedule(self, stops: Sequence[Stop], days: int, start: Optional[Stop] = None) -> Tuple[List[List[Visit]], List[Stop]]:
+        """
+        Route the stops and split the route into days
+
+        Each day starts at `day_start` from `start` (e.g. the city centre or
+        hotel) and takes stops in route order while visit and travel time fit
+        in `day_hours`. A stop longer than a whole day gets a day to itself.
+        Without a start, the first day begins at the first stop and each later
+        day at the previous day's last stop, so the first leg of the day is
+        still counted.
+
+        Args:
+            stops: Attractions with visit hours
+            days: Days available
+            start: Where every day begins, or None to carry on from the previous day
+
+        Returns:
+            (visits per day, stops that did not fit in the days)
+        """
+        if start is not None:
+            route = self.order([start] + list(stops), start=0, closed=True).stops[1:]
+            places = [start] + route
+        else:
+            route = self.order(stops).stops
+            places = list(route)
+        dist = distance_matrix(places) if places else np.zeros((0, 0))
+        offset = len(places) - len(route)
+
+        schedule: List[List[Visit]] = []
+        position = 0
+        here: Optional[int] = None
+        for _ in range(max(int(days), 0)):
+            if position == len(route):
+                break
+            day: List[Visit] = []
+            clock = self.day_start
+            if start is not None:
+                here = 0
+            end_of_day = self.day_start + self.day_hours
+            while position < len(route):
+                stop = route[position]
+                km = float(dist[here, position + offset]) if here is not None else 0.0
+                travel = self.travel_minutes(km)
+                arrive = clock + travel / 60
+                if day and arrive + stop.hours > end_of_day:
+                    break
+                day.append(Visit(stop, arrive, arrive + stop.hours, travel, round(km, 1)))
+                clock, here = arrive + stop.hours, position + offset
+                position += 1
+            schedule.append(day)
+        remaining = route[position:]
+        return schedule, remaining
@@ -0,0 +1,143 @@
+# semantic_cache.py
+import hashlib
+import logging
+import os
+import random
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from metrics import SEMANTIC_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.88"))
+DEFAULT_SAMPLE_RATE = float(os.environ.get("SEMANTIC_CACHE_SAMPLE_RATE", "0.05"))
+
+
+def default_embed(texts: Sequence[str]) -> np.ndarray:
+    """Embed with the shared MiniLM model, imported on first use so callers that never embed don't load it"""
+    from jd_matcher import encode
+    return encode(texts)
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, max_entries: int = 256,
+                 sample_rate: float = DEFAULT_SAMPLE_RATE,
+                 embed: Callable[[Sequence[str]], np.ndarray] = default_embed):
+        """
+        Answer cache matched on question meaning rather than exact text
+
+        Args:
+            threshold: Minimum cosine similarity to the nearest past question for a hit
+            max_entries: Oldest answers are evicted beyond this many
+            sample_rate: Fraction of hits recorded in `samples` for false-hit review
+            embed: Maps texts to L2-normalized row vectors
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.sample_rate = sample_rate
+        self.embed = embed
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._questions = []
+        self._answers = []
+
+        self.hits = 0
+        self.misses = 0
+        self.samples = deque(maxlen=100)
+
+    def lookup(self, question: str, vector: Optional[np.ndarray] = None, record: bool = True) -> Optional[str]:
+        """
+        Return the stored answer for the nearest past question above the threshold
+
+        Pass record=False for internal checks (e.g. prefetch) that should not count toward hit-rate stats.
+        """
+        if vector is None:
+            vector = self.embed([question])[0]
+        with self._lock:
+            if not self._questions:
+                if record:
+                    self.misses += 1
+                    SEMANTIC_CACHE_LOOKUPS.labels("miss").inc()
+                return None
+            similarities = self._vectors @ vector
+            best = int(similarities.argmax())
+            score = float(similarities[best])
+            if score < self.threshold:
+                if record:
+                    self.misses += 1
+                    SEMANTIC_CACHE_LOOKUPS.labels("miss").inc()
+                return None
+            if not record:
+                return self._answers[best]
+
+            self.hits += 1
+            SEMANTIC_CACHE_LOOKUPS.labels("hit").inc()
+            if random.random() < self.sample_rate:
+                sample = {"question": question, "matched": self._questions[best], "score": round(score, 4)}
+                self.samples.append(sample)
+                logger.info("Semantic cache hit sample: %s", sample)
+            return self._answers[best]
+
+    def store(self, question: str, answer: str, vector: Optional[np.ndarray] = None):
+        if vector is None:
+            vector = self.embed([question])[0]
+        with self._lock:
+            row = np.asarray(vector, dtype=np.float32)[None, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            self._questions.append(question)
+            self._answers.append(answer)
+            if len(self._questions) > self.max_entries:
+                self._vectors = self._vectors[1:]
+                del self._questions[0], self._answers[0]
+
+    def get_or_generate(self, question: str, generate: Callable[[], str]) -> str:
+        """
+        Serve a cached answer or generate, store and return a new one
+
+        Exceptions from `generate` propagate and nothing is stored.
+        """
+        vector = self.embed([question])[0]
+        answer = self.lookup(question, vector)
+        if answer is None:
+            answer = generate()
+            self.store(question, answer, vector)
+        return answer
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._questions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "sampled_hits": len(self.samples),
+        }
+
+
+_caches: "OrderedDict[str, SemanticCache]" = OrderedDict()
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(candidate_text: str, job_description: str, model: str, task: str = "interactive",
+                       threshold: float = DEFAULT_THRESHOLD, max_scopes: int = 128) -> SemanticCache:
+    """
+    Process-wide cache scoped to one (candidate, JD, model, task)
+
+    Sessions screening the same candidate against the same JD share answers;
+    a quick answer is never served for an in-depth request, or the reverse.
+    """
+    scope = hashlib.sha256("\x00".join([candidate_text, job_description, model, task]).encode("utf-8")).hexdigest()
+    with _caches_lock:
+        cache = _caches.get(scope)
+        if cache is None:
+            cache = _caches[scope] = SemanticCache(threshold=threshold)
+            if len(_caches) > max_scopes:
+                _caches.popitem(last=False)
+        else:
+            _caches.move_to_end(scope)
+        return cache
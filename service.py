@@ -0,0 +1,151 @@
+# service.py
+"""
+HTTP API for the resume pipeline, for callers outside Streamlit (e.g. the ATS)
+
+Run with: uvicorn service:app --host 0.0.0.0 --port 8000 --workers 2
+
+The service keeps no per-user state: every chat request carries the candidate,
+job description and score, so replicas can sit behind any load balancer.
+"""
+import asyncio
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from candidate_store import get_candidate_store
+from chatbot import get_hr_chatbot
+from metrics import PARSE_RESUME_SECONDS
+from resume_utils import canonicalize_skills, parse_resume
+
+# Resume parsing is CPU-bound Python (spaCy, pdfminer), so it gets processes;
+# embedding runs in torch, which releases the GIL, so threads are enough
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", os.cpu_count() or 2))
+EMBED_WORKERS = int(os.environ.get("EMBED_WORKERS", "2"))
+
+_parse_pool = None
+_embed_pool = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+
+app = FastAPI(title="Toknova HR Service")
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _parse_pool
+
+
+def _parse_bytes(data: bytes) -> Dict[str, Any]:
+    # Skills are canonicalized back in the API process, so no parse worker loads MiniLM
+    return parse_resume(io.BytesIO(data), canonicalize=False)
+
+
+def _score(job_description: str, resumes: List[str]) -> List[float]:
+    # Runs on _embed_pool, a thread pool in this API process; importing here keeps MiniLM
+    # (or the embedding-server client) unloaded until the first scoring request
+    from jd_matcher import get_similarities
+    from job_profile import get_job_profile
+    return get_similarities(resumes, get_job_profile(job_description))
+
+
+class ScoreRequest(BaseModel):
+    job_description: str
+    resumes: List[str]
+
+
+class CandidateSearchRequest(BaseModel):
+    skills: Optional[str] = None
+    min_experience: Optional[float] = None
+    max_experience: Optional[float] = None
+    min_pages: Optional[int] = None
+    max_pages: Optional[int] = None
+    job_description: Optional[str] = None
+    limit: int = 100
+
+
+class ChatRequest(BaseModel):
+    candidate: Dict[str, Any]
+    job_description: str
+    match_score: float
+    question: str
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.post("/parse")
+async def parse(file: UploadFile = File(...)):
+    """Upload a PDF resume and get the parsed candidate fields"""
+    data = await file.read()
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    loop = asyncio.get_running_loop()
+    # Timed here: the histogram observed inside the parse processes never reaches this registry
+    with PARSE_RESUME_SECONDS.time():
+        candidate = await loop.run_in_executor(_get_parse_pool(), _parse_bytes, data)
+    if candidate.get("error"):
+        raise HTTPException(status_code=422, detail=candidate["error"])
+    return await loop.run_in_executor(_embed_pool, canonicalize_skills, candidate)
+
+
+@app.post("/score")
+async def score(request: ScoreRequest):
+    """Score a batch of resume texts against one job description"""
+    if not request.resumes:
+        return {"scores": []}
+    loop = asyncio.get_running_loop()
+    scores = await loop.run_in_executor(_embed_pool, _score, request.job_description, request.resumes)
+    return {"scores": scores}
+
+
+@app.post("/candidates/search")
+async def search_candidates(request: CandidateSearchRequest):
+    """Query stored candidates by boolean skill expression and ranges; ranked by JD match if one is given"""
+    store = get_candidate_store()
+    filters = dict(skills=request.skills, min_experience=request.min_experience,
+                   max_experience=request.max_experience, min_pages=request.min_pages,
+                   max_pages=request.max_pages, limit=request.limit)
+    loop = asyncio.get_running_loop()
+    try:
+        if request.job_description:
+            hits = await loop.run_in_executor(_embed_pool, lambda: store.rank(request.job_description, **filters))
+        else:
+            hits = await run_in_threadpool(store.search, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"candidates": [hit._asdict() for hit in hits]}
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    """Stream an HR answer as server-sent events: "token" events, then "done\""""
+    try:
+        bot = await run_in_threadpool(get_hr_chatbot, request.candidate, request.job_description, request.match_score)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    def events():
+        # A sync generator: Starlette iterates it in its threadpool, off the event loop
+        answered: Dict[str, Any] = {}
+        for chunk in bot.ask_stream(request.question, answered=answered):
+            yield f"event: token\ndata: {json.dumps({'text': chunk})}\n\n"
+        # The model that actually answered (after routing and hedging); null for a rule-based answer
+        yield f"event: done\ndata: {json.dumps({'model': answered['model']})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
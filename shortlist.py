@@ -0,0 +1,219 @@
+# shortlist.py
+import json
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import ollama
+
+from candidate_record import CandidateRecord
+from chatbot import get_available_model
+from job_profile import JobProfile, get_job_profile
+from llm_gate import LLMGate, default_gate
+from metrics import LLM_ERRORS, error_category, record_ollama_usage
+from model_router import get_model_router
+from retrieval import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SHORTLIST_PROMPT = """You are an expert HR assistant comparing candidates for one job.
+
+{job_section}
+
+CANDIDATES:
+{candidates}
+
+Rank every candidate above from best to worst fit for this job.
+Mark at most {shortlist_size} of them "shortlist" and the rest "reject".
+Respond with JSON only, in exactly this form, including every candidate ID once:
+{{"ranking": [{{"id": "C1", "decision": "shortlist", "reason": "one short sentence"}}]}}"""
+
+# Tokens of JSON output each ranked candidate needs
+OUTPUT_TOKENS_PER_CANDIDATE = 40
+
+
+class CandidateSummary(NamedTuple):
+    id: str
+    name: str
+    score: float
+    text: str
+
+
+class ShortlistEvaluator:
+    def __init__(self, job_description: Union[str, JobProfile], shortlist_size: int = 3,
+                 context_tokens: int = 4096, max_batch: int = 12, summary_words: int = 60,
+                 model: Optional[str] = None, gate: LLMGate = default_gate):
+        """
+        Rank many candidates for one JD with a few batched LLM calls
+
+        Candidate summaries are packed into as few prompts as the context
+        window allows. If the pool needs several prompts, each batch is ranked
+        and its best candidates advance to the next round, until the survivors
+        fit in one final prompt, so LLM calls grow with pool size divided by
+        batch size rather than with pool size.
+
+        Args:
+            job_description: Job description text, or its shared JobProfile
+            shortlist_size: Candidates to mark "shortlist"
+            context_tokens: Ollama context window (num_ctx) per call
+            max_batch: Most candidates ranked in one call
+            summary_words: Resume words quoted per candidate
+            model: Ollama model; the router's analysis pick if None
+            gate: Concurrency gate shared with other Ollama callers
+        """
+        self.job_profile = get_job_profile(job_description)
+        self.shortlist_size = shortlist_size
+        self.context_tokens = context_tokens
+        self.max_batch = max_batch
+        self.summary_words = summary_words
+        self.model = model
+        self.gate = gate
+        self.llm_calls = 0
+
+    def summarize(self, candidate_id: str, candidate: Union[Dict[str, Any], CandidateRecord], score: float,
+                  label: str = "") -> CandidateSummary:
+        """Compact prompt block for one candidate"""
+        candidate = CandidateRecord.coerce(candidate)
+        matched = ", ".join(sorted(self.job_profile.matched_skills(candidate.skills))) or "none"
+        missing = ", ".join(sorted(self.job_profile.missing_skills(candidate.skills))) or "none"
+        name = candidate.name or label or candidate_id
+        resume = " ".join(candidate.full_text.split()[:self.summary_words])
+        text = (
+            f"[{candidate_id}] {name} | Experience: {candidate.total_experience:g} years"
+            f" | Match score: {score * 100:.1f}%\n"
+            f"Required skills held: {matched}\n"
+            f"Required skills missing: {missing}\n"
+            f"Resume: {resume}"
+        )
+        return CandidateSummary(candidate_id, name, score, text)
+
+    def _batches(self, summaries: Sequence[CandidateSummary]) -> List[List[CandidateSummary]]:
+        """Pack summaries, best match score first, into prompts that fit the context window"""
+        overhead = estimate_tokens(SHORTLIST_PROMPT + self.job_profile.prompt_section)
+        budget = self.context_tokens - overhead
+        batches, current, used = [], [], 0
+        for summary in sorted(summaries, key=lambda s: -s.score):
+            cost = estimate_tokens(summary.text) + OUTPUT_TOKENS_PER_CANDIDATE
+            # Two per batch at least, so every tournament round shrinks the pool
+            if current and len(current) >= 2 and (used + cost > budget or len(current) >= self.max_batch):
+                batches.append(current)
+                current, used = [], 0
+            current.append(summary)
+            used += cost
+        if current:
+            if len(current) == 1 and batches:
+                batches[-1].append(current[0])
+            else:
+                batches.append(current)
+        return batches
+
+    def _select_model(self) -> str:
+        model = self.model or get_model_router().select("analysis") or get_available_model()
+        if not model:
+            raise RuntimeError("No Ollama models found. Please install a model first: 'ollama pull llama3.2'")
+        return model
+
+    def _rank_batch(self, batch: Sequence[CandidateSummary], model: str) -> List[Dict[str, Any]]:
+        """One LLM call ranking a batch; candidates the model skips are appended by match score"""
+        prompt = SHORTLIST_PROMPT.format(
+            job_section=self.job_profile.prompt_section,
+            candidates="\n\n".join(summary.text for summary in batch),
+            shortlist_size=min(self.shortlist_size, len(batch)),
+        )
+        try:
+            with self.gate.slot():
+                response = ollama.chat(
+                    model=model,
+                    messages=[{'role': 'user', 'content': prompt}],
+                    format='json',
+                    options={
+                        'temperature': 0.2,
+                        'num_ctx': self.context_tokens,
+                        'num_predict': OUTPUT_TOKENS_PER_CANDIDATE * len(batch) + 50,
+                    },
+                )
+        except Exception as e:
+            LLM_ERRORS.labels(error_category(e)).inc()
+            raise
+        self.llm_calls += 1
+        record_ollama_usage(model, response)
+
+        try:
+            data = json.loads(response['message']['content'])
+            entries = data.get("ranking", []) if isinstance(data, dict) else data
+        except (ValueError, AttributeError):
+            logger.warning("Shortlist response was not valid JSON; falling back to match score order")
+            entries = []
+        if not isinstance(entries, list):
+            entries = []
+
+        by_id = {summary.id: summary for summary in batch}
+        ranked, seen = [], set()
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            candidate_id = str(entry.get("id", "")).strip().strip("[]")
+            if candidate_id in by_id and candidate_id not in seen:
+                seen.add(candidate_id)
+                decision = "shortlist" if str(entry.get("decision", "")).lower() == "shortlist" else "reject"
+                ranked.append({"id": candidate_id, "decision": decision, "reason": str(entry.get("reason", ""))})
+        for summary in sorted(batch, key=lambda s: -s.score):
+            if summary.id not in seen:
+                ranked.append({"id": summary.id, "decision": "reject", "reason": "Not ranked by the model"})
+        return ranked
+
+    def rank(self, candidates: Sequence[Dict[str, Any]],
+             progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Rank a pool of candidates for the JD
+
+        Args:
+            candidates: Dicts with "candidate" (parsed resume), "score" and optional "label"
+            progress: Called with (fraction done, message) after each LLM call
+
+        Returns:
+            {"ranking": [{"rank", "id", "name", "label", "score", "decision", "reason"}, ...],
+             "llm_calls": int, "model": str}
+        """
+        summaries = [
+            self.summarize(f"C{i + 1}", c["candidate"], c["score"], c.get("label", ""))
+            for i, c in enumerate(candidates)
+        ]
+        if not summaries:
+            return {"ranking": [], "llm_calls": 0, "model": self.model}
+        by_id = {summary.id: summary for summary in summaries}
+        model = self._select_model()
+        self.llm_calls = 0
+
+        # Candidates knocked out in later rounds rank above those knocked out earlier
+        eliminated_rounds = []
+        pool = summaries
+        while True:
+            batches = self._batches(pool)
+            if len(batches) == 1:
+                final = self._rank_batch(batches[0], model)
+                break
+            advancing, eliminated = [], []
+            for batch in batches:
+                ranked = self._rank_batch(batch, model)
+                keep = max(1, min(self.shortlist_size, len(batch) // 2))
+                advancing.extend(by_id[entry["id"]] for entry in ranked[:keep])
+                eliminated.extend(dict(entry, decision="reject") for entry in ranked[keep:])
+                if progress:
+                    progress(min(0.9, 0.3 + 0.05 * self.llm_calls), f"🏆 Ranked {self.llm_calls} batch(es)...")
+            eliminated_rounds.append(eliminated)
+            pool = advancing
+
+        shortlisted = 0
+        for entry in final:
+            if entry["decision"] == "shortlist":
+                shortlisted += 1
+                if shortlisted > self.shortlist_size:
+                    entry["decision"] = "reject"
+        entries = final + [entry for eliminated in reversed(eliminated_rounds) for entry in eliminated]
+        labels = {f"C{i + 1}": c.get("label", "") for i, c in enumerate(candidates)}
+        ranking = [
+            {"rank": rank, "id": entry["id"], "name": by_id[entry["id"]].name, "label": labels[entry["id"]],
+             "score": by_id[entry["id"]].score, "decision": entry["decision"], "reason": entry["reason"]}
+            for rank, entry in enumerate(entries, start=1)
+        ]
+        return {"ranking": ranking, "llm_calls": self.llm_calls, "model": model}
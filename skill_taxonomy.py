@@ -0,0 +1,225 @@
+# skill_taxonomy.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_TAXONOMY_PATH = os.path.join(DATA_DIR, "skill_taxonomy.jsonl")
+DEFAULT_MATRIX_PATH = os.path.join(DATA_DIR, "skill_taxonomy.npz")
+
+# Cosine similarity a raw skill needs to its nearest taxonomy entry to be mapped to it
+DEFAULT_THRESHOLD = float(os.environ.get("SKILL_MATCH_THRESHOLD", "0.8"))
+
+_SEPARATORS = re.compile(r"[\s\-_/]+")
+
+
+def alias_key(skill: str) -> str:
+    """Spelling-insensitive lookup key: "Machine-Learning " -> "machine learning\""""
+    return _SEPARATORS.sub(" ", str(skill).lower()).strip(" .,;:")
+
+
+class SkillMatch(NamedTuple):
+    skill_id: str
+    name: str
+    score: float
+    method: str  # "alias" or "embedding"
+
+
+class SkillNormalizer:
+    def __init__(self, taxonomy_path: str = DEFAULT_TAXONOMY_PATH, matrix_path: Optional[str] = DEFAULT_MATRIX_PATH,
+                 threshold: float = DEFAULT_THRESHOLD, max_memo: int = 50000,
+                 embed: Optional[Callable[[Sequence[str]], np.ndarray]] = None):
+        """
+        Map raw skill strings to canonical taxonomy IDs
+
+        Exact and alias lookup (case, spacing and hyphenation ignored) comes
+        first. Skills it misses go to a nearest-neighbour search against the
+        embeddings of every taxonomy name and alias, one batched encode per
+        call. Every raw string's outcome, match or not, is memoized, so a
+        resume's skills usually resolve without touching the model.
+
+        Args:
+            taxonomy_path: JSONL of {"id", "name", "aliases"} entries
+            matrix_path: Cache of the taxonomy embedding matrix, or None to keep it in memory only
+            threshold: Minimum cosine similarity for an embedding match
+            max_memo: Raw strings remembered, least recently used dropped first
+            embed: Maps texts to L2-normalized row vectors; jd_matcher.encode if None
+        """
+        self.taxonomy_path = taxonomy_path
+        self.matrix_path = matrix_path
+        self.threshold = threshold
+        self.max_memo = max_memo
+        self._embed = embed
+        self.names: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._phrases: List[Tuple[str, str]] = []
+        with open(taxonomy_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.names[entry["id"]] = entry["name"]
+                for phrase in [entry["name"], entry["id"], *entry.get("aliases", [])]:
+                    self._aliases.setdefault(alias_key(phrase), entry["id"])
+                    # Also catch run-together spellings such as "MachineLearning"
+                    self._aliases.setdefault(alias_key(phrase).replace(" ", ""), entry["id"])
+                    self._phrases.append((entry["id"], phrase))
+        self._matrix: Optional[np.ndarray] = None
+        self._row_ids: List[str] = []
+        self._memo: "OrderedDict[str, Optional[SkillMatch]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._matrix_lock = threading.Lock()
+
+    def _encode(self, texts: Sequence[str]) -> np.ndarray:
+        if self._embed is None:
+            from jd_matcher import encode
+            return encode(texts)
+        return self._embed(texts)
+
+    def _digest(self) -> str:
+        from embedding_server import MODEL_NAME
+        with open(self.taxonomy_path, "rb") as f:
+            return hashlib.sha256(f.read() + MODEL_NAME.encode("utf-8")).hexdigest()
+
+    def matrix(self) -> np.ndarray:
+        """Embeddings of every taxonomy name and alias, computed once and cached on disk"""
+        with self._matrix_lock:
+            if self._matrix is None:
+                phrases = [phrase for _, phrase in self._phrases]
+                digest = self._digest() if self.matrix_path and self._embed is None else None
+                matrix = None
+                if digest:
+                    try:
+                        with np.load(self.matrix_path) as cached:
+                            if str(cached["digest"]) == digest:
+                                matrix = cached["matrix"]
+                    except (OSError, KeyError, ValueError):
+                        pass
+                if matrix is None:
+                    matrix = np.asarray(self._encode(phrases), dtype=np.float32)
+                    if digest:
+                        tmp_path = f"{self.matrix_path}.tmp.npz"
+                        np.savez(tmp_path, digest=digest, matrix=matrix)
+                        os.replace(tmp_path, self.matrix_path)
+                self._row_ids = [skill_id for skill_id, _ in self._phrases]
+                self._matrix = matrix
+            return self._matrix
+
+    def lookup(self, skill: str) -> Optional[str]:
+        """Taxonomy ID from the alias table or an earlier normalize() call; never runs the model"""
+        key = alias_key(skill)
+        skill_id = self._aliases.get(key) or self._aliases.get(key.replace(" ", ""))
+        if skill_id is None:
+            with self._lock:
+                match = self._memo.get(str(skill))
+            skill_id = match.skill_id if match else None
+        return skill_id
+
+    def _remember(self, skill: str, match: Optional[SkillMatch]):
+        with self._lock:
+            self._memo[skill] = match
+            self._memo.move_to_end(skill)
+            if len(self._memo) > self.max_memo:
+                self._memo.popitem(last=False)
+
+    def normalize(self, skills: Sequence[str]) -> List[Optional[SkillMatch]]:
+        """
+        Taxonomy match for each raw skill, or None where nothing is close enough
+
+        Args:
+            skills: Raw skill strings, e.g. pyresparser's `skills`
+
+        Returns:
+            One SkillMatch or None per input, in order
+        """
+        skills = [str(skill) for skill in skills]
+        results: List[Optional[SkillMatch]] = [None] * len(skills)
+        unknown: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, skill in enumerate(skills):
+                if skill in self._memo:
+                    self._memo.move_to_end(skill)
+                    results[i] = self._memo[skill]
+                else:
+                    unknown.setdefault(skill, []).append(i)
+
+        misses = []
+        for skill, positions in unknown.items():
+            key = alias_key(skill)
+            skill_id = self._aliases.get(key) or self._aliases.get(key.replace(" ", ""))
+            if skill_id:
+                match = SkillMatch(skill_id, self.names[skill_id], 1.0, "alias")
+                self._remember(skill, match)
+                for i in positions:
+                    results[i] = match
+            elif len(key) > 2:
+                # One- and two-letter strings are too ambiguous to guess from an embedding
+                misses.append(skill)
+            else:
+                self._remember(skill, None)
+
+        if misses:
+            try:
+                similarities = np.asarray(self._encode(misses), dtype=np.float32) @ self.matrix().T
+            except Exception as e:
+                # Left out of the memo so they are retried once the model is available
+                logger.warning("Skill embedding lookup failed: %s", e)
+                return results
+            best = similarities.argmax(axis=1)
+            for skill, row, scores in zip(misses, best, similarities):
+                score = float(scores[row])
+                match = None
+                if score >= self.threshold:
+                    skill_id = self._row_ids[row]
+                    match = SkillMatch(skill_id, self.names[skill_id], round(score, 3), "embedding")
+                self._remember(skill, match)
+                for i in unknown[skill]:
+                    results[i] = match
+        return results
+
+    def canonicalize(self, skills: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """
+        Canonical skill names and IDs for a resume's raw skills
+
+        Variants of one skill collapse into its taxonomy name; skills outside
+        the taxonomy are kept as written.
+
+        Returns:
+            (names without duplicates in first-seen order, sorted taxonomy IDs)
+        """
+        names: Dict[str, None] = {}
+        ids = set()
+        for skill, match in zip(skills, self.normalize(skills)):
+            if match:
+                ids.add(match.skill_id)
+                names.setdefault(match.name)
+            elif str(skill).strip():
+                names.setdefault(str(skill).strip())
+        return list(names), sorted(ids)
+
+
+def skill_key(skill: str) -> str:
+    """Key skills are compared and indexed under: the taxonomy ID when known, else lowercased and single-spaced"""
+    return get_skill_normalizer().lookup(skill) or " ".join(str(skill).lower().split())
+
+
+_normalizer = None
+_normalizer_lock = threading.Lock()
+
+
+def get_skill_normalizer() -> SkillNormalizer:
+    """Process-wide normalizer, so the taxonomy matrix and memo are shared"""
+    global _normalizer
+    with _normalizer_lock:
+        if _normalizer is None:
+            _normalizer = SkillNormalizer()
+        return _normalizer
@@ -0,0 +1,109 @@
+# tests/conftest.py
+import os
+import sys
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Never reach for a running embedding server from the tests
+os.environ["EMBED_SOCKET"] = ""
+
+
+def trigram_embed(texts):
+    """Deterministic stand-in for MiniLM: normalized character-trigram counts"""
+    out = np.zeros((len(texts), 512), dtype=np.float32)
+    for row, text in enumerate(texts):
+        text = f"  {str(text).lower()}  "
+        for i in range(len(text) - 2):
+            out[row, zlib.crc32(text[i:i + 3].encode("utf-8")) % 512] += 1
+    return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
+
+
+@pytest.fixture
+def fake_embed(monkeypatch):
+    import jd_matcher
+    monkeypatch.setattr(jd_matcher, "encode", trigram_embed)
+    return trigram_embed
+
+
+class FakeHealth:
+    def __init__(self):
+        self.running = True
+        self.reason = None
+
+    def status(self, refresh=False):
+        from degraded_mode import OllamaStatus
+        return OllamaStatus(self.running, ["fake"] if self.running else [])
+
+    def degraded_reason(self):
+        if not self.running:
+            return "the AI model is unavailable right now"
+        return self.reason
+
+
+@pytest.fixture
+def health(monkeypatch):
+    import chatbot
+    fake = FakeHealth()
+    monkeypatch.setattr(chatbot, "get_ollama_health", lambda: fake)
+    return fake
+
+
+class FakeOllama:
+    """Replaces ollama.Client; answers name the model, and `block` holds a stream before its first part"""
+
+    def __init__(self):
+        self.calls = []
+        self.timeouts = []
+        self.block = None
+        self.error = None
+        self.closed = threading.Event()
+
+    def client(self, host=None, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        return self
+
+    def chat(self, model, messages, options=None, stream=False):
+        self.calls.append(model)
+        if self.error is not None:
+            raise self.error
+        fake = self
+
+        class Stream:
+            def __iter__(self):
+                if fake.block is not None:
+                    fake.block.wait()
+                yield {"message": {"content": f"answer from {model} #{len(fake.calls)}"}, "done": False}
+                yield {"message": {"content": ""}, "done": True, "eval_count": 5, "eval_duration": 10 ** 9}
+
+            def close(self):
+                fake.closed.set()
+
+        return Stream()
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch):
+    import bounded_chat
+    fake = FakeOllama()
+    monkeypatch.setattr(bounded_chat.ollama, "Client", fake.client)
+    yield fake
+    if fake.block is not None:
+        # Let streams still waiting on the block finish
+        fake.block.set()
+
+
+@pytest.fixture
+def make_bot(fake_embed, health, fake_ollama, request):
+    """HRChatbot over a candidate unique to the test, so process-wide caches don't leak between tests"""
+    from chatbot import HRChatbot
+
+    def make(model="fast", **kwargs):
+        candidate = {"name": "Ana", "total_experience": 4, "skills": ["Python", "SQL"],
+                     "full_text": f"Ana Python SQL 4 years ({request.node.nodeid})"}
+        return HRChatbot(candidate, f"Backend Engineer\n3+ years of Python ({request.node.nodeid})", 0.8,
+                         model=model, **kwargs)
+    return make
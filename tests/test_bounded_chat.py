@@ -0,0 +1,46 @@
+# tests/test_bounded_chat.py
+import threading
+import time
+
+from bounded_chat import BoundedChat, is_truncated
+from llm_gate import LLMGate
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _slot_free_within(gate, seconds):
+    try:
+        with gate.slot(timeout=seconds):
+            return True
+    except TimeoutError:
+        return False
+
+
+def test_streams_the_answer(fake_ollama):
+    gate = LLMGate(1)
+    text = "".join(BoundedChat("fast", MESSAGES, {}, deadline=5, gate=gate))
+    assert text == "answer from fast #1"
+    assert 0 < fake_ollama.timeouts[0] <= 5
+
+
+def test_deadline_frees_the_slot_while_stuck_before_the_first_token(fake_ollama):
+    fake_ollama.block = threading.Event()
+    gate = LLMGate(1)
+    chat = BoundedChat("slow", MESSAGES, {}, deadline=0.5, gate=gate)
+
+    started = time.monotonic()
+    assert is_truncated("".join(chat))
+    assert chat.truncated and time.monotonic() - started < 2
+    assert _slot_free_within(gate, 1)
+
+
+def test_cancel_frees_the_slot_while_stuck_before_the_first_token(fake_ollama):
+    fake_ollama.block = threading.Event()
+    gate = LLMGate(1)
+    cancel = threading.Event()
+    chat = BoundedChat("slow", MESSAGES, {}, deadline=60, gate=gate, cancel=cancel)
+    threading.Timer(0.3, cancel.set).start()
+
+    assert is_truncated("".join(chat))
+    assert chat.stop_reason == "cancelled"
+    assert _slot_free_within(gate, 1)
@@ -0,0 +1,96 @@
+# tests/test_candidate_store.py
+import pytest
+
+from candidate_store import CandidateStore, parse_skill_query
+
+
+def test_and_binds_tighter_than_or():
+    assert parse_skill_query("docker OR kubernetes AND terraform") == (
+        "or", [("skill", "docker"), ("and", [("skill", "kubernetes"), ("skill", "terraform")])]
+    )
+
+
+def test_parentheses_override_precedence():
+    assert parse_skill_query("(docker OR kubernetes) AND terraform") == (
+        "and", [("or", [("skill", "docker"), ("skill", "kubernetes")]), ("skill", "terraform")]
+    )
+
+
+def test_not_applies_to_the_next_factor():
+    assert parse_skill_query("NOT docker AND terraform") == (
+        "and", [("not", ("skill", "docker")), ("skill", "terraform")]
+    )
+    assert parse_skill_query("NOT (docker OR terraform)") == (
+        "not", ("or", [("skill", "docker"), ("skill", "terraform")])
+    )
+
+
+def test_words_and_quotes_form_one_skill():
+    assert parse_skill_query('data engineering AND NOT "r and d"') == (
+        "and", [("skill", "data engineering"), ("not", ("skill", "r and d"))]
+    )
+
+
+def test_unknown_skills_are_kept_lowercased():
+    assert parse_skill_query("Quantum Basket Weaving") == ("skill", "quantum basket weaving")
+
+
+def test_blank_query_is_none():
+    assert parse_skill_query("   ") is None
+
+
+@pytest.mark.parametrize("query", [
+    "docker AND", "AND docker", "docker OR OR terraform", "(docker", "docker)", "NOT", "()", '""',
+])
+def test_malformed_queries_raise(query):
+    with pytest.raises(ValueError):
+        parse_skill_query(query)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    for i, (name, years, skills) in enumerate([
+        ("Ana", 6, ["Docker", "Kubernetes", "Terraform"]),
+        ("Ben", 3, ["Docker", "Python"]),
+        ("Cy", 9, ["Terraform"]),
+    ]):
+        store.add(f"sha{i}", {"name": name, "total_experience": years, "skills": skills, "no_of_pages": 1})
+    return store
+
+
+def _names(hits):
+    return [hit.name for hit in hits]
+
+
+@pytest.mark.parametrize("limit", [None, 1, 100])
+def test_search_matches_the_boolean_query(store, limit):
+    expected = ["Cy", "Ana"][:limit] if limit else ["Cy", "Ana"]
+    assert _names(store.search("terraform", limit=limit)) == expected
+    assert _names(store.search("docker AND NOT kubernetes")) == ["Ben"]
+    assert _names(store.search("NOT docker")) == ["Cy"]
+    assert _names(store.search("(python OR terraform) AND docker")) == ["Ana", "Ben"]
+
+
+def test_search_for_unknown_skill_is_empty(store):
+    assert store.search("cobol") == []
+    assert _names(store.search("cobol OR python")) == ["Ben"]
+
+
+def test_search_rejects_malformed_query(store):
+    with pytest.raises(ValueError):
+        store.search("docker AND (python")
+
+
+def test_rank_over_more_candidates_than_sqlite_binds_per_query(tmp_path, fake_embed, monkeypatch):
+    import candidate_store
+    monkeypatch.setattr(candidate_store, "_IDS_PER_QUERY", 7)
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    for i in range(30):
+        store.add(f"sha{i}", {"name": f"C{i}", "total_experience": i, "skills": ["Python"],
+                              "full_text": f"Python developer number {i}"})
+
+    hits = store.rank("Python developer number 12", limit=25)
+    assert len(hits) == 25 and hits[0].name == "C12"
+    # Every vector was stored by the first rank, so the second reads them back
+    assert [hit.name for hit in store.rank("Python developer number 12", limit=25)] == [hit.name for hit in hits]
@@ -0,0 +1,75 @@
+# tests/test_chatbot.py
+import pytest
+
+from chatbot import HRChatbot
+
+QUESTION = "What are the candidate's key strengths?"
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    """Quick questions go to "fast", in-depth analysis to "deep\""""
+    models = {"interactive": "fast", "analysis": "deep"}
+    monkeypatch.setattr(HRChatbot, "_select_model", lambda self, task, latency_budget=None: models[task])
+
+
+def test_analysis_answer_is_not_served_for_quick_question(make_bot, fake_ollama, routed):
+    bot = make_bot(model=None)
+    deep = bot.ask(QUESTION, task="analysis")
+    quick = bot.ask(QUESTION)
+    assert "answer from deep" in deep
+    assert "answer from fast" in quick
+    assert fake_ollama.calls == ["deep", "fast"]
+
+
+def test_answer_is_filed_under_the_model_that_wrote_it(make_bot, fake_ollama):
+    bot = make_bot(model="fast")
+    bot.ask(QUESTION)
+    assert bot._answer_cache("fast", "interactive").lookup(QUESTION, record=False) is not None
+    assert bot._answer_cache("fast", "analysis").lookup(QUESTION, record=False) is None
+
+
+def test_lookup_uses_the_scope_of_the_routed_model(make_bot, fake_ollama, routed):
+    bot = make_bot(model=None)
+    first = bot.ask(QUESTION, task="analysis")
+    again = bot.ask(QUESTION, task="analysis")
+    assert again == first
+    assert fake_ollama.calls == ["deep"]
+
+
+def test_concurrent_first_questions_build_the_passages_once(make_bot, fake_ollama, monkeypatch):
+    import threading
+
+    import chatbot
+    bot = make_bot()
+    built = []
+    merge = chatbot.PassageIndex.merge
+
+    def counting_merge(indexes):
+        built.append(True)
+        return merge(indexes)
+
+    monkeypatch.setattr(chatbot.PassageIndex, "merge", staticmethod(counting_merge))
+    threads = [threading.Thread(target=bot._retrieve, args=(f"question {i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+
+
+def test_ask_stream_reports_the_model_that_answered(make_bot, fake_ollama, health, routed):
+    bot = make_bot(model=None)
+    answered = {}
+    text = "".join(bot.ask_stream(QUESTION, task="analysis", answered=answered))
+    assert text.startswith("answer from deep") and answered["model"] == "deep"
+
+    # Served from the analysis cache, still credited to the model that wrote it
+    answered = {}
+    "".join(bot.ask_stream(QUESTION, task="analysis", answered=answered))
+    assert answered["model"] == "deep"
+
+    health.running = False
+    answered = {}
+    "".join(bot.ask_stream("Something new entirely?", answered=answered))
+    assert answered["model"] is None
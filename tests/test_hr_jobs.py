@@ -0,0 +1,76 @@
+# tests/test_hr_jobs.py
+import time
+
+import pytest
+
+import hr_jobs
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=1, poll_interval=0.05)
+    queue.register("ask", hr_jobs._ask)
+    queue.start()
+    monkeypatch.setattr(hr_jobs, "_queue", queue)
+    return queue
+
+
+def _wait(queue, job_id, timeout=10):
+    ends = time.monotonic() + timeout
+    while time.monotonic() < ends:
+        job = queue.get(job_id)
+        if job["status"] in ("done", "failed", "cancelled"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_degraded_answer_is_not_reused_after_recovery(queue, make_bot, health, fake_ollama, monkeypatch):
+    bot = make_bot()
+    monkeypatch.setattr(hr_jobs, "get_hr_chatbot", lambda *args: bot)
+    ask = lambda: hr_jobs.submit_question(bot.candidate, bot.job_description, bot.match_score, "Key strengths?")
+
+    health.running = False
+    first = ask()
+    assert _wait(queue, first)["result"]["answer"].startswith("⚡ _Quick answer")
+    assert fake_ollama.calls == []
+
+    health.running = True
+    second = ask()
+    assert second != first
+    assert _wait(queue, second)["result"]["answer"] == "answer from fast #1"
+    # A model answer is reused as before
+    assert ask() == second
+
+
+def test_generation_failure_gives_a_degraded_answer_not_a_failed_job(queue, make_bot, fake_ollama, monkeypatch):
+    bot = make_bot()
+    monkeypatch.setattr(hr_jobs, "get_hr_chatbot", lambda *args: bot)
+    ask = lambda: hr_jobs.submit_question(bot.candidate, bot.job_description, bot.match_score, "Key strengths?")
+
+    fake_ollama.error = ConnectionError("connection dropped")
+    first = ask()
+    job = _wait(queue, first)
+    assert job["status"] == "done"
+    assert job["result"]["answer"].startswith("⚡ _Quick answer")
+
+    fake_ollama.error = None
+    second = ask()
+    assert second != first
+    assert _wait(queue, second)["result"]["answer"].startswith("answer from fast")
+
+
+def test_analysis_questions_run_as_their_own_task(queue, make_bot, fake_ollama, monkeypatch):
+    from chatbot import HRChatbot
+    monkeypatch.setattr(HRChatbot, "_select_model",
+                        lambda self, task, latency_budget=None: "deep" if task == "analysis" else "fast")
+    bot = make_bot()
+    monkeypatch.setattr(hr_jobs, "get_hr_chatbot", lambda *args: bot)
+    args = (bot.candidate, bot.job_description, bot.match_score, "Provide detailed analysis.")
+
+    quick = hr_jobs.submit_question(*args)
+    analysis = hr_jobs.submit_question(*args, task="analysis")
+    assert quick != analysis
+    assert _wait(queue, quick)["result"]["answer"].startswith("answer from fast")
+    assert _wait(queue, analysis)["result"]["answer"].startswith("answer from deep")
@@ -0,0 +1,68 @@
+# tests/test_job_profile.py
+import threading
+import time
+import uuid
+
+import pytest
+
+import jd_matcher
+import job_profile
+from conftest import trigram_embed
+
+
+@pytest.fixture
+def slow_embed(monkeypatch):
+    """Embedding that takes 0.2s per call and counts the job descriptions it sees"""
+    seen = []
+
+    def embed(texts):
+        seen.extend(texts)
+        time.sleep(0.2)
+        return trigram_embed(texts)
+    monkeypatch.setattr(jd_matcher, "encode", embed)
+    return seen
+
+
+def _in_threads(targets):
+    results = [None] * len(targets)
+    threads = [threading.Thread(target=lambda i=i, f=f: results.__setitem__(i, f())) for i, f in enumerate(targets)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_different_jds_build_in_parallel(slow_embed):
+    jds = [f"Data Engineer {uuid.uuid4()}", f"Frontend Developer {uuid.uuid4()}"]
+    started = time.perf_counter()
+    _in_threads([lambda jd=jd: job_profile.get_job_profile(jd) for jd in jds])
+    # Each build embeds twice (JD vector, then passages); serialized builds would take ~0.8s
+    assert time.perf_counter() - started < 0.7
+
+
+def test_same_jd_is_built_once(slow_embed, monkeypatch):
+    built = []
+
+    class CountingProfile(job_profile.JobProfile):
+        def __init__(self, job_description, **kwargs):
+            built.append(job_description)
+            super().__init__(job_description, **kwargs)
+    monkeypatch.setattr(job_profile, "JobProfile", CountingProfile)
+
+    jd = f"ML Engineer {uuid.uuid4()}"
+    profiles = _in_threads([lambda: job_profile.get_job_profile(jd)] * 4)
+    assert all(profile is profiles[0] for profile in profiles)
+    assert built == [jd]
+
+
+def test_failed_build_is_retried(monkeypatch):
+    jd = f"QA Engineer {uuid.uuid4()}"
+
+    def broken(texts):
+        raise RuntimeError("model unavailable")
+    monkeypatch.setattr(jd_matcher, "encode", broken)
+    with pytest.raises(RuntimeError):
+        job_profile.get_job_profile(jd)
+    monkeypatch.setattr(jd_matcher, "encode", trigram_embed)
+    assert job_profile.get_job_profile(jd).job_description == jd
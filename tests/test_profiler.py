@@ -0,0 +1,34 @@
+# tests/test_profiler.py
+import types
+
+import profiler
+
+
+def test_page_config_is_skipped_only_inside_profiled_rerun():
+    calls = []
+    st = types.SimpleNamespace(set_page_config=lambda **kwargs: calls.append(kwargs))
+    profiler._skip_page_config_in_profiled_reruns(st)
+    profiler._skip_page_config_in_profiled_reruns(st)  # installed once
+
+    st.set_page_config(page_title="outer")
+    profiler._local.rerun = True
+    try:
+        st.set_page_config(page_title="profiled re-run")
+    finally:
+        profiler._local.rerun = False
+    st.set_page_config(page_title="next rerun")
+
+    assert calls == [{"page_title": "outer"}, {"page_title": "next rerun"}]
+
+
+def test_profile_mode_aliases_and_unknown_values(caplog):
+    assert profiler._profile_mode(" CProfile ", "test") == "cprofile"
+    assert profiler._profile_mode("sample", "test") == "sample"
+    for on in ("1", "true", "On"):
+        assert profiler._profile_mode(on, "TOKNOVA_PROFILE") == "cprofile"
+    for off in ("", "0", "false", "off"):
+        assert profiler._profile_mode(off, "TOKNOVA_PROFILE") == ""
+    assert not caplog.records
+
+    assert profiler._profile_mode("flamegraph", "TOKNOVA_PROFILE") == ""
+    assert "flamegraph" in caplog.text and "TOKNOVA_PROFILE" in caplog.text
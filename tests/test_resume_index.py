@@ -0,0 +1,91 @@
+# tests/test_resume_index.py
+import hashlib
+
+import numpy as np
+import pytest
+
+from resume_index import ResumeFingerprint, ResumeIndex
+
+BASE = " ".join(
+    f"worked on project {i} building data pipelines in python and sql for the analytics team" for i in range(30)
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ResumeIndex(path=str(tmp_path / "resumes.db"), threshold=0.8)
+
+
+def _fingerprint(index, text):
+    return ResumeFingerprint(hashlib.sha256(text.encode("utf-8")).hexdigest(), index.signature(text))
+
+
+def _candidate(name, text):
+    return {"name": name, "skills": ["Python", "SQL"], "full_text": text}
+
+
+def test_exact_copy_reuses_everything(index):
+    vector = np.ones(4, dtype=np.float32)
+    original = _fingerprint(index, BASE)
+    index.add(original, _candidate("Ana", BASE), vector)
+
+    match = index.find(original)
+    assert match.exact and match.similarity == 1.0
+    assert match.candidate["name"] == "Ana"
+    assert np.array_equal(match.reusable_vector({}), vector)
+
+
+def test_near_copy_above_threshold_is_found_but_not_exact(index):
+    index.add(_fingerprint(index, BASE), _candidate("Ana", BASE), np.ones(4, dtype=np.float32))
+    edited = BASE.replace("project 29", "project twenty nine")
+
+    match = index.find(_fingerprint(index, edited))
+    assert match is not None and not match.exact
+    assert 0.8 <= match.similarity < 1.0
+
+
+def test_unrelated_resume_below_threshold_is_not_matched(index):
+    index.add(_fingerprint(index, BASE), _candidate("Ana", BASE), np.ones(4, dtype=np.float32))
+    other = " ".join(f"taught class {i} of secondary school chemistry and biology students" for i in range(30))
+
+    assert index.find(_fingerprint(index, other)) is None
+
+
+def test_near_copy_reuses_vector_only_for_identical_parsed_text(index):
+    vector = np.arange(4, dtype=np.float32)
+    index.add(_fingerprint(index, BASE), _candidate("Ana", BASE), vector)
+    match = index.find(_fingerprint(index, BASE.replace("project 29", "project twenty nine")))
+
+    # Same parsed text (e.g. only the layout changed): the embedding still fits
+    assert np.array_equal(match.reusable_vector(_candidate("Ana B.", BASE)), vector)
+    # A new skill or sentence changes the text, so it must be embedded afresh
+    assert match.reusable_vector(_candidate("Ana", BASE + " kubernetes")) is None
+
+
+def test_near_copy_is_recorded_under_its_own_fields(index):
+    vector = np.ones(4, dtype=np.float32)
+    original = index.add(_fingerprint(index, BASE), _candidate("Ana", BASE), vector)
+    edited = BASE.replace("project 29", "project twenty nine")
+    copy = _fingerprint(index, edited)
+    assert index.find(copy).resume_id == original
+
+    copy_id = index.add(copy, _candidate("Ana B.", edited), vector)
+    match = index.find(copy)
+    assert match.exact and match.resume_id == copy_id != original
+    assert match.candidate["name"] == "Ana B."
+
+
+def test_hash_only_copies_from_older_indexes_are_dropped(tmp_path):
+    path = str(tmp_path / "resumes.db")
+    index = ResumeIndex(path=path)
+    original = index.add(_fingerprint(index, BASE), _candidate("Ana", BASE), np.ones(4, dtype=np.float32))
+    copy = _fingerprint(index, BASE + " ")
+    with index._connect() as conn:
+        conn.execute("ALTER TABLE resumes ADD COLUMN duplicate_of INTEGER")
+        conn.execute("INSERT INTO resumes (sha256, duplicate_of, created_at) VALUES (?, ?, 0)",
+                     (copy.sha256, original))
+
+    reopened = ResumeIndex(path=path)
+    # Found again as a near-copy (to be re-parsed), not as an exact copy with the original's fields
+    assert not reopened.find(copy).exact
+    assert reopened.find(_fingerprint(reopened, BASE)).exact
@@ -0,0 +1,56 @@
+# tests/test_route_planner.py
+from route_planner import RoutePlanner, Stop
+
+# Stops about 1.1 km apart along a line of longitude
+LINE = [Stop(f"S{i}", 48.0 + i * 0.01, 2.0, hours=1.0) for i in range(6)]
+
+
+def test_open_route_visits_a_line_in_order():
+    shuffled = [LINE[0], LINE[3], LINE[1], LINE[5], LINE[2], LINE[4]]
+    route = RoutePlanner().order(shuffled, start=0)
+    assert [stop.name for stop in route.stops] == [stop.name for stop in LINE]
+    assert len(route.legs) == len(LINE) - 1
+    assert abs(route.km - sum(route.legs)) < 1e-9
+
+
+def test_closed_route_adds_the_leg_back_to_the_start():
+    planner = RoutePlanner()
+    open_route = planner.order(LINE, start=0)
+    closed = planner.order(LINE, start=0, closed=True)
+    assert closed.stops[0] == LINE[0]
+    assert len(closed.legs) == len(LINE)
+    # Out along the line and back again
+    assert abs(closed.km - 2 * open_route.km) < 0.01
+
+
+def test_stop_longer_than_a_day_gets_a_day_to_itself():
+    planner = RoutePlanner(day_hours=9)
+    stops = [Stop("Museum", 48.0, 2.0, hours=12), Stop("Park", 48.01, 2.0, hours=2)]
+    days, remaining = planner.schedule(stops, days=3)
+    assert [[visit.stop.name for visit in day] for day in days] == [["Museum"], ["Park"]]
+    assert days[0][0].end - days[0][0].start == 12
+    assert remaining == []
+
+
+def test_stops_that_do_not_fit_are_returned():
+    planner = RoutePlanner(day_hours=3)
+    days, remaining = planner.schedule(LINE, days=2)
+    scheduled = [visit.stop for day in days for visit in day]
+    assert len(days) == 2 and remaining
+    assert sorted(scheduled + remaining) == sorted(LINE)
+    assert all(visit.end <= planner.day_start + planner.day_hours for day in days for visit in day)
+
+
+def test_days_without_a_start_carry_on_from_the_previous_day():
+    planner = RoutePlanner(day_hours=3)
+    days, _ = planner.schedule(LINE, days=2)
+    assert days[0][0].travel_km == 0.0
+    assert days[1][0].travel_km > 0.0
+    assert days[1][0].start > planner.day_start
+
+
+def test_days_with_a_start_begin_there():
+    planner = RoutePlanner(day_hours=3)
+    hotel = Stop("Hotel", 47.99, 2.0)
+    days, _ = planner.schedule(LINE, days=2, start=hotel)
+    assert all(day[0].travel_km > 0.0 for day in days)
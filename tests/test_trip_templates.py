@@ -0,0 +1,26 @@
+# tests/test_trip_templates.py
+import pytest
+
+from destination_filter import DestinationFilter
+from destination_index import DestinationIndex
+from destination_store import DestinationStore
+from trip_templates import TripRenderer
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    store = DestinationStore()
+    return TripRenderer(store, DestinationIndex(store.iter_names()), DestinationFilter.from_store(store))
+
+
+def test_plan_reruns_do_not_rank_the_catalogue_again(renderer, monkeypatch):
+    calls = []
+    rank = renderer.destination_filter.rank
+    monkeypatch.setattr(renderer.destination_filter, "rank", lambda *args, **kwargs: calls.append(1) or rank(*args, **kwargs))
+
+    first = renderer.plan("Paris", 1, 2500, ["Culture"], "May")
+    assert renderer.plan("paris", 1, 2500, ["Culture"], "May") == first
+    assert len(calls) == 1
+    assert "over 1 day" in first
+    renderer.plan("Paris", 2, 2500, ["Culture"], "May")
+    assert len(calls) == 2
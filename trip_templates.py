@@ -0,0 +1,751 @@
+# trip_templates.py
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from destination_store import band_for_daily_cost
+from route_planner import RoutePlanner, Stop, format_hour
+
+# Stands in for the budget figure inside cached plans, which are shared by
+# every budget in the same band; it is filled in by str.join per request
+_BUDGET_SLOT = "\x00budget\x00"
+
+BAND_LABELS = {"budget": "budget", "mid": "mid-range", "luxury": "luxury"}
+
+ITINERARY_HEADER = Template("""
+### 📅 Detailed ${duration}-Day Itinerary for ${name}
+
+""")
+
+DAY_1 = Template("""**Day 1: Arrival + City Introduction**
+**Morning:**
+* ✈️ *Arrival in ${name}*
+* Check-in to hotel (recommended areas: city center for easy access)
+* Local breakfast to start your cultural immersion
+
+**Afternoon:**
+* First major attraction: ${activity_0}
+* Lunch at local restaurant
+* Walking tour of main district
+
+**Evening:**
+* Sunset at scenic viewpoint
+* Welcome dinner featuring: ${food_0}
+* Early rest to overcome jet lag
+
+""")
+
+DAY_2 = Template("""**Day 2: Major Landmarks & Attractions**
+**Morning:**
+* Early start to ${activity_1}
+* Guided tour or audio guide recommended
+* Coffee break at local café
+
+**Afternoon:**
+* Visit to ${activity_2}
+* Lunch: Try ${food_1}
+* Shopping at local markets
+
+**Evening:**
+* ${activity_3}
+* Dinner at traditional restaurant
+* Night walk through historic district
+
+""")
+
+DAY_3 = Template("""**Day 3: Cultural Immersion & Local Experiences**
+**Morning:**
+* ${activity_4}
+* Breakfast at local favorite spot
+* Cooking class or cultural workshop
+
+**Afternoon:**
+* Food tour featuring: ${food_tour}
+* Visit local markets and artisan shops
+* Relaxation at park or café
+
+**Evening:**
+* Traditional entertainment or live music
+* Dinner at hidden gem restaurant
+* Stroll through nightlife district
+
+""")
+
+EXTENDED_DAYS = Template("""**Day ${first_day}+: Extended Exploration & Day Trips**
+**For longer stays, consider:**
+* Day trips to nearby attractions
+* Specialized interest tours (food, history, adventure)
+* Relaxation and spa experiences
+* Meeting locals and cultural exchange
+* Photography tours of hidden gems
+* Shopping for authentic souvenirs
+
+""")
+
+DAY_4_PLUS = EXTENDED_DAYS.substitute(first_day=4)
+
+SCHEDULED_DAY = Template("""**Day ${day}: ${title}**
+${arrival}${visits}* 🍽️ Local food to try: ${food}
+* *🗺️ ${km} km between stops*
+
+""")
+
+SCHEDULED_VISIT = Template("""* 🕘 ${start}-${end} · ${name}${travel}
+""")
+
+UNSCHEDULED = Template("""*⏳ Not enough days for: ${names}. Add a day to fit them in.*
+
+""")
+
+MULTI_CITY_HEADER = Template("""
+## 🗺️ Multi-City Route: ${route}
+
+**Duration:** ${days} · **Travel between cities:** ${km} km
+
+${legs}
+""")
+
+MULTI_CITY_LEG = Template("""* **${name}** (${days} day${plural})${next}
+""")
+
+GENERIC_ITINERARY = Template("""
+### 📅 Detailed ${duration}-Day Itinerary for ${name}
+
+**Day 1: Arrival + City Introduction**
+**Morning:**
+* ✈️ *Arrival in ${name}*
+* Check-in to accommodation
+* Local breakfast and orientation
+
+**Afternoon:**
+* Main city center exploration
+* Visit primary landmark or attraction
+* Lunch at recommended local restaurant
+
+**Evening:**
+* Sunset viewing at scenic location
+* Welcome dinner with local specialties
+* Early rest for jet lag recovery
+
+**Day 2: Major Attractions**
+**Morning:**
+* Early visit to top-rated attraction
+* Guided tour of historic district
+* Coffee break at local café
+
+**Afternoon:**
+* Museum or cultural site visit
+* Traditional lunch experience
+* Local market exploration
+
+**Evening:**
+* Cultural performance or entertainment
+* Dinner at traditional restaurant
+* Night walk through city center
+
+**Day 3+: Cultural Immersion**
+* Cooking classes or workshops
+* Food tours and tastings
+* Local neighborhood exploration
+* Day trips to nearby attractions
+* Shopping for authentic souvenirs
+* Meeting locals and cultural exchange
+""")
+
+PLAN = Template("""
+## 🌟 Complete Trip Plan for ${name}
+
+**Duration:** ${duration} days
+**Budget:** ${budget}
+**Interests:** ${interests}
+
+### 📍 Destination Overview
+${description}
+
+### 🌍 Essential Information
+* **Best Time to Visit:** ${best_time}
+* **Currency:** ${currency}
+* **Language:** ${language}
+* **Daily Budget:** ${budget_range}
+* **Your Budget:** ${budget} (${band} per day over ${days})
+
+### 🚌 Transportation
+${transport}
+
+### 🍽️ Must-Try Local Cuisine
+${food}
+
+### 🎯 Top Attractions
+${activities}
+
+${itinerary}
+
+### 💡 Pro Tips
+* Book accommodations in advance, especially during peak season
+* Learn basic phrases in ${language}
+* Keep copies of important documents
+* Research local customs and etiquette
+* Consider travel insurance
+* Download offline maps and translation apps
+""")
+
+GENERIC_PLAN = Template("""
+## 🔍 Custom Trip Plan for ${name}
+${did_you_mean}
+**Duration:** ${duration} days
+**Budget:** ${budget}
+**Interests:** ${interests}
+
+### 📍 Destination Information
+I'd be happy to help you plan your trip to ${name}! Here's a comprehensive plan:
+
+${itinerary}
+
+### 📝 General Planning Tips
+* Research visa requirements well in advance
+* Check vaccination requirements
+* Book flights and accommodations early
+* Learn about local customs and etiquette
+* Research local transportation options
+* Consider travel insurance
+* Download useful apps (translation, maps, currency)
+
+### 🎯 Based on Your Interests
+""")
+
+DESTINATION_OVERVIEW = Template("""
+## 📍 ${name}
+${description}
+
+* **Best Time to Visit:** ${best_time}
+* **Daily Budget:** ${budget_range}
+* **Currency:** ${currency}
+* **Language:** ${language}
+* **Getting Around:** ${transport}
+* **Top Attractions:** ${activities}
+* **Must-Try Food:** ${food}
+
+Use the sidebar to turn this into a detailed day-by-day itinerary!
+""")
+
+INTEREST_TIPS = {
+    "Adventure": "* Look for outdoor activities, hiking trails, and adventure sports\n",
+    "Culture": "* Visit museums, historical sites, and cultural landmarks\n",
+    "Food": "* Try local cuisine, take food tours, and visit markets\n",
+    "Relaxation": "* Find spas, beaches, or peaceful locations\n",
+    "Nature": "* Explore national parks, gardens, and natural attractions\n",
+    "History": "* Visit historical sites, museums, and heritage locations\n",
+    "Shopping": "* Explore local markets, shopping districts, and artisan shops\n",
+    "Nightlife": "* Research bars, clubs, and entertainment venues\n",
+}
+
+SUGGESTIONS_HEADER = Template("""
+### 🧭 ${title}
+*Ranked for $$${daily} per day over ${days}${interests}${month}*
+
+""")
+
+SUGGESTION = Template("""* **${name}** - ${budget_range} · ${tags} · ${match}% match
+""")
+
+NO_SUGGESTIONS = """
+### 🧭 Destinations That Fit
+No destination in the catalogue fits this budget, season and interests; try a larger budget, a shorter trip or fewer filters.
+"""
+
+GENERAL_REPLY = Template("""
+Thanks for your question: "${prompt}"
+
+I'd be happy to help with your international travel planning! Here are some insights:
+
+**For specific destination advice:** Use the sidebar to create a detailed itinerary for any country or city.
+
+**General international travel tips:**
+* Research visa requirements well in advance
+* Check vaccination and health requirements
+* Understand local customs and etiquette
+* Learn basic phrases in the local language
+* Research local transportation options
+* Consider travel insurance
+* Keep digital and physical copies of important documents
+
+**Popular international destinations in our database:**
+🇫🇷 Paris, France | 🇯🇵 Tokyo, Japan | 🇺🇸 New York, USA | 🇬🇧 London, UK | 🇮🇹 Rome, Italy | 🇹🇭 Bangkok, Thailand | 🇦🇺 Sydney, Australia | 🇦🇪 Dubai, UAE
+
+Feel free to ask about specific countries, budget tips, or use the sidebar for a complete itinerary!
+""")
+
+
+def _days(count: int) -> str:
+    """1 -> "1 day", 3 -> "3 days\""""
+    return f"{count} day{'s' if count != 1 else ''}"
+
+
+def _pick(items: List[str], index: int, fallback: str) -> str:
+    return items[index] if len(items) > index else fallback
+
+
+class TripRenderer:
+    def __init__(self, store, index, destination_filter=None, route_planner: Optional[RoutePlanner] = None,
+                 cache_size: int = 256):
+        """
+        Render trip plans from precompiled templates with bounded memoization
+
+        Plans are cached by (destination key, duration, interests, budget
+        band), so repeated sidebar clicks and chat messages are a lookup.
+        With a destination filter, plans end with other destinations that
+        fit the exact budget, interests and month, ranked once per distinct
+        request and then memoized like the plans.
+
+        Args:
+            store: DestinationStore the records are read from
+            index: DestinationIndex used to resolve free-text destinations
+            destination_filter: DestinationFilter for ranked suggestions, or None
+            route_planner: Orders attractions and cities; a default RoutePlanner if None
+            cache_size: Entries kept per LRU
+        """
+        self.store = store
+        self.index = index
+        self.destination_filter = destination_filter
+        self.route_planner = route_planner or RoutePlanner()
+        self._itinerary = lru_cache(maxsize=cache_size)(self._render_itinerary)
+        self._plan = lru_cache(maxsize=cache_size)(self._render_plan)
+        self._overview = lru_cache(maxsize=cache_size)(self._render_overview)
+        self._multi_city = lru_cache(maxsize=cache_size)(self._render_multi_city)
+        self._suggestions = lru_cache(maxsize=cache_size)(self._render_suggestions)
+
+    def _cache_key(self, destination: str) -> Tuple[Optional[str], str]:
+        """Known destinations share entries across spellings; unknown ones key on their text"""
+        dest_key = self.index.resolve(destination)
+        return dest_key, "" if dest_key else destination.strip()
+
+    def itinerary(self, destination: str, duration: int) -> str:
+        """Day-by-day itinerary markdown"""
+        return self._itinerary(*self._cache_key(destination), int(duration))
+
+    def plan(self, destination: str, duration: int, budget: int, interests: Sequence[str],
+             month: Optional[str] = None) -> str:
+        """Complete trip plan markdown"""
+        duration = int(duration)
+        band = band_for_daily_cost(budget / max(duration, 1))
+        dest_key, label = self._cache_key(destination)
+        parts = self._plan(dest_key, label, duration, tuple(interests), band)
+        text = str(budget).join(parts)
+        if self.destination_filter is not None:
+            text += self.suggestions(duration, budget, interests, month, exclude=(dest_key,) if dest_key else (),
+                                     title="Other Destinations That Fit")
+        return text
+
+    def suggestions(self, duration: int, budget: int, interests: Sequence[str], month: Optional[str] = None,
+                    limit: int = 5, exclude: Sequence[str] = (), title: str = "Destinations That Fit") -> str:
+        """Markdown list of catalogue destinations ranked for the budget, interests and month"""
+        if self.destination_filter is None:
+            return ""
+        # Chat history re-renders every plan on each rerun, so the ranking is memoized
+        return self._suggestions(int(duration), budget, tuple(interests), month, limit, tuple(exclude), title)
+
+    def _render_suggestions(self, duration: int, budget: int, interests: Tuple[str, ...], month: Optional[str],
+                            limit: int, exclude: Tuple[str, ...], title: str) -> str:
+        matches = self.destination_filter.rank(budget, duration, interests, month, limit=limit, exclude=exclude)
+        if not matches:
+            return NO_SUGGESTIONS if not exclude else ""
+        blocks = [SUGGESTIONS_HEADER.substitute(
+            title=title,
+            daily=f"{budget / max(int(duration), 1):,.0f}",
+            days=_days(int(duration)),
+            interests=f", {' + '.join(interests)}" if interests else "",
+            month=f", in {month}" if month else "",
+        )]
+        for match in matches:
+            dest_info = self.store.get(match.key)
+            blocks.append(SUGGESTION.substitute(
+                name=dest_info["name"],
+                budget_range=dest_info["budget_range"],
+                tags=", ".join(dest_info.get("tags", [])),
+                match=round(match.score * 100),
+            ))
+        return "".join(blocks)
+
+    def overview(self, dest_key: str) -> str:
+        """Short destination summary for chat answers"""
+        return self._overview(dest_key)
+
+    def cache_info(self) -> Dict[str, Any]:
+        return {
+            "itinerary": self._itinerary.cache_info(),
+            "plan": self._plan.cache_info(),
+            "overview": self._overview.cache_info(),
+            "multi_city": self._multi_city.cache_info(),
+            "suggestions": self._suggestions.cache_info(),
+        }
+
+    def _render_itinerary(self, dest_key: Optional[str], label: str, duration: int) -> str:
+        dest_info = self.store.get(dest_key) if dest_key else None
+        if not dest_info:
+            return GENERIC_ITINERARY.substitute(duration=duration, name=label)
+        if dest_info.get("attractions") and "lat" in dest_info:
+            return self._render_schedule(dest_info, duration)
+
+        activities = dest_info["activities"]
+        food = dest_info["food"]
+        blocks = [
+            ITINERARY_HEADER.substitute(duration=duration, name=dest_info["name"]),
+            DAY_1.substitute(
+                name=dest_info["name"],
+                activity_0=_pick(activities, 0, "City center exploration"),
+                food_0=_pick(food, 0, "local cuisine"),
+            ),
+        ]
+        if duration >= 2:
+            blocks.append(DAY_2.substitute(
+                activity_1=_pick(activities, 1, "major landmark"),
+                activity_2=_pick(activities, 2, "museum or cultural site"),
+                food_1=_pick(food, 1, "signature dish"),
+                activity_3=_pick(activities, 3, "Cultural performance or local entertainment"),
+            ))
+        if duration >= 3:
+            blocks.append(DAY_3.substitute(
+                activity_4=_pick(activities, 4, "Local neighborhood exploration"),
+                food_tour=", ".join(food[:3]),
+            ))
+        if duration >= 4:
+            blocks.append(DAY_4_PLUS)
+        return "".join(blocks)
+
+    def _render_schedule(self, dest_info: Dict[str, Any], duration: int) -> str:
+        """Itinerary with attractions routed from the city centre and packed into days"""
+        stops = [Stop(a["name"], a["lat"], a["lon"], a.get("hours", 2.0)) for a in dest_info["attractions"]]
+        centre = Stop(dest_info["name"], dest_info["lat"], dest_info["lon"])
+        days, unscheduled = self.route_planner.schedule(stops, duration, start=centre)
+        food = dest_info["food"] or ["local cuisine"]
+
+        blocks = [ITINERARY_HEADER.substitute(duration=duration, name=dest_info["name"])]
+        for number, visits in enumerate(days, start=1):
+            blocks.append(SCHEDULED_DAY.substitute(
+                day=number,
+                title=" & ".join(visit.stop.name for visit in visits[:2]) + (" & more" if len(visits) > 2 else ""),
+                arrival=f"* ✈️ *Arrival in {dest_info['name']}*, check in near the centre\n" if number == 1 else "",
+                visits="".join(
+                    SCHEDULED_VISIT.substitute(
+                        start=format_hour(visit.start),
+                        end=format_hour(visit.end),
+                        name=visit.stop.name,
+                        travel=(f" ({'🚶' if visit.travel_km < 2 else '🚇'} {visit.travel_minutes} min,"
+                                f" {visit.travel_km:g} km)") if visit.travel_minutes else "",
+                    )
+                    for visit in visits
+                ),
+                food=food[(number - 1) % len(food)],
+                km=f"{sum(visit.travel_km for visit in visits):.1f}",
+            ))
+        if unscheduled:
+            blocks.append(UNSCHEDULED.substitute(names=", ".join(stop.name for stop in unscheduled)))
+        if duration > len(days):
+            blocks.append(EXTENDED_DAYS.substitute(first_day=len(days) + 1))
+        return "".join(blocks)
+
+    def multi_city(self, destinations: Sequence[str], duration: int) -> str:
+        """Route through several catalogue cities, splitting the days by how much each has to see"""
+        return self._multi_city(tuple(destinations), int(duration))
+
+    def _render_multi_city(self, destinations: Tuple[str, ...], duration: int) -> str:
+        keys, unknown = [], []
+        for destination in destinations:
+            key = self.index.resolve(destination)
+            if key and key not in keys:
+                keys.append(key)
+            elif not key and destination.strip():
+                unknown.append(destination.strip())
+        keys = [key for key in keys if "lat" in self.store.get(key)]
+        if not keys:
+            return GENERIC_ITINERARY.substitute(duration=duration, name=" & ".join(destinations))
+
+        # Stops are named by key so the route maps straight back to catalogue entries
+        route = self.route_planner.order([Stop(key, self.store.get(key)["lat"], self.store.get(key)["lon"])
+                                          for key in keys])
+        keys = [stop.name for stop in route.stops]
+        ordered = [self.store.get(key) for key in keys]
+        days = self._split_days(ordered, duration)
+
+        legs = []
+        for i, (city, city_days) in enumerate(zip(ordered, days)):
+            following = f" → {route.legs[i]:,.0f} km →" if i < len(route.legs) else ""
+            legs.append(MULTI_CITY_LEG.substitute(name=city["name"], days=city_days,
+                                                  plural="s" if city_days != 1 else "", next=following))
+        blocks = [MULTI_CITY_HEADER.substitute(
+            route=" → ".join(city["name"] for city in ordered),
+            days=_days(duration),
+            km=f"{route.km:,.0f}",
+            legs="".join(legs),
+        )]
+        if unknown:
+            blocks.append(f"*🔎 Not in our catalogue, so left out of the route: {', '.join(unknown)}*\n\n")
+        blocks.extend(self._itinerary(key, "", city_days) for key, city_days in zip(keys, days) if city_days)
+        return "".join(blocks)
+
+    @staticmethod
+    def _split_days(cities: Sequence[Dict[str, Any]], duration: int) -> List[int]:
+        """Days per city in proportion to its attraction hours, at least one each while days last"""
+        weights = [sum(a.get("hours", 2.0) for a in city.get("attractions", [])) or 1.0 for city in cities]
+        days = [1 if i < duration else 0 for i in range(len(cities))]
+        for _ in range(max(duration - len(cities), 0)):
+            # Give the next day to the city with the most hours left per allotted day
+            i = max(range(len(cities)), key=lambda c: weights[c] / max(days[c], 1) - (days[c] == 0))
+            days[i] += 1
+        return days
+
+    def _render_overview(self, dest_key: str) -> str:
+        dest_info = self.store.get(dest_key)
+        return DESTINATION_OVERVIEW.substitute(
+            dest_info,
+            activities=", ".join(dest_info["activities"]),
+            food=", ".join(dest_info["food"]),
+        )
+
+    def _render_plan(self, dest_key: Optional[str], label: str, duration: int,
+                     interests: Tuple[str, ...], band: str) -> Tuple[str, ...]:
+        dest_info = self.store.get(dest_key) if dest_key else None
+        itinerary = self._itinerary(dest_key, label, duration)
+        common = {
+            "duration": duration,
+            "budget": "$" + _BUDGET_SLOT,
+            "interests": ", ".join(interests),
+            "itinerary": itinerary,
+        }
+
+        if dest_info:
+            text = PLAN.substitute(
+                common,
+                name=dest_info["name"],
+                description=dest_info["description"],
+                best_time=dest_info["best_time"],
+                currency=dest_info["currency"],
+                language=dest_info["language"],
+                budget_range=dest_info["budget_range"],
+                band=BAND_LABELS[band],
+                days=_days(duration),
+                transport=dest_info["transport"],
+                food=", ".join(dest_info["food"]),
+                activities=", ".join(dest_info["activities"]),
+            )
+        else:
+            # Offer close matches when the input was a typo or ambiguous
+            close_matches = [self.store.get(key)["name"]
+                             for key, score in self.index.suggest(label, limit=3)
+                             if score >= 0.5]
+            did_you_mean = f"**🔎 Did you mean:** {' | '.join(close_matches)}\n" if close_matches else ""
+            text = GENERIC_PLAN.substitute(common, name=label, did_you_mean=did_you_mean)
+            text += "".join(tip for interest, tip in INTEREST_TIPS.items() if interest in interests)
+
+        return tuple(text.split(_BUDGET_SLOT))
+
+
+# Static blocks, built once per process and shared by every session
+
+BUDGET_TIPS = """
+## 💰 International Budget Travel Tips
+
+### 🛫 Flight Savings
+* **Book 6-8 weeks in advance** for international flights
+* **Use flight comparison sites**: Skyscanner, Google Flights, Momondo
+* **Be flexible with dates**: Use flexible date search
+* **Consider layovers**: Sometimes cheaper than direct flights
+* **Budget airlines**: Research local budget carriers
+* **Error fares**: Follow deal alert websites
+
+### 🏨 Accommodation Strategies
+* **Hostels**: Great for meeting people, especially in Europe
+* **Airbnb**: Often cheaper for longer stays
+* **Guesthouses**: Local alternatives to hotels
+* **Location vs Price**: Stay slightly outside city center
+* **Booking timing**: Book refundable rates, cancel if better deals appear
+* **Loyalty programs**: Use hotel points and status benefits
+
+### 🍽️ Food & Dining
+* **Street food**: Often the best and cheapest local cuisine
+* **Local markets**: Fresh produce and authentic experience
+* **Cook your own**: If staying in places with kitchens
+* **Lunch specials**: Many restaurants offer cheaper lunch menus
+* **Avoid tourist areas**: Restaurants near attractions are overpriced
+* **Happy hours**: Take advantage of drink specials
+
+### 🚌 Transportation
+* **Public transport**: Buy day/week passes instead of individual tickets
+* **Walking**: Best way to explore and it's free
+* **Ride-sharing**: Often cheaper than taxis
+* **Bike rentals**: Many cities have bike-sharing programs
+* **Regional trains**: Cheaper than high-speed options
+* **Multi-city passes**: For extensive travel (Eurail, etc.)
+
+### 🎫 Activities & Attractions
+* **Free walking tours**: Available in most major cities
+* **Museum free days**: Many museums have free entry days
+* **City tourism cards**: Often include transport + attractions
+* **Student discounts**: Get an international student ID
+* **Group discounts**: Travel with others for better rates
+* **Free attractions**: Parks, beaches, viewpoints, markets
+
+### 💳 Money Management
+* **Notify banks**: Avoid card blocks while traveling
+* **Multi-currency cards**: Avoid foreign transaction fees
+* **ATM strategy**: Use bank ATMs, avoid airport/tourist area ATMs
+* **Local currency**: Have some cash for small vendors
+* **Budgeting apps**: Track expenses in real-time
+* **Emergency fund**: Keep separate emergency money
+
+### 🌍 Regional Specific Tips
+* **Southeast Asia**: Street food, local transport, guesthouses
+* **Europe**: Hostels, train passes, free walking tours
+* **Americas**: National parks, road trips, camping
+* **Middle East**: Haggling expected, modest dress savings
+* **Africa**: Group tours often better value, local guides
+* **Oceania**: Working holiday visas, camping, hitchhiking
+
+### 📱 Technology Savings
+* **Free WiFi**: Use instead of international roaming
+* **Offline maps**: Download before traveling
+* **Translation apps**: Google Translate offline mode
+* **Travel apps**: Compare prices, find deals
+* **VPN**: Access home country prices for bookings
+* **International SIM**: Often cheaper than roaming
+
+### 🎒 Packing Smart
+* **Pack light**: Avoid baggage fees
+* **Versatile clothing**: Mix and match outfits
+* **Travel-sized items**: Buy toiletries locally
+* **Universal adapter**: One adapter for all countries
+* **Portable charger**: Avoid buying multiple chargers
+* **Laundry**: Do laundry instead of overpacking
+
+### 💡 Pro Money-Saving Hacks
+* **Shoulder season**: Travel just before/after peak season
+* **Slow travel**: Stay longer in fewer places
+* **House sitting**: Free accommodation for pet/house sitting
+* **Work exchanges**: Hostels, farms, volunteer programs
+* **Local friends**: Connect with locals for insider tips
+* **Travel insurance**: Cheaper than medical emergencies abroad
+"""
+
+POPULAR_DESTINATIONS = """
+## 🌍 Top International Destinations
+
+### 🏛️ Europe
+* **🇫🇷 Paris, France** - Art, romance, and world-class cuisine
+* **🇮🇹 Rome, Italy** - Ancient history and incredible food
+* **🇬🇧 London, UK** - Royal heritage and modern culture
+* **🇩🇪 Berlin, Germany** - History, nightlife, and culture
+* **🇪🇸 Barcelona, Spain** - Architecture, beaches, and tapas
+
+### 🏯 Asia
+* **🇯🇵 Tokyo, Japan** - Modern technology meets ancient tradition
+* **🇹🇭 Bangkok, Thailand** - Street food and vibrant culture
+* **🇸🇬 Singapore** - Clean, modern, and incredibly diverse
+* **🇰🇷 Seoul, South Korea** - K-culture and amazing food
+* **🇻🇳 Ho Chi Minh City, Vietnam** - History and incredible cuisine
+
+### 🏖️ Americas
+* **🇺🇸 New York, USA** - The city that never sleeps
+* **🇧🇷 Rio de Janeiro, Brazil** - Beaches, carnival, and culture
+* **🇨🇦 Toronto, Canada** - Diversity and natural beauty
+* **🇲🇽 Mexico City, Mexico** - Rich culture and amazing food
+* **🇦🇷 Buenos Aires, Argentina** - Tango, steaks, and wine
+
+### 🏜️ Middle East & Africa
+* **🇦🇪 Dubai, UAE** - Luxury, modern architecture, and shopping
+* **🇪🇬 Cairo, Egypt** - Ancient pyramids and rich history
+* **🇿🇦 Cape Town, South Africa** - Natural beauty and wine
+* **🇹🇷 Istanbul, Turkey** - Where Europe meets Asia
+
+### 🏄 Oceania
+* **🇦🇺 Sydney, Australia** - Iconic harbor and laid-back culture
+* **🇳🇿 Auckland, New Zealand** - Adventure and natural beauty
+"""
+
+TRAVEL_CHECKLIST = """
+## 📋 International Travel Checklist
+
+### 📄 Essential Documents
+* [ ] **Passport** (valid for 6+ months)
+* [ ] **Visa** (research requirements early)
+* [ ] **Travel insurance** documentation
+* [ ] **Flight confirmations** and itinerary
+* [ ] **Hotel reservations** confirmations
+* [ ] **International driving permit** (if needed)
+* [ ] **Vaccination certificates** (if required)
+* [ ] **Emergency contact information**
+
+### 💳 Financial Preparation
+* [ ] **Notify banks** of travel dates and destinations
+* [ ] **International banking cards** (low foreign transaction fees)
+* [ ] **Local currency** (some cash for arrival)
+* [ ] **Emergency credit card** (separate from main wallet)
+* [ ] **Travel budget** planning and tracking app
+
+### 🎒 Smart Packing
+* [ ] **Weather-appropriate clothing** (check forecast)
+* [ ] **Comfortable walking shoes** (broken in)
+* [ ] **Universal power adapter** and chargers
+* [ ] **Medications** in original containers
+* [ ] **First aid kit** basics
+* [ ] **Copies of documents** (digital and physical)
+* [ ] **Travel-sized toiletries** (within liquid limits)
+
+### 📱 Technology & Communication
+* [ ] **International phone plan** or local SIM research
+* [ ] **Offline maps** downloaded
+* [ ] **Translation apps** downloaded
+* [ ] **Travel apps** (transport, food, accommodation)
+* [ ] **VPN** for secure internet access
+* [ ] **Emergency contact apps** and information
+
+### 🏥 Health & Safety
+* [ ] **Travel insurance** with medical coverage
+* [ ] **Vaccinations** (check requirements 6-8 weeks ahead)
+* [ ] **Prescription medications** (extra supply)
+* [ ] **Emergency medical information** card
+* [ ] **Embassy/consulate contact information**
+* [ ] **Local emergency numbers** research
+
+### 🌍 Cultural Preparation
+* [ ] **Local customs** and etiquette research
+* [ ] **Basic phrases** in local language
+* [ ] **Dress code** requirements for religious sites
+* [ ] **Tipping customs** understanding
+* [ ] **Business hours** and holiday calendar
+* [ ] **Cultural sensitivity** awareness
+"""
+
+VISA_TIPS = """
+## 🛂 Visa & Entry Requirements
+
+### 📄 Before You Book
+* **Check the official source**: The destination's embassy or foreign ministry website
+* **Passport validity**: Many countries require 6+ months beyond your return date
+* **Blank pages**: Keep at least two free pages for stamps and visas
+* **Transit rules**: Some layover countries require a transit visa
+
+### 🗂️ Common Visa Types
+* **Visa-free entry**: Short tourist stays for many passports
+* **Visa on arrival**: Paid at the border; carry cash and a photo
+* **eVisa / ETA**: Apply online, usually approved within days
+* **Embassy visa**: Book appointments early; processing can take weeks
+
+### ✅ Typical Requirements
+* **Return or onward ticket**
+* **Proof of accommodation** for your stay
+* **Proof of funds** such as recent bank statements
+* **Travel insurance** (mandatory in some regions)
+* **Vaccination certificates** where required
+
+### ⚠️ Good to Know
+* **Overstays** can mean fines or entry bans
+* **Working** is not allowed on a tourist visa
+* **Rules change often**: Re-check requirements a few weeks before departure
+"""
+
+STATIC_BLOCKS = {
+    "budget_tips": BUDGET_TIPS,
+    "popular_destinations": POPULAR_DESTINATIONS,
+    "travel_checklist": TRAVEL_CHECKLIST,
+    "visa_tips": VISA_TIPS,
+}